@@ -0,0 +1,57 @@
+"""
+Compare filtering tasks in Python with the NumPy column view
+
+Usage: python benchmarks/bench_columns.py [count]
+"""
+
+import sys
+import time
+from task_03.columns import ColumnarIndex
+from task_03.models import Priority, Task
+
+TAGS = ['#work', '#urgent', '#home', '#shopping', '#client/acme', '#later']
+START = 1735689600
+CUTOFF = START + 500_000 * 37
+
+
+def sample_tasks(count):
+    """Tasks shaped like a real task list"""
+    return [Task(i + 1, f"Task number {i}", i % 3, [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]],
+                 '', START + i * 37, i % 4 == 0)
+            for i in range(count)]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tasks = sample_tasks(count)
+    columns = ColumnarIndex()
+    _, build_seconds = timed(lambda: columns.add_many(tasks))
+    
+    queries = {
+        'pending': (
+            lambda: [t.id for t in tasks if not t.completed],
+            lambda: columns.select(completed=False)),
+        'high, recent': (
+            lambda: [t.id for t in tasks if t.priority == Priority.HIGH and t.created_at >= CUTOFF],
+            lambda: columns.select(priority='high', created_after=CUTOFF)),
+        'tag #work': (
+            lambda: [t.id for t in tasks if '#work' in t.tags],
+            lambda: columns.select(tag='#work')),
+    }
+    print(f"Tasks: {count:,} (column view built in {build_seconds:.2f}s)")
+    print(f"{'query':<14}{'python':>10}{'numpy':>10}")
+    for name, (python_query, numpy_query) in queries.items():
+        expected, python_seconds = timed(python_query)
+        result, numpy_seconds = timed(numpy_query)
+        assert result == expected
+        print(f"{name:<14}{python_seconds * 1000:>8.1f}ms{numpy_seconds * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
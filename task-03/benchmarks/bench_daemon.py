@@ -0,0 +1,79 @@
+"""
+Compare one-shot commands that load the tasks themselves with ones forwarded to a daemon
+
+Usage: python benchmarks/bench_daemon.py [count]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import task_03
+from task_03.daemon import DaemonClient, TaskDaemon
+from task_03.models import Task
+from task_03.storage import JsonBackend
+from task_03.task_manager import TaskManager
+
+LAUNCHES = 10
+REQUESTS = 2_000
+TAGS = ['#work', '#urgent', '#home', '#shopping', '#client/acme', '#later']
+COMMANDS = [['view', '42'], ['filter', '#work', '-#later'], ['add', 'deploy hotfix', 'high', '#ops']]
+
+
+def sample_tasks(count):
+    """Tasks shaped like a real task list"""
+    return [Task(i + 1, f"Task number {i} for the weekly report", i % 3,
+                 [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]], '',
+                 1735689600 + i * 37, i % 4 == 0)
+            for i in range(count)]
+
+
+def launch_seconds(command, env):
+    """Best wall clock of a fresh task-03 process running the command"""
+    best = None
+    for _ in range(LAUNCHES):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'task_03.cli'] + command, env=env,
+                       stdout=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(task_03.__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        JsonBackend().save(sample_tasks(count), count + 1)
+        
+        alone = {' '.join(command): launch_seconds(command, env) for command in COMMANDS}
+        
+        daemon = TaskDaemon(TaskManager(thread_safe=True))
+        daemon.start()
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        try:
+            forwarded = {' '.join(command): launch_seconds(command, env) for command in COMMANDS}
+            client = DaemonClient(daemon.path)
+            start = time.perf_counter()
+            for _ in range(REQUESTS):
+                client.run(['view', '42'])
+            per_request = (time.perf_counter() - start) / REQUESTS
+            client.close()
+        finally:
+            daemon.shutdown()
+            thread.join()
+            daemon.close()
+    
+    print(f"Tasks: {count:,}, best of {LAUNCHES} launches")
+    print(f"{'command':<36}{'in-process':>12}{'daemon':>10}")
+    for command in alone:
+        print(f"{command:<36}{alone[command] * 1000:>10.0f}ms{forwarded[command] * 1000:>8.0f}ms")
+    print(f"view over one open connection: {per_request * 1_000_000:.0f}us per request")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
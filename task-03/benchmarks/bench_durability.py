@@ -0,0 +1,41 @@
+"""
+Measure add throughput under each durability policy
+
+Usage: python benchmarks/bench_durability.py [count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from task_03.task_manager import TaskManager
+
+POLICIES = ['always', 'batched', 'none']
+BACKENDS = ['json', 'journal', 'lines']
+
+
+def run(storage, durability, count):
+    """Return adds per second and the number of fsyncs issued"""
+    with tempfile.TemporaryDirectory() as directory:
+        tm = TaskManager(filename=os.path.join(directory, 'tasks'), storage=storage,
+                         durability=durability)
+        start = time.perf_counter()
+        for i in range(count):
+            tm.add_task(f"Task number {i}", tags=['#work'])
+        tm.close()
+        elapsed = time.perf_counter() - start
+        return count / elapsed, tm.storage.sync.fsync_count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"Adds per run: {count:,}")
+    print(f"{'backend':<9}{'policy':<9}{'adds/s':>10}{'fsyncs':>8}")
+    for storage in BACKENDS:
+        for durability in POLICIES:
+            rate, fsyncs = run(storage, durability, count)
+            print(f"{storage:<9}{durability:<9}{rate:>10,.0f}{fsyncs:>8,}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
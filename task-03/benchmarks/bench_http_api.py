@@ -0,0 +1,174 @@
+"""
+Load-test the HTTP API: requests per second and latency percentiles
+
+Starts `task-03 http` on a task file of [count] tasks, unless --url points at
+a running instance, then runs [connections] kept-alive clients that mostly read
+single tasks and sorted pages and sometimes add a task. The journal backend is
+the default: with plain JSON every add rewrites the whole file.
+
+Usage: python benchmarks/bench_http_api.py [count] [connections] [--url host:port]
+                                           [--backend json|journal|sqlite|lines]
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import task_03
+from task_03.models import Task
+from task_03.storage import open_storage
+
+DURATION = 10
+FILENAMES = {'json': 'tasks.json', 'journal': 'tasks.json', 'lines': 'tasks.jsonl',
+             'sqlite': 'tasks.db'}
+
+# Runs `task-03 http <port>` with the backend picked in Config
+LAUNCHER = ("import sys; from task_03.config import Config; Config.STORAGE_BACKEND = sys.argv.pop(1); "
+            "from task_03.cli import main; sys.exit(main())")
+TAGS = ['#work', '#urgent', '#home', '#shopping', '#client/acme', '#later']
+
+
+def sample_tasks(count):
+    """Tasks shaped like a real task list"""
+    return [Task(i + 1, f"Task number {i} for the weekly report", i % 3,
+                 [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]], '',
+                 1735689600 + i * 37, i % 4 == 0)
+            for i in range(count)]
+
+
+def pick_request(count, rng):
+    """(route name, method, path, body) in a read-mostly mix"""
+    roll = rng.random()
+    if roll < 0.7:
+        return 'GET /tasks/<id>', 'GET', f"/tasks/{rng.randint(1, count)}", None
+    if roll < 0.9:
+        return 'GET /tasks?sort', 'GET', '/tasks?sort=priority,-created&limit=20', None
+    return 'POST /tasks', 'POST', '/tasks', {'description': 'deploy hotfix', 'tags': ['#ops']}
+
+
+async def send(reader, writer, method, path, body):
+    """One request on a kept-alive connection; returns the status"""
+    data = b'' if body is None else json.dumps(body).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n"
+                 .encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length, chunked = 0, False
+    while True:
+        line = (await reader.readline()).strip().lower()
+        if not line:
+            break
+        if line.startswith(b'content-length:'):
+            length = int(line.split(b':')[1])
+        elif line == b'transfer-encoding: chunked':
+            chunked = True
+    if not chunked:
+        await reader.readexactly(length)
+        return status
+    while True:
+        size = int((await reader.readline()).strip(), 16)
+        await reader.readexactly(size + 2)
+        if not size:
+            return status
+
+
+async def client(host, port, count, deadline, latencies, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    while time.perf_counter() < deadline:
+        route, method, path, body = pick_request(count, rng)
+        start = time.perf_counter()
+        status = await send(reader, writer, method, path, body)
+        assert status < 500, f"{method} {path} answered {status}"
+        latencies.setdefault(route, []).append(time.perf_counter() - start)
+    writer.close()
+
+
+async def load(host, port, count, connections):
+    latencies = {}
+    deadline = time.perf_counter() + DURATION
+    await asyncio.gather(*(client(host, port, count, deadline, latencies, seed)
+                           for seed in range(connections)))
+    return latencies
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, server):
+    for _ in range(600):
+        if server.poll() is not None:
+            raise RuntimeError("task-03 http exited")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("task-03 http did not start")
+
+
+def report(latencies, connections):
+    total = sum(len(values) for values in latencies.values())
+    print(f"{connections} connections, {DURATION}s: {total / DURATION:,.0f} requests/s")
+    print(f"{'route':<18}{'requests':>10}{'p50':>9}{'p99':>9}")
+    for route, values in sorted(latencies.items()) + [('all', sum(latencies.values(), []))]:
+        print(f"{route:<18}{len(values):>10,}{percentile(values, 0.5) * 1000:>7.1f}ms"
+              f"{percentile(values, 0.99) * 1000:>7.1f}ms")
+
+
+def option(args, name, default=None):
+    """Remove --name value from args and return the value"""
+    if name not in args:
+        return default
+    position = args.index(name)
+    value = args[position + 1]
+    del args[position:position + 2]
+    return value
+
+
+def main():
+    args = sys.argv[1:]
+    url = option(args, '--url')
+    kind = option(args, '--backend', 'journal')
+    count = int(args[0]) if args else 100_000
+    connections = int(args[1]) if len(args) > 1 else 32
+    
+    if url is not None:
+        host, port = url.rsplit(':', 1)
+        latencies = asyncio.run(load(host, int(port), count, connections))
+        report(latencies, connections)
+        return
+    
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(task_03.__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        storage = open_storage(kind, os.path.join(directory, FILENAMES[kind]))
+        storage.save(sample_tasks(count), count + 1)
+        storage.close()
+        port = free_port()
+        server = subprocess.Popen([sys.executable, '-c', LAUNCHER, kind, 'http', str(port)],
+                                  cwd=directory, env=env, stdout=subprocess.DEVNULL)
+        try:
+            wait_for_port(port, server)
+            latencies = asyncio.run(load('127.0.0.1', port, count, connections))
+        finally:
+            server.terminate()
+            server.wait()
+    print(f"Tasks: {count:,} ({kind} backend)")
+    report(latencies, connections)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
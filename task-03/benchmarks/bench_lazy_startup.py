@@ -0,0 +1,60 @@
+"""
+Compare the time to open a task file and read one task with the JSON and lines backends
+
+Usage: python benchmarks/bench_lazy_startup.py [count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from task_03.models import Task
+from task_03.storage import JsonBackend, LinesBackend
+
+TAGS = ['#work', '#urgent', '#home', '#shopping', '#client/acme', '#later']
+
+
+def sample_tasks(count):
+    """Tasks shaped like a real task list"""
+    return [Task(i + 1, f"Task number {i} for the weekly report", i % 3,
+                 [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]], '',
+                 1735689600 + i * 37, i % 4 == 0)
+            for i in range(count)]
+
+
+def open_and_get(backend_class, filename, task_id):
+    """Return the seconds taken to open the file and fetch one task"""
+    start = time.perf_counter()
+    backend = backend_class(filename)
+    if backend.lazy:
+        backend.get(task_id)
+    else:
+        tasks, _ = backend.load()
+        next(task for task in tasks if task['id'] == task_id)
+    elapsed = time.perf_counter() - start
+    backend.close()
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    tasks = sample_tasks(count)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        json_file = os.path.join(directory, 'tasks.json')
+        lines_file = os.path.join(directory, 'tasks.jsonl')
+        JsonBackend(json_file).save(tasks, count + 1)
+        backend = LinesBackend(lines_file)
+        backend.save(tasks, count + 1)
+        backend.close()
+        
+        json_seconds = open_and_get(JsonBackend, json_file, count // 2)
+        lines_seconds = open_and_get(LinesBackend, lines_file, count // 2)
+    
+    print(f"Tasks:          {count:,}")
+    print(f"json open+get:  {json_seconds * 1000:,.1f} ms")
+    print(f"lines open+get: {lines_seconds * 1000:,.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
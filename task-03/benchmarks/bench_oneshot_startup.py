@@ -0,0 +1,76 @@
+"""
+Time one-shot `task-03 add` and `task-03 list` commands on each storage backend
+
+Reports the wall clock of a fresh process per command, and the modules
+python -X importtime shows each command loading.
+
+Usage: python benchmarks/bench_oneshot_startup.py [count]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import task_03
+from task_03.models import Task
+from task_03.storage import open_storage
+
+LAUNCHES = 10
+TAGS = ['#work', '#urgent', '#home', '#shopping', '#client/acme', '#later']
+FILENAMES = {'json': 'tasks.json', 'journal': 'tasks.json', 'lines': 'tasks.jsonl',
+             'sqlite': 'tasks.db'}
+
+# Runs the CLI as the task-03 entry point would, with the backend picked in Config
+LAUNCHER = ("import sys; from task_03.config import Config; Config.STORAGE_BACKEND = sys.argv.pop(1); "
+            "from task_03 import main; sys.exit(main())")
+
+
+def sample_tasks(count):
+    """Tasks shaped like a real task list"""
+    return [Task(i + 1, f"Task number {i} for the weekly report", i % 3,
+                 [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]], '',
+                 1735689600 + i * 37, i % 4 == 0)
+            for i in range(count)]
+
+
+def launch(kind, args, env, importtime=False):
+    """Run one command in a fresh process; return its seconds and its -X importtime report"""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', LAUNCHER, kind]
+    start = time.perf_counter()
+    result = subprocess.run(command + args, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True, check=True)
+    return time.perf_counter() - start, result.stderr
+
+
+def imported_modules(report):
+    """Names of the task_03 modules in an importtime report"""
+    return sorted(line.rsplit('|', 1)[1].strip() for line in report.splitlines()
+                  if line.rsplit('|', 1)[-1].strip().startswith('task_03.'))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tasks = sample_tasks(count)
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(task_03.__file__)))
+    print(f"Tasks: {count:,}, best of {LAUNCHES} launches")
+    print(f"{'backend':<9}{'add':>10}{'list':>10}  modules loaded by add")
+    for kind, filename in FILENAMES.items():
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            storage = open_storage(kind, filename)
+            storage.save(tasks, count + 1)
+            storage.close()
+            
+            add = min(launch(kind, ['add', 'deploy hotfix', 'high', '#ops'], env)[0]
+                      for _ in range(LAUNCHES))
+            listing = min(launch(kind, ['list', '--sort', 'priority', '--limit', '5'], env)[0]
+                          for _ in range(3))
+            _, report = launch(kind, ['add', 'deploy hotfix', 'high', '#ops'], env, importtime=True)
+        modules = imported_modules(report)
+        print(f"{kind:<9}{add * 1000:>8.0f}ms{listing * 1000:>8.0f}ms  {len(modules)}: "
+              f"{', '.join(module[8:] for module in modules)}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Compare replaying commands as one script with launching the CLI per command
+
+Usage: python benchmarks/bench_script.py [commands]
+"""
+
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import task_03
+from task_03.cli import run_script_file
+
+LAUNCHES = 20
+
+
+def sample_script(count):
+    """Mostly adds, with some tagging and completing of earlier tasks"""
+    lines = []
+    for i in range(count):
+        if i % 10 == 8 and i:
+            lines.append(f"tag {i // 2} #later")
+        elif i % 10 == 9:
+            lines.append(f"complete {i // 2 + 1}")
+        else:
+            lines.append(f"add Task number {i} {['low', 'medium', 'high'][i % 3]} #work")
+    return lines
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lines = sample_script(count)
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        with open('commands.txt', 'w') as f:
+            f.write('\n'.join(lines))
+        
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            status = run_script_file('commands.txt', strict=True)
+        script_seconds = time.perf_counter() - start
+        assert status == 0
+        
+        # One process per command against the store the script just filled
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(task_03.__file__)))
+        start = time.perf_counter()
+        for line in lines[:LAUNCHES]:
+            subprocess.run([sys.executable, '-m', 'task_03.cli', '-'], input=line, text=True,
+                           env=env, stdout=subprocess.DEVNULL, check=True)
+        launch_seconds = (time.perf_counter() - start) / LAUNCHES
+    
+    print(f"Commands:               {count:,}")
+    print(f"run script:             {script_seconds:.1f}s")
+    print(f"one launch per command: {launch_seconds:.2f}s each, "
+          f"~{launch_seconds * count / 3600:.1f}h for the whole script")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Compare save/load time and file size of JSON and binary snapshots
+
+Usage: python benchmarks/bench_snapshot.py [count ...]
+"""
+
+import json
+import sys
+import time
+from task_03.config import Config
+from task_03.models import Task
+from task_03.snapshot import decode_tasks, encode_tasks
+
+TAGS = ['#work', '#urgent', '#home', '#shopping', '#client/acme', '#later']
+
+
+def sample_tasks(count):
+    """Tasks shaped like a real task list"""
+    return [Task(i + 1, f"Task number {i} for the weekly report", i % 3,
+                 [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]],
+                 "Check figures with finance" if i % 5 == 0 else '',
+                 1735689600 + i * 37, i % 4 == 0)
+            for i in range(count)]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def json_encode(tasks, next_id):
+    data = {'next_id': next_id, 'tasks': [task.to_dict() for task in tasks]}
+    return json.dumps(data, indent=Config.JSON_INDENT).encode()
+
+
+def json_decode(data):
+    data = json.loads(data)
+    return [Task.from_dict(task) for task in data['tasks']], data['next_id']
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    formats = [('json', json_encode, json_decode)]
+    for compression in ('none', 'zlib', 'lzma'):
+        formats.append((f"binary/{compression}",
+                        lambda tasks, next_id, c=compression: encode_tasks(tasks, next_id, c),
+                        decode_tasks))
+    
+    print(f"{'tasks':>10}  {'format':<14}{'size':>12}{'save':>10}{'load':>10}")
+    for count in counts:
+        tasks = sample_tasks(count)
+        for name, encode, decode in formats:
+            data, save_seconds = timed(encode, tasks, count + 1)
+            _, load_seconds = timed(decode, data)
+            print(f"{count:>10,}  {name:<14}{len(data) / 2**20:>9.2f} MB"
+                  f"{save_seconds:>9.2f}s{load_seconds:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
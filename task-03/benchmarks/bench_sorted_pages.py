@@ -0,0 +1,52 @@
+"""
+Compare the first page of a sorted listing with sorting every task
+
+Usage: python benchmarks/bench_sorted_pages.py [count] [page size]
+"""
+
+import sys
+import time
+from task_03.models import Task
+from task_03.sorting import SortedView, parse_sort, sort_key, top_k
+
+START = 1735689600
+
+
+def sample_tasks(count):
+    """Tasks with mixed priorities, created a few seconds apart out of order"""
+    return [Task(i + 1, f"Task number {i}", i * 7 % 3, [], '', START + (i * 7919) % count, i % 4 == 0)
+            for i in range(count)]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    tasks = sample_tasks(count)
+    fields = parse_sort('priority,-created')
+    key = sort_key(fields)
+    pending = [task for task in tasks if not task.completed]
+    
+    expected, sort_seconds = timed(lambda: sorted(pending, key=key)[:limit])
+    heap, heap_seconds = timed(lambda: top_k(pending, key, limit))
+    view = SortedView(fields, show_completed=False)
+    _, build_seconds = timed(lambda: view.build(tasks))
+    page, page_seconds = timed(lambda: view.page(limit))
+    new_task = Task(count + 1, "New task", 'high', [], '', START + count, False)
+    _, add_seconds = timed(lambda: view.add(new_task))
+    assert [task.id for task in heap] == [task.id for task in expected] == page
+    
+    print(f"Tasks: {count:,}, first page of {limit} by priority,-created")
+    print(f"full sort:          {sort_seconds * 1000:8.1f}ms")
+    print(f"heap top-k:         {heap_seconds * 1000:8.1f}ms")
+    print(f"sorted view page:   {page_seconds * 1000:8.3f}ms "
+          f"(built once in {build_seconds * 1000:.0f}ms, {add_seconds * 1e6:.0f}us per new task)")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Compare cold (parse) and warm (startup cache) TaskManager start times
+
+Usage: python benchmarks/bench_startup_cache.py [count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from task_03.models import Task
+from task_03.storage import JsonBackend
+from task_03.task_manager import TaskManager
+
+TAGS = ['#work', '#urgent', '#home', '#shopping', '#client/acme', '#later']
+
+
+def sample_tasks(count):
+    """Tasks shaped like a real task list"""
+    return [Task(i + 1, f"Task number {i} for the weekly report", i % 3,
+                 [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]], '',
+                 1735689600 + i * 37, i % 4 == 0)
+            for i in range(count)]
+
+
+def start(filename):
+    """Return the seconds taken to open a TaskManager, then close it"""
+    begin = time.perf_counter()
+    tm = TaskManager(filename=filename, startup_cache=True)
+    elapsed = time.perf_counter() - begin
+    tm.close()
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'tasks.json')
+        JsonBackend(filename).save(sample_tasks(count), count + 1)
+        
+        cold = start(filename)
+        warm = start(filename)
+    
+    print(f"Tasks:       {count:,}")
+    print(f"Cold start:  {cold:.2f}s (parse JSON and build indexes)")
+    print(f"Warm start:  {warm:.2f}s (startup cache)")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
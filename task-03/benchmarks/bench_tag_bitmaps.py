@@ -0,0 +1,56 @@
+"""
+Compare tag queries by scanning every task with the per-tag bitmaps
+
+Usage: python benchmarks/bench_tag_bitmaps.py [count] [tags]
+"""
+
+import random
+import sys
+import time
+from task_03.indexes import TagIndex, matches_tag_query, parse_tag_query
+from task_03.models import Task
+
+
+def sample_tasks(count, tag_count):
+    """Tasks with three tags each, a few tags common and most rare"""
+    rng = random.Random(1)
+    tags = [f"#tag{i}" for i in range(tag_count)]
+    # Zipf-like weights: #tag0 is on about a third of the tasks
+    weights = [1 / (i + 1) for i in range(tag_count)]
+    return [Task(i + 1, f"Task number {i}", i % 3, rng.choices(tags, weights, k=3), '', 0.0)
+            for i in range(count)]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tag_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    tasks = sample_tasks(count, tag_count)
+    index = TagIndex()
+    
+    def build():
+        for task in tasks:
+            index.add(task)
+    _, build_seconds = timed(build)
+    
+    queries = ["#tag0 #tag1", "#tag0 #tag1 -#tag2", "#tag3|#tag4|#tag5",
+               "#tag0|#tag1 -#tag2|#tag3", "#tag500 #tag0", "#tag1 -#tag0"]
+    print(f"Tasks: {count:,}, tags: {tag_count:,} (bitmaps built in {build_seconds:.2f}s)")
+    print(f"{'query':<28}{'matches':>10}{'scan':>10}{'bitmap':>10}")
+    for query in queries:
+        parsed = parse_tag_query(query)
+        expected, scan_seconds = timed(
+            lambda: [task.id for task in tasks if matches_tag_query(task, parsed)])
+        result, bitmap_seconds = timed(lambda: list(index.query(parsed)))
+        assert result == expected
+        print(f"{query:<28}{len(result):>10,}{scan_seconds * 1000:>8.0f}ms"
+              f"{bitmap_seconds * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Measure the memory used per task by plain dicts versus Task objects
+
+Usage: python benchmarks/bench_task_memory.py [count]
+"""
+
+import json
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from task_03.models import Task
+
+TAGS = ['#work', '#urgent', '#home', '#shopping', '#client/acme', '#later']
+
+
+def sample_json(count):
+    """Serialized task list shaped like a real tasks.json"""
+    start = datetime(2025, 1, 1)
+    tasks = []
+    for i in range(count):
+        tasks.append({
+            'id': i + 1,
+            'description': f"Task number {i} for the weekly report",
+            'priority': ['low', 'medium', 'high'][i % 3],
+            'tags': [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]],
+            'notes': '',
+            'created_at': (start + timedelta(seconds=i * 37)).isoformat(),
+            'completed': i % 4 == 0
+        })
+    return json.dumps(tasks)
+
+
+def measure(build, text):
+    """Return the bytes still allocated after building the task list"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = build(text)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, len(tasks)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    text = sample_json(count)
+    
+    dict_bytes, _ = measure(json.loads, text)
+    task_bytes, _ = measure(lambda t: [Task.from_dict(d) for d in json.loads(t)], text)
+    
+    print(f"Tasks:          {count:,}")
+    print(f"dict per task:  {dict_bytes / count:,.0f} bytes ({dict_bytes / 2**20:,.0f} MiB total)")
+    print(f"Task per task:  {task_bytes / count:,.0f} bytes ({task_bytes / 2**20:,.0f} MiB total)")
+    print(f"Saved:          {1 - task_bytes / dict_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Measure what thread-safe mode costs: single-thread reads, and reads shared with a writer
+
+Uses the journal backend, so each add appends a record instead of rewriting the file.
+
+Usage: python benchmarks/bench_thread_safe.py [count] [threads]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from task_03.models import Task
+from task_03.storage import open_storage
+from task_03.task_manager import TaskManager
+
+DURATION = 3
+TAGS = ['#work', '#urgent', '#home', '#shopping', '#client/acme', '#later']
+
+
+def sample_tasks(count):
+    """Tasks shaped like a real task list"""
+    return [Task(i + 1, f"Task number {i} for the weekly report", i % 3,
+                 [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]], '',
+                 1735689600 + i * 37, i % 4 == 0)
+            for i in range(count)]
+
+
+def read_once(tm, i):
+    tm.get_task_by_id(i + 1)
+    tm.search_by_tag('#client/acme')
+    tm.search_tasks('weekly')
+
+
+def reads_per_second(tm, threads, writer):
+    """Reads finished by [threads] reader threads, with or without a writer adding tasks"""
+    done = threading.Event()
+    counts = [0] * threads
+    
+    def reader(slot):
+        i = 0
+        while not done.is_set():
+            read_once(tm, i % 1000)
+            i += 1
+        counts[slot] = i
+    
+    def write():
+        while not done.is_set():
+            tm.add_task("deploy hotfix", 'high', ['#ops'])
+            time.sleep(0.001)
+    workers = [threading.Thread(target=reader, args=(slot,)) for slot in range(threads)]
+    if writer:
+        workers.append(threading.Thread(target=write))
+    for worker in workers:
+        worker.start()
+    time.sleep(DURATION)
+    done.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / DURATION
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        storage = open_storage('journal', 'tasks.json')
+        storage.save(sample_tasks(count), count + 1)
+        storage.close()
+        
+        print(f"Tasks: {count:,}, {DURATION}s per run")
+        print(f"{'mode':<14}{'1 reader':>12}{f'{threads} readers':>14}{'+ writer':>12}")
+        for thread_safe in (False, True):
+            tm = TaskManager(storage=open_storage('journal', 'tasks.json', 'none'),
+                             thread_safe=thread_safe)
+            single = reads_per_second(tm, 1, False)
+            shared = reads_per_second(tm, threads, False)
+            # Without the lock a writer can break readers mid-search, so only time it when safe
+            mixed = f"{reads_per_second(tm, threads, True):>12,.0f}" if thread_safe else f"{'-':>12}"
+            tm.close()
+            mode = 'thread-safe' if thread_safe else 'plain'
+            print(f"{mode:<14}{single:>12,.0f}{shared:>14,.0f}{mixed}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
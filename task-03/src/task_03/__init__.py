@@ -3,4 +3,4 @@ def inc(n: int) -> int:
 
 def main():
     from task_03.cli import main as cli_main
-    cli_main()
\ No newline at end of file
+    return cli_main()
\ No newline at end of file
@@ -0,0 +1,335 @@
+"""
+HTTP/JSON API over a TaskManager, built on asyncio
+
+Routes (task bodies and responses use the JSON form of a task):
+
+    GET    /tasks[?all=1&sort=priority,-created&limit=20&after=<cursor>]
+    POST   /tasks               {"description": ..., "priority": ..., "tags": [...], "notes": ...}
+    GET    /tasks/<id>
+    DELETE /tasks/<id>
+    POST   /tasks/<id>/complete
+    PUT    /tasks/<id>/notes    {"notes": ...}
+    GET    /search?q=<keyword>[&mode=ranked|substring&archived=1]
+    GET    /filter?q=#a%20-#b[&archived=1]
+
+Listings stream one task per line (NDJSON) in a chunked response, and
+connections are kept alive between requests. The TaskManager is only
+touched from worker threads, so a slow save never stalls the event loop;
+it must be thread-safe, so those threads read side by side.
+"""
+
+import asyncio
+import json
+import re
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+from task_03.config import Config
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class HttpError(Exception):
+    """Ends a request with an error status and a JSON message"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    """A parsed HTTP request"""
+    
+    def __init__(self, method, path, query, headers, body, keep_alive):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.keep_alive = keep_alive
+    
+    def param(self, name, default=None):
+        values = self.query.get(name)
+        return values[-1] if values else default
+    
+    def flag(self, name):
+        return self.param(name, '0').lower() in ('1', 'true', 'yes')
+    
+    def json(self):
+        """The body as a JSON object"""
+        try:
+            data = json.loads(self.body or b'{}')
+        except ValueError as e:
+            raise HttpError(400, f"Bad JSON body: {e}")
+        if not isinstance(data, dict):
+            raise HttpError(400, "The body must be a JSON object")
+        return data
+
+
+async def read_request(reader):
+    """Read one request from a connection; None once the client has hung up"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "Bad request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(400, "Bad Content-Length")
+    if length > Config.API_MAX_BODY_BYTES:
+        raise HttpError(413, f"Bodies are limited to {Config.API_MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b''
+    
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    url = urlsplit(target)
+    return Request(method.upper(), url.path, parse_qs(url.query), headers, body, keep_alive)
+
+
+def response_head(status, headers, keep_alive):
+    lines = [f"HTTP/1.1 {status} {REASONS[status]}"]
+    headers = dict(headers, Connection='keep-alive' if keep_alive else 'close')
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+class TaskApi:
+    """Answers HTTP requests against one TaskManager shared by worker threads"""
+    
+    # (method, path pattern, handler method name)
+    ROUTES = [
+        ('GET', re.compile(r'/tasks$'), 'list_tasks'),
+        ('POST', re.compile(r'/tasks$'), 'add_task'),
+        ('GET', re.compile(r'/tasks/(\d+)$'), 'get_task'),
+        ('DELETE', re.compile(r'/tasks/(\d+)$'), 'delete_task'),
+        ('POST', re.compile(r'/tasks/(\d+)/complete$'), 'complete_task'),
+        ('PUT', re.compile(r'/tasks/(\d+)/notes$'), 'set_notes'),
+        ('GET', re.compile(r'/search$'), 'search'),
+        ('GET', re.compile(r'/filter$'), 'filter'),
+    ]
+    
+    def __init__(self, tm, workers=None):
+        if not tm.thread_safe:
+            raise ValueError("The HTTP API needs a TaskManager(thread_safe=True)")
+        self.tm = tm
+        self.executor = ThreadPoolExecutor(workers or Config.API_WORKERS)
+    
+    def _call(self, function):
+        # Pick up changes other processes made to the task file
+        if self.tm.stale():
+            self.tm.refresh()
+        return function(self.tm)
+    
+    async def call(self, function):
+        """Run function(tm) in a worker thread"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._call,
+                                                                function)
+    
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client or an error closes it"""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    await self.send_json(writer, e.status, {'error': str(e)}, False)
+                    break
+                if request is None:
+                    break
+                try:
+                    await self.dispatch(request, writer)
+                except HttpError as e:
+                    await self.send_json(writer, e.status, {'error': str(e)}, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def dispatch(self, request, writer):
+        """Find the route for a request and send its response"""
+        path_matched = False
+        for method, pattern, name in self.ROUTES:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                path_matched = True
+                continue
+            try:
+                result = await getattr(self, name)(request, *match.groups())
+            except HttpError:
+                raise
+            except ValueError as e:
+                raise HttpError(400, str(e))
+            except Exception as e:
+                raise HttpError(500, str(e))
+            if isinstance(result, Listing):
+                await self.send_listing(writer, result, request.keep_alive)
+            else:
+                status, body = result
+                await self.send_json(writer, status, body, request.keep_alive)
+            return
+        if path_matched:
+            raise HttpError(405, f"{request.method} is not allowed on {request.path}")
+        raise HttpError(404, f"No route for {request.path}")
+    
+    async def send_json(self, writer, status, body, keep_alive):
+        data = json.dumps(body).encode()
+        writer.write(response_head(status, {'Content-Type': 'application/json',
+                                            'Content-Length': len(data)}, keep_alive) + data)
+        await writer.drain()
+    
+    async def send_listing(self, writer, listing, keep_alive):
+        """Stream tasks as NDJSON, one chunk per batch so other requests get turns"""
+        headers = {'Content-Type': 'application/x-ndjson', 'Transfer-Encoding': 'chunked'}
+        if listing.cursor is not None:
+            headers['X-Next-Cursor'] = listing.cursor
+        writer.write(response_head(200, headers, keep_alive))
+        tasks = listing.tasks
+        for start in range(0, len(tasks), Config.API_STREAM_BATCH):
+            chunk = ''.join(json.dumps(task) + '\n'
+                            for task in tasks[start:start + Config.API_STREAM_BATCH]).encode()
+            writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            await writer.drain()
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+    
+    # Route handlers return a Listing to stream, or (status, JSON body)
+    
+    async def list_tasks(self, request):
+        show_all = request.flag('all')
+        if not any(request.param(name) for name in ('sort', 'limit', 'after')):
+            return Listing(await self.call(lambda tm: snapshot(
+                tm.list_tasks(show_completed=show_all, archived=show_all))))
+        limit = request.param('limit')
+        
+        def page(tm):
+            tasks, cursor = tm.list_sorted(request.param('sort', 'id'),
+                                           None if limit is None else int(limit),
+                                           request.param('after'), show_completed=show_all,
+                                           archived=show_all)
+            return Listing(snapshot(tasks), cursor)
+        return await self.call(page)
+    
+    async def add_task(self, request):
+        data = request.json()
+        description = str(data.get('description', '')).strip()
+        if not description:
+            raise HttpError(400, "Task description cannot be empty")
+        tags = data.get('tags') or []
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            raise HttpError(400, "tags must be a list of strings")
+        priority = data.get('priority', Config.DEFAULT_PRIORITY)
+        if not isinstance(priority, str) or priority.lower() not in Config.PRIORITY_LEVELS:
+            raise HttpError(400, f"priority must be one of {', '.join(Config.PRIORITY_LEVELS)}")
+        notes = data.get('notes', '')
+        if not isinstance(notes, str):
+            raise HttpError(400, "notes must be a string")
+        task = await self.call(lambda tm: tm.add_task(
+            description, priority.lower(), tags, notes).to_dict())
+        return 201, task
+    
+    async def get_task(self, request, task_id):
+        task = await self.call(lambda tm: tm.get_task_by_id(int(task_id)))
+        return self._found(task, task_id)
+    
+    async def delete_task(self, request, task_id):
+        task = await self.call(lambda tm: tm.delete_task(int(task_id)))
+        return self._found(task, task_id)
+    
+    async def complete_task(self, request, task_id):
+        task = await self.call(lambda tm: changed(tm, tm.complete_task, int(task_id)))
+        return self._found(task, task_id)
+    
+    async def set_notes(self, request, task_id):
+        notes = request.json().get('notes')
+        if not isinstance(notes, str):
+            raise HttpError(400, "notes must be a string")
+        task = await self.call(lambda tm: changed(tm, tm.add_note, int(task_id), notes))
+        return self._found(task, task_id)
+    
+    async def search(self, request):
+        keyword = request.param('q')
+        if not keyword:
+            raise HttpError(400, "Missing q")
+        mode = request.param('mode', Config.SEARCH_MODE)
+        return Listing(await self.call(lambda tm: snapshot(
+            tm.search_tasks(keyword, mode=mode, archived=request.flag('archived')))))
+    
+    async def filter(self, request):
+        query = request.param('q')
+        if not query:
+            raise HttpError(400, "Missing q")
+        return Listing(await self.call(lambda tm: snapshot(
+            tm.filter_by_tags(query, archived=request.flag('archived')))))
+    
+    def _found(self, task, task_id):
+        if not task:
+            raise HttpError(404, f"Task {task_id} not found")
+        return 200, task if isinstance(task, dict) else task.to_dict()
+    
+    async def start(self, host=None, port=None):
+        """Start listening; returns the asyncio server"""
+        return await asyncio.start_server(self.handle_connection, host or Config.API_HOST,
+                                          Config.API_PORT if port is None else port)
+    
+    def close(self):
+        self.executor.shutdown()
+        self.tm.close()
+
+
+class Listing:
+    """Tasks to stream as NDJSON, with the cursor of the next page if there is one"""
+    
+    def __init__(self, tasks, cursor=None):
+        self.tasks = tasks
+        self.cursor = cursor
+
+
+def snapshot(tasks):
+    """Copy tasks to plain dicts in the worker thread, off the event loop"""
+    return [task.to_dict() for task in tasks]
+
+
+def changed(tm, change, task_id, *args):
+    """Make a change to a task and return the task as changed, or None if it is missing"""
+    # One transaction, so no other thread deletes the task in between
+    with tm.transaction():
+        return change(task_id, *args) and tm.get_task_by_id(task_id).to_dict()
+
+
+def serve(host=None, port=None):
+    """Run the HTTP API until interrupted (task-03 http [port])"""
+    from task_03.task_manager import TaskManager
+    api = TaskApi(TaskManager(thread_safe=True))
+    
+    async def run():
+        server = await api.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving {api.tm.filename} on http://{address[0]}:{address[1]} (Ctrl-C to stop)")
+        async with server:
+            await server.serve_forever()
+    # Let kill stop the server as cleanly as Ctrl-C does
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+    return 0
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+Cold storage for old completed tasks
+"""
+
+from task_03.journal import TaskJournal
+from task_03.models import Task
+
+
+class TaskArchive:
+    """Append-only segment of archived tasks, read only when asked for"""
+    
+    def __init__(self, filename, sync=None):
+        self.filename = filename
+        self.journal = TaskJournal(filename, sync)
+        self._tasks = None
+        self._size = None
+    
+    def append(self, tasks):
+        """Add tasks to the end of the archive"""
+        self.journal.extend([task.to_dict() for task in tasks])
+    
+    def tasks(self):
+        """Every archived task in id order, re-read only when the file has changed"""
+        size = self.journal.size()
+        if self._tasks is None or size != self._size:
+            by_id = {}
+            for data in self.journal.read():
+                by_id[data['id']] = Task.from_dict(data)
+            self._tasks = [by_id[task_id] for task_id in sorted(by_id)]
+            self._size = self.journal.size()
+        return self._tasks
\ No newline at end of file
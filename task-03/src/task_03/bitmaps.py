@@ -0,0 +1,219 @@
+"""
+Compressed bitmaps of task ids for tag queries
+"""
+
+# Values are split into 16-bit chunks as in roaring bitmaps. A chunk is a set
+# of low bits while sparse and a bitset (a bytearray, so bits can be set in
+# place) once it holds more than SPARSE_LIMIT values, where the 8 KiB bitset
+# becomes the smaller form. Set operations between bitsets run on ints.
+CHUNK_BITS = 16
+LOW_MASK = (1 << CHUNK_BITS) - 1
+CHUNK_BYTES = (1 << CHUNK_BITS) // 8
+SPARSE_LIMIT = 4096
+
+
+def _to_bits(values):
+    """Bitset with the given bits set"""
+    bits = bytearray(CHUNK_BYTES)
+    for value in values:
+        bits[value >> 3] |= 1 << (value & 7)
+    return bits
+
+
+def _to_int(bits):
+    return int.from_bytes(bits, 'little')
+
+
+def _from_int(number):
+    return bytearray(number.to_bytes(CHUNK_BYTES, 'little'))
+
+
+def _to_values(bits):
+    """Positions of the set bits of a bitset, lowest first"""
+    # Reversed binary digits, so a digit's index is its bit position
+    digits = bin(_to_int(bits))[:1:-1]
+    values = []
+    position = digits.find('1')
+    while position != -1:
+        values.append(position)
+        position = digits.find('1', position + 1)
+    return values
+
+
+def _is_set(bits, value):
+    return bits[value >> 3] >> (value & 7) & 1
+
+
+def _normalize(chunk):
+    """Return the cheaper form of a chunk, or None if it is empty"""
+    if isinstance(chunk, bytearray):
+        count = _to_int(chunk).bit_count()
+        if not count:
+            return None
+        if count <= SPARSE_LIMIT:
+            return set(_to_values(chunk))
+        return chunk
+    if not chunk:
+        return None
+    if len(chunk) > SPARSE_LIMIT:
+        return _to_bits(chunk)
+    return chunk
+
+
+def _copy(chunk):
+    return bytearray(chunk) if isinstance(chunk, bytearray) else set(chunk)
+
+
+def _and(a, b):
+    if isinstance(a, bytearray) and isinstance(b, bytearray):
+        return _from_int(_to_int(a) & _to_int(b))
+    if isinstance(a, bytearray):
+        a, b = b, a
+    if isinstance(b, bytearray):
+        return {value for value in a if _is_set(b, value)}
+    return a & b
+
+
+def _or(a, b):
+    if isinstance(a, bytearray) and isinstance(b, bytearray):
+        return _from_int(_to_int(a) | _to_int(b))
+    if isinstance(a, bytearray):
+        a, b = b, a
+    if isinstance(b, bytearray):
+        bits = bytearray(b)
+        for value in a:
+            bits[value >> 3] |= 1 << (value & 7)
+        return bits
+    return a | b
+
+
+def _and_not(a, b):
+    if isinstance(a, bytearray) and isinstance(b, bytearray):
+        return _from_int(_to_int(a) & ~_to_int(b))
+    if isinstance(a, bytearray):
+        bits = bytearray(a)
+        for value in b:
+            bits[value >> 3] &= ~(1 << (value & 7)) & 0xFF
+        return bits
+    if isinstance(b, bytearray):
+        return {value for value in a if not _is_set(b, value)}
+    return a - b
+
+
+class Bitmap:
+    """Set of non-negative ints with fast &, | and - between bitmaps"""
+    
+    __slots__ = ('chunks',)
+    
+    def __init__(self, values=()):
+        self.chunks = {}
+        for value in values:
+            self.add(value)
+    
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Wrap a chunks dict, such as one saved from another bitmap"""
+        bitmap = cls.__new__(cls)
+        # marshal reads bitsets back as bytes
+        bitmap.chunks = {high: bytearray(chunk) if isinstance(chunk, bytes) else chunk
+                         for high, chunk in chunks.items()}
+        return bitmap
+    
+    @classmethod
+    def _wrap(cls, chunks):
+        bitmap = cls.__new__(cls)
+        bitmap.chunks = chunks
+        return bitmap
+    
+    def add(self, value):
+        """Add a value, returning False if it was already present"""
+        high, low = value >> CHUNK_BITS, value & LOW_MASK
+        chunk = self.chunks.get(high)
+        if chunk is None:
+            self.chunks[high] = {low}
+        elif isinstance(chunk, bytearray):
+            if _is_set(chunk, low):
+                return False
+            chunk[low >> 3] |= 1 << (low & 7)
+        else:
+            if low in chunk:
+                return False
+            chunk.add(low)
+            if len(chunk) > SPARSE_LIMIT:
+                self.chunks[high] = _to_bits(chunk)
+        return True
+    
+    def discard(self, value):
+        high, low = value >> CHUNK_BITS, value & LOW_MASK
+        chunk = self.chunks.get(high)
+        if chunk is None:
+            return
+        if isinstance(chunk, bytearray):
+            # Bitsets stay dense until they are empty; counting on every discard costs too much
+            chunk[low >> 3] &= ~(1 << (low & 7)) & 0xFF
+            empty = chunk.count(0) == CHUNK_BYTES
+        else:
+            chunk.discard(low)
+            empty = not chunk
+        if empty:
+            del self.chunks[high]
+    
+    def __contains__(self, value):
+        chunk = self.chunks.get(value >> CHUNK_BITS)
+        if chunk is None:
+            return False
+        low = value & LOW_MASK
+        if isinstance(chunk, bytearray):
+            return bool(_is_set(chunk, low))
+        return low in chunk
+    
+    def __len__(self):
+        return sum(_to_int(chunk).bit_count() if isinstance(chunk, bytearray) else len(chunk)
+                   for chunk in self.chunks.values())
+    
+    def __bool__(self):
+        return bool(self.chunks)
+    
+    def __iter__(self):
+        """Yield the values in increasing order"""
+        for high in sorted(self.chunks):
+            chunk = self.chunks[high]
+            base = high << CHUNK_BITS
+            lows = _to_values(chunk) if isinstance(chunk, bytearray) else sorted(chunk)
+            for low in lows:
+                yield base | low
+    
+    def __and__(self, other):
+        small, large = sorted((self.chunks, other.chunks), key=len)
+        chunks = {}
+        for high, chunk in small.items():
+            if high in large:
+                result = _normalize(_and(chunk, large[high]))
+                if result is not None:
+                    chunks[high] = result
+        return Bitmap._wrap(chunks)
+    
+    def __or__(self, other):
+        chunks = {}
+        for high in self.chunks.keys() | other.chunks.keys():
+            if high not in other.chunks:
+                chunks[high] = _copy(self.chunks[high])
+            elif high not in self.chunks:
+                chunks[high] = _copy(other.chunks[high])
+            else:
+                chunks[high] = _normalize(_or(self.chunks[high], other.chunks[high]))
+        return Bitmap._wrap(chunks)
+    
+    def __sub__(self, other):
+        chunks = {}
+        for high, chunk in self.chunks.items():
+            if high in other.chunks:
+                result = _normalize(_and_not(chunk, other.chunks[high]))
+            else:
+                result = _copy(chunk)
+            if result is not None:
+                chunks[high] = result
+        return Bitmap._wrap(chunks)
+    
+    def __repr__(self):
+        return f"Bitmap({list(self)!r})"
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+Startup cache of decoded tasks and their indexes
+"""
+
+import hashlib
+import marshal
+import struct
+from task_03.config import Config
+from task_03.durability import SyncPolicy, atomic_write
+from task_03.snapshot import decode_tasks, encode_tasks
+
+CACHE_VERSION = 4
+HEADER_LENGTH = struct.Struct('<I')
+
+
+def file_fingerprint(filename, stamp):
+    """Combine a change stamp with a hash of the first bytes of a file"""
+    try:
+        with open(filename, 'rb') as f:
+            prefix = hashlib.sha1(f.read(Config.CACHE_HASH_BYTES)).hexdigest()
+    except FileNotFoundError:
+        prefix = None
+    return stamp, prefix
+
+
+class StartupCache:
+    """Decoded tasks and index contents saved next to the task file.
+
+    The cache is only used while its fingerprint matches the task file, and
+    is disposable: it is never fsynced and any error reading it is a miss.
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self.sync = SyncPolicy('none')
+    
+    def load(self, fingerprint):
+        """Return (tasks, next_id, index_states) if the cache matches, else None"""
+        try:
+            with open(self.filename, 'rb') as f:
+                # The header is read on its own so a miss stops here
+                header_length, = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+                if marshal.loads(f.read(header_length)) != (CACHE_VERSION, fingerprint):
+                    return None
+                # marshal.load on a file reads in small pieces; loads is much faster
+                body = marshal.loads(f.read())
+            tasks, next_id = decode_tasks(body['tasks'])
+        except (OSError, EOFError, ValueError, TypeError, KeyError, struct.error):
+            return None
+        return tasks, next_id, body['indexes']
+    
+    def save(self, fingerprint, tasks, next_id, index_states):
+        """Replace the cache with the given state; return whether it was written"""
+        header = marshal.dumps((CACHE_VERSION, fingerprint))
+        body = {'tasks': encode_tasks(tasks, next_id, 'none'), 'indexes': index_states}
+        try:
+            atomic_write(self.filename, HEADER_LENGTH.pack(len(header)) + header +
+                         marshal.dumps(body), self.sync)
+        except OSError:
+            # Like a failed read, a failed write only costs the next start a parse
+            return False
+        return True
\ No newline at end of file
@@ -2,12 +2,18 @@
 Command-line interface for the Task Manager application
 """
 
+import os
 import sys
-from task_03.task_manager import TaskManager
-from utils import (format_task_table, format_search_results, format_task_detail,
-                   format_tags_list, parse_add_command, parse_tags,
-                   print_success, print_error)
-from config import Config
+from task_03 import utils
+from task_03.locking import FileLock
+from task_03.models import add_record
+from task_03.storage import (backend_for, default_filename, export_json, migrate_json,
+                             open_storage)
+from task_03.utils import (format_task_table, format_search_results, format_task_detail,
+                           format_query_plan, format_tag_tree, format_tags_list,
+                           parse_add_command, parse_tags,
+                           print_success, print_error)
+from task_03.config import Config
 
 
 def print_help():
@@ -18,21 +24,40 @@ def print_help():
 BASIC COMMANDS:
   add <description> [priority] [#tags]  - Add a new task (priority: low/medium/high)
   list                                  - List all pending tasks
-  list all                              - List all tasks including completed
-  search <keyword>                      - Search tasks by keyword
+  list all                              - List all tasks including completed and archived
+  list [all] --sort priority,-created --limit 20
+                                        - Sorted pages (fields: priority, created, id)
+  list [all] ... --after <cursor>       - The next page, using the cursor of the last one
+  search <keyword>                      - Search tasks by keyword in description/notes
+  search --ranked <words>               - Tasks with every word, best matches first
+  search --archived <keyword>           - Search archived tasks too
   complete <id>                         - Mark task as completed
   delete <id>                           - Delete a task
 
 TAG COMMANDS:
-  tag <id> #tag1 #tag2                 - Add tags to a task
-  untag <id> #tag1 #tag2               - Remove tags from a task
-  tags                                  - List all tags in use
-  filter #tag                           - Show tasks with specific tag
+  tag <id> [<id> ...] #tag1 #tag2     - Add tags to one or more tasks
+  untag <id> [<id> ...] #tag1 #tag2   - Remove tags from one or more tasks
+  tags                                  - List all tags in use with task counts
+  tags --tree                           - Show nested tags (#a/b/c) as a tree
+  filter #tag [--archived]              - Show tasks with specific tag
+  filter #a #b -#c                      - Tasks with #a and #b but not #c
+  filter #a|#b                          - Tasks with #a or #b
+  filter #client/acme                   - Also matches #client/acme/infra etc.
+  query <terms>                         - Combine tags, priority:, status:, created>, id: and text
+  explain <terms>                       - Show how a query is answered and the rows examined
 
 NOTE COMMANDS:
   note <id> <note text>                - Add/update note for a task
   view <id>                             - View full task details with notes
 
+STORAGE COMMANDS:
+  migrate [tasks.json] [tasks.db]       - Import a JSON task file into SQLite
+  migrate [tasks.json] tasks.jsonl      - Import a JSON task file into the lines format
+  migrate [tasks.json] tasks.bin        - Import a JSON task file into a binary snapshot
+  export <tasks.bin> <tasks.json>       - Write any task file back out as JSON
+  recover                               - Salvage intact tasks from a damaged task file
+  archive [days]                        - Archive completed tasks older than [days] days
+
 OTHER:
   help                                  - Show this help message
   exit                                  - Exit the program
@@ -42,6 +67,7 @@ Examples:
   tag 1 #important #work
   note 1 Remember to buy milk and eggs
   filter #shopping
+  query #work priority:high status:pending created>2026-01-01 "deploy"
   view 1
 """
     print(help_text)
@@ -59,49 +85,127 @@ def handle_add(tm, args):
         print_error("Task description cannot be empty")
         return
     
-    task = tm.add_task(description, priority, tags)
+    tm.add_task(description, priority, tags)
+    print_added(description, tags)
+
+
+def print_added(description, tags):
     msg = f"Task added: {description}"
     if tags:
         msg += f" (Tags: {' '.join(tags)})"
     print_success(msg)
 
 
+def append_task(storage, args):
+    """Add a task by appending to storage, without reading the tasks already stored.
+    
+    Returns False, having written nothing, when the format has to be loaded
+    in full to pick the new id (a JSON or binary file, or an old snapshot).
+    """
+    description, priority, tags = parse_add_command(' '.join(args))
+    if not description:
+        return False
+    
+    # The same lock and change counter a TaskManager save uses, so open
+    # sessions notice the new task
+    lock = FileLock(storage.filename + Config.LOCK_SUFFIX)
+    try:
+        with lock:
+            storage.refresh()
+            with storage.transaction():
+                task_id = storage.next_id()
+                if task_id is None:
+                    return False
+                storage.append(add_record(task_id, description, priority, tags))
+            lock.bump()
+    finally:
+        lock.close()
+    print_added(description, tags)
+    if storage.wants_compaction():
+        # Fold the journal into a fresh snapshot, as a loaded session would;
+        # the TaskManager takes the lock itself, so ours is released first
+        from task_03.task_manager import TaskManager
+        tm = TaskManager(storage=storage)
+        tm.compact()
+        tm.close()
+    return True
+
+
 def handle_list(tm, args):
     """Handle the list command"""
     show_all = len(args) > 0 and args[0].lower() == 'all'
-    tasks = tm.list_tasks(show_completed=show_all)
-    print(format_task_table(tasks))
+    options = {}
+    rest = args[1:] if show_all else args
+    while len(rest) >= 2 and rest[0] in ('--sort', '--limit', '--after'):
+        options[rest[0][2:]] = rest[1]
+        rest = rest[2:]
+    if rest:
+        print_error("Usage: list [all] [--sort field,-field] [--limit n] [--after cursor]")
+        return
+    if not options:
+        tasks = tm.list_tasks(show_completed=show_all, archived=show_all)
+        print(format_task_table(tasks))
+        return
+    
+    try:
+        limit = int(options['limit']) if 'limit' in options else None
+        tasks, cursor = tm.list_sorted(options.get('sort', 'id'), limit, options.get('after'),
+                                       show_completed=show_all, archived=show_all)
+    except ValueError as e:
+        print_error(str(e))
+        return
+    print(format_task_table(tasks, cursor))
 
 
 def handle_search(tm, args):
     """Handle the search command"""
+    mode = Config.SEARCH_MODE
+    archived = False
+    while args and args[0] in ('--ranked', '--substring', '--archived'):
+        if args[0] == '--archived':
+            archived = True
+        else:
+            mode = args[0][2:]
+        args = args[1:]
+    
     if len(args) < 1:
-        print_error("Usage: search <keyword>")
+        print_error("Usage: search [--ranked|--substring] [--archived] <keyword>")
         return
     
     keyword = ' '.join(args)
-    results = tm.search_tasks(keyword)
+    results = tm.search_tasks(keyword, mode=mode, archived=archived)
     print(format_search_results(results, keyword))
 
 
+def split_ids_and_tags(args):
+    """Split 'tag'/'untag' arguments into the leading task ids and the #tags after them"""
+    # The first argument must be an id; words that are neither ids nor tags are skipped
+    task_ids = [int(args[0])]
+    rest = args[1:]
+    while rest and rest[0].isdigit():
+        task_ids.append(int(rest.pop(0)))
+    return task_ids, [arg for arg in rest if arg.startswith('#')]
+
+
 def handle_tag(tm, args):
     """Handle the tag command - add tags to a task"""
     if len(args) < 2:
-        print_error("Usage: tag <id> #tag1 #tag2 ...")
+        print_error("Usage: tag <id> [<id> ...] #tag1 #tag2 ...")
         return
     
     try:
-        task_id = int(args[0])
-        tags = [arg for arg in args[1:] if arg.startswith('#')]
-        
+        task_ids, tags = split_ids_and_tags(args)
         if not tags:
             print_error("Please provide at least one tag (starting with #)")
             return
         
-        if tm.add_tags(task_id, tags):
-            print_success(f"Added tags {' '.join(tags)} to task {task_id}")
-        else:
-            print_error(f"Task {task_id} not found")
+        # Save once for all the tasks instead of once per task
+        with tm.transaction():
+            for task_id in task_ids:
+                if tm.add_tags(task_id, tags):
+                    print_success(f"Added tags {' '.join(tags)} to task {task_id}")
+                else:
+                    print_error(f"Task {task_id} not found")
     except ValueError:
         print_error("Invalid task ID. Please provide a number.")
 
@@ -109,40 +213,66 @@ def handle_tag(tm, args):
 def handle_untag(tm, args):
     """Handle the untag command - remove tags from a task"""
     if len(args) < 2:
-        print_error("Usage: untag <id> #tag1 #tag2 ...")
+        print_error("Usage: untag <id> [<id> ...] #tag1 #tag2 ...")
         return
     
     try:
-        task_id = int(args[0])
-        tags = [arg for arg in args[1:] if arg.startswith('#')]
-        
+        task_ids, tags = split_ids_and_tags(args)
         if not tags:
             print_error("Please provide at least one tag (starting with #)")
             return
         
-        if tm.remove_tags(task_id, tags):
-            print_success(f"Removed tags {' '.join(tags)} from task {task_id}")
-        else:
-            print_error(f"Task {task_id} not found")
+        # Save once for all the tasks instead of once per task
+        with tm.transaction():
+            for task_id in task_ids:
+                if tm.remove_tags(task_id, tags):
+                    print_success(f"Removed tags {' '.join(tags)} from task {task_id}")
+                else:
+                    print_error(f"Task {task_id} not found")
     except ValueError:
         print_error("Invalid task ID. Please provide a number.")
 
 
 def handle_tags(tm, args):
-    """Handle the tags command - list all tags"""
-    all_tags = tm.get_all_tags()
-    print(format_tags_list(all_tags))
+    """Handle the tags command - list all tags with usage counts"""
+    if '--tree' in args:
+        print(format_tag_tree(tm.get_tag_tree()))
+        return
+    counts = tm.get_tag_counts()
+    print(format_tags_list(list(counts), counts))
 
 
 def handle_filter(tm, args):
-    """Handle the filter command - show tasks with specific tag"""
+    """Handle the filter command - show tasks matching a tag query"""
+    archived = '--archived' in args
+    args = [arg for arg in args if arg != '--archived']
+    if len(args) < 1:
+        print_error("Usage: filter #tag [#tag|#other] [-#excluded] [--archived]")
+        return
+    
+    query = ' '.join(args)
+    try:
+        results = tm.filter_by_tags(query, archived=archived)
+    except ValueError as e:
+        print_error(str(e))
+        return
+    print(format_search_results(results, query))
+
+
+def handle_query(tm, args, explain=False):
+    """Handle the query and explain commands - run a compound query"""
     if len(args) < 1:
-        print_error("Usage: filter #tag")
+        print_error(f"Usage: {'explain' if explain else 'query'} <terms>")
         return
     
-    tag = args[0]
-    results = tm.search_by_tag(tag)
-    print(format_search_results(results, tag))
+    text = ' '.join(args)
+    try:
+        if explain:
+            print(format_query_plan(tm.explain(text)))
+        else:
+            print(format_task_table(tm.query(text)))
+    except ValueError as e:
+        print_error(str(e))
 
 
 def handle_note(tm, args):
@@ -171,8 +301,11 @@ def handle_view(tm, args):
     
     try:
         task_id = int(args[0])
-        task = tm.get_task_by_id(task_id)
-        print(format_task_detail(task))
+        task = tm.get_task_by_id(task_id, archived=True)
+        if task:
+            print(format_task_detail(task))
+        else:
+            print_error(f"Task {task_id} not found")
     except ValueError:
         print_error("Invalid task ID. Please provide a number.")
 
@@ -210,14 +343,72 @@ def handle_delete(tm, args):
         print_error("Invalid task ID. Please provide a number.")
 
 
+def handle_migrate(tm, args):
+    """Handle the migrate command - import a JSON task file into SQLite or lines"""
+    source = args[0] if len(args) > 0 else Config.DEFAULT_FILENAME
+    target = args[1] if len(args) > 1 else Config.SQLITE_FILENAME
+    
+    try:
+        count = migrate_json(source, target)
+    except Exception as e:
+        print_error(f"Migration failed: {e}")
+        return
+    print_success(f"Imported {count} task(s) from {source} into {target}")
+    print(f"Set STORAGE_BACKEND = '{backend_for(target)}' in config.py to use the new file.")
+
+
+def handle_export(tm, args):
+    """Handle the export command - write a task file of any backend out as JSON"""
+    if len(args) < 2:
+        print_error("Usage: export <source> <tasks.json>")
+        return
+    
+    source, target = args[0], args[1]
+    try:
+        count = export_json(source, target)
+    except Exception as e:
+        print_error(f"Export failed: {e}")
+        return
+    print_success(f"Exported {count} task(s) from {source} to {target}")
+
+
+def handle_archive(tm, args):
+    """Handle the archive command - move old completed tasks out of the working set"""
+    try:
+        days = int(args[0]) if args else Config.ARCHIVE_AFTER_DAYS
+    except ValueError:
+        print_error("Usage: archive [days]")
+        return
+    
+    archived = tm.archive_tasks(days)
+    print_success(f"Archived {len(archived)} completed task(s) older than {days} day(s)")
+
+
+def handle_recover(tm, args):
+    """Handle the recover command - rewrite the task file from its intact records"""
+    try:
+        report = tm.recover()
+    except Exception as e:
+        print_error(f"Recovery failed: {e}")
+        return
+    if report.damaged:
+        print_error(report.summary())
+    else:
+        print_success(report.summary())
+
+
 def process_command(tm, command):
     """Process a single command"""
-    parts = command.split(maxsplit=1)
-    if not parts:
+    return process_args(tm, command.split())
+
+
+def process_args(tm, argv):
+    """Process a command already split into arguments, keeping any spaces inside them"""
+    if not argv:
         return True
     
-    cmd = parts[0].lower()
-    args = parts[1].split() if len(parts) > 1 else []
+    cmd = argv[0].lower()
+    args = list(argv[1:])
     
     if cmd in ['exit', 'quit']:
         print("Goodbye!")
@@ -247,6 +438,12 @@ def process_command(tm, command):
     elif cmd == 'filter':
         handle_filter(tm, args)
     
+    elif cmd == 'query':
+        handle_query(tm, args)
+    
+    elif cmd == 'explain':
+        handle_query(tm, args, explain=True)
+    
     elif cmd == 'note':
         handle_note(tm, args)
     
@@ -259,6 +456,18 @@ def process_command(tm, command):
     elif cmd == 'delete':
         handle_delete(tm, args)
     
+    elif cmd == 'migrate':
+        handle_migrate(tm, args)
+    
+    elif cmd == 'export':
+        handle_export(tm, args)
+    
+    elif cmd == 'recover':
+        handle_recover(tm, args)
+    
+    elif cmd == 'archive':
+        handle_archive(tm, args)
+    
     else:
         print_error(f"Unknown command: {cmd}")
         print("Type 'help' for available commands.")
@@ -266,9 +475,126 @@ def process_command(tm, command):
     return True
 
 
-def main():
+class ScriptFailed(Exception):
+    """Raised to undo a --strict script after its first failing command"""
+
+
+def run_script(tm, lines, strict=False):
+    """Run commands from a script as one batch, all undone if --strict stops at an error"""
+    with tm.batch():
+        for number, line in enumerate(lines, 1):
+            command = line.strip()
+            if not command or command.startswith('#'):
+                continue
+            errors = utils.errors_printed()
+            try:
+                if not process_command(tm, command):
+                    break
+            except Exception as e:
+                print_error(str(e))
+            if strict and utils.errors_printed() > errors:
+                print_error(f"Stopped at line {number}: {command}")
+                # Leave the task file as it was before the script
+                raise ScriptFailed()
+
+
+def open_task_manager(storage=None):
+    """Load the tasks; print why and return None if the task file holds an invalid task"""
+    # Imported only when the tasks have to be loaded, so an appended add
+    # never loads the index, query and cache modules
+    from task_03.task_manager import TaskManager
+    try:
+        return TaskManager(storage=storage)
+    except ValueError as e:
+        print_error(str(e))
+        if storage is not None:
+            storage.close()
+        return None
+
+
+def run_script_file(path, strict=False):
+    """Run a script file, or standard input for '-', against one TaskManager"""
+    tm = open_task_manager()
+    if tm is None:
+        return 1
+    try:
+        if path == '-':
+            run_script(tm, sys.stdin, strict)
+        else:
+            with open(path, encoding='utf-8') as f:
+                run_script(tm, f, strict)
+    except ScriptFailed:
+        return 1
+    except OSError as e:
+        print_error(str(e))
+        return 1
+    finally:
+        tm.close()
+    return 0
+
+
+def run_command(argv):
+    """Run a single command given as arguments, e.g. task-03 add "deploy hotfix" high #ops"""
+    if argv[0].lower() == 'help':
+        print_help()
+        return 0
+    # A running daemon already has the tasks loaded
+    if os.path.exists(default_filename() + Config.SOCKET_SUFFIX):
+        from task_03.daemon import forward
+        status = forward(argv)
+        if status is not None:
+            return status
+    
+    storage = open_storage()
+    if argv[0].lower() == 'add' and append_task(storage, argv[1:]):
+        storage.close()
+        return 0
+    
+    tm = open_task_manager(storage)
+    if tm is None:
+        return 1
+    try:
+        return 0 if execute_command(tm, argv) else 1
+    finally:
+        tm.close()
+
+
+def execute_command(tm, argv):
+    """Process one command, printing any exception as an error; return whether it succeeded"""
+    errors = utils.errors_printed()
+    try:
+        process_args(tm, argv)
+    except Exception as e:
+        print_error(str(e))
+    return utils.errors_printed() == errors
+
+
+def main(argv=None):
     """Main function to run the CLI"""
-    tm = TaskManager()
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        strict = '--strict' in argv
+        args = [arg for arg in argv if arg != '--strict']
+        if args[:1] == ['-'] and len(args) == 1:
+            return run_script_file('-', strict)
+        if args[:1] == ['run'] and len(args) == 2:
+            return run_script_file(args[1], strict)
+        if args == ['serve']:
+            from task_03.daemon import serve
+            return serve()
+        if args[:1] == ['http'] and len(args) <= 2:
+            from task_03.api import serve
+            try:
+                port = int(args[1]) if len(args) == 2 else None
+            except ValueError:
+                print_error("Usage: task-03 http [port]")
+                return 2
+            return serve(port=port)
+        return run_command(args)
+    
+    tm = open_task_manager()
+    if tm is None:
+        return 1
     print(f"Welcome to {Config.APP_NAME}!")
     print("Type 'help' for available commands.\n")
     
@@ -279,15 +605,20 @@ def main():
             if not command:
                 continue
             
+            # Pick up changes other processes made while we waited for input
+            tm.refresh()
             if not process_command(tm, command):
                 break
-                
+        
         except KeyboardInterrupt:
             print("\nGoodbye!")
             break
         except Exception as e:
             print_error(str(e))
+    
+    tm.close()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
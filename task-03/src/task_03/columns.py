@@ -0,0 +1,193 @@
+"""
+Optional NumPy column view over the task list for bulk filtering
+"""
+
+from task_03.models import Priority
+from task_03.utils import normalize_tag
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ColumnarIndex:
+    """Column arrays of id, priority, completed and created_at, plus tag membership.
+
+    Kept up to date like the other secondary indexes: every change removes
+    and re-adds one task, which only touches that task's row. Rows of
+    deleted tasks are dead until more than half the rows are dead.
+    """
+    
+    INITIAL_CAPACITY = 1024
+    
+    def __init__(self):
+        if np is None:
+            raise ImportError("The columnar view needs numpy (pip install numpy)")
+        self.size = 0
+        self.dead = 0
+        self.rows = {}
+        self.ids = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.priority = np.zeros(self.INITIAL_CAPACITY, dtype=np.int8)
+        self.completed = np.zeros(self.INITIAL_CAPACITY, dtype=bool)
+        self.created_at = np.zeros(self.INITIAL_CAPACITY, dtype=np.float64)
+        self.live = np.zeros(self.INITIAL_CAPACITY, dtype=bool)
+        # Sparse task x tag matrix in coordinate form, one entry per (row, tag)
+        self.tag_codes = {}
+        self.entries = 0
+        self.entry_rows = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.entry_tags = np.zeros(self.INITIAL_CAPACITY, dtype=np.int32)
+        self.entry_live = np.zeros(self.INITIAL_CAPACITY, dtype=bool)
+        self.row_entries = {}
+    
+    def _grow(self, names, needed):
+        """Double the arrays named until they hold at least needed items"""
+        capacity = len(getattr(self, names[0]))
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in names:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+    
+    def add(self, task):
+        """Write a task into its row, appending a row for new ids"""
+        row = self.rows.get(task.id)
+        if row is not None and self.live[row]:
+            # Re-added without a remove; drop the stale tag entries
+            start, end = self.row_entries[row]
+            self.entry_live[start:end] = False
+        elif row is None:
+            self._grow(('ids', 'priority', 'completed', 'created_at', 'live'), self.size + 1)
+            row = self.size
+            self.size += 1
+            self.rows[task.id] = row
+        else:
+            self.dead -= 1
+        self.ids[row] = task.id
+        self.priority[row] = task.priority
+        self.completed[row] = task.completed
+        self.created_at[row] = task.created_at
+        self.live[row] = True
+        
+        codes = {self.tag_codes.setdefault(normalize_tag(tag), len(self.tag_codes))
+                 for tag in task.tags}
+        self._grow(('entry_rows', 'entry_tags', 'entry_live'), self.entries + len(codes))
+        start = self.entries
+        for offset, code in enumerate(sorted(codes)):
+            self.entry_rows[start + offset] = row
+            self.entry_tags[start + offset] = code
+        self.entry_live[start:start + len(codes)] = True
+        self.entries += len(codes)
+        self.row_entries[row] = (start, self.entries)
+    
+    def add_many(self, tasks):
+        """Append rows for many tasks not yet in the view, filling each column at once"""
+        count = len(tasks)
+        start = self.size
+        end = start + count
+        self._grow(('ids', 'priority', 'completed', 'created_at', 'live'), end)
+        self.ids[start:end] = np.fromiter((task.id for task in tasks), np.int64, count)
+        self.priority[start:end] = np.fromiter((task.priority for task in tasks), np.int8, count)
+        self.completed[start:end] = np.fromiter((task.completed for task in tasks), bool, count)
+        self.created_at[start:end] = np.fromiter((task.created_at for task in tasks),
+                                                 np.float64, count)
+        self.live[start:end] = True
+        self.rows.update(zip(self.ids[start:end].tolist(), range(start, end)))
+        self.size = end
+        
+        entry_rows = []
+        entry_tags = []
+        for row, task in enumerate(tasks, start):
+            codes = sorted({self.tag_codes.setdefault(normalize_tag(tag), len(self.tag_codes))
+                            for tag in task.tags})
+            self.row_entries[row] = (self.entries + len(entry_rows),
+                                     self.entries + len(entry_rows) + len(codes))
+            entry_rows.extend([row] * len(codes))
+            entry_tags.extend(codes)
+        first = self.entries
+        self.entries += len(entry_rows)
+        self._grow(('entry_rows', 'entry_tags', 'entry_live'), self.entries)
+        self.entry_rows[first:self.entries] = entry_rows
+        self.entry_tags[first:self.entries] = entry_tags
+        self.entry_live[first:self.entries] = True
+    
+    def remove(self, task):
+        """Mark a task's row and tag entries dead"""
+        row = self.rows.get(task.id)
+        if row is None or not self.live[row]:
+            return
+        self.live[row] = False
+        start, end = self.row_entries.pop(row)
+        self.entry_live[start:end] = False
+        self.dead += 1
+        if self.dead * 2 > self.size:
+            self._compact()
+    
+    def _compact(self):
+        """Drop dead rows and dead tag entries"""
+        keep = self.live[:self.size]
+        new_rows = np.cumsum(keep) - 1
+        for name in ('ids', 'priority', 'completed', 'created_at', 'live'):
+            column = getattr(self, name)
+            kept = column[:self.size][keep]
+            column[:len(kept)] = kept
+            column[len(kept):] = 0
+        self.size = int(keep.sum())
+        self.dead = 0
+        self.rows = {int(task_id): row for row, task_id in enumerate(self.ids[:self.size])}
+        
+        entry_keep = self.entry_live[:self.entries]
+        rows = new_rows[self.entry_rows[:self.entries][entry_keep]]
+        tags = self.entry_tags[:self.entries][entry_keep]
+        self.entries = len(rows)
+        self.entry_rows[:self.entries] = rows
+        self.entry_tags[:self.entries] = tags
+        self.entry_live[:self.entries] = True
+        self.entry_live[self.entries:] = False
+        # Entries of one row stay contiguous, so their ranges can be recomputed;
+        # rows without tags keep an empty range
+        self.row_entries = dict.fromkeys(range(self.size), (0, 0))
+        if self.entries:
+            boundaries = np.flatnonzero(np.diff(rows)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [self.entries]))
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self.row_entries[int(rows[start])] = (start, end)
+    
+    def mask(self, completed=None, priority=None, created_after=None, created_before=None,
+             tag=None):
+        """Boolean mask over the rows of live tasks matching every given predicate"""
+        mask = self.live[:self.size].copy()
+        if completed is not None:
+            mask &= self.completed[:self.size] == bool(completed)
+        if priority is not None:
+            if isinstance(priority, (str, int)):
+                priority = [priority]
+            codes = [int(Priority.parse(p)) for p in priority]
+            mask &= np.isin(self.priority[:self.size], codes)
+        if created_after is not None:
+            mask &= self.created_at[:self.size] >= created_after
+        if created_before is not None:
+            mask &= self.created_at[:self.size] < created_before
+        if tag is not None:
+            code = self.tag_codes.get(normalize_tag(tag))
+            tagged = np.zeros(self.size, dtype=bool)
+            if code is not None:
+                entries = (self.entry_tags[:self.entries] == code) & self.entry_live[:self.entries]
+                tagged[self.entry_rows[:self.entries][entries]] = True
+            mask &= tagged
+        return mask
+    
+    def select(self, **predicates):
+        """Ids of the tasks matching every predicate, in row order"""
+        return self.ids[:self.size][self.mask(**predicates)].tolist()
+    
+    def priority_counts(self, **predicates):
+        """Number of matching tasks per priority name"""
+        codes = self.priority[:self.size][self.mask(**predicates)]
+        counts = np.bincount(codes, minlength=len(Priority))
+        return {str(priority): int(counts[priority]) for priority in Priority}
\ No newline at end of file
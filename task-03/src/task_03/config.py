@@ -9,6 +9,69 @@ class Config:
     DEFAULT_FILENAME = 'tasks.json'
     JSON_INDENT = 2
     
+    # Storage backend: 'json', 'journal', 'sqlite', 'lines' or 'binary'
+    STORAGE_BACKEND = 'json'
+    SQLITE_FILENAME = 'tasks.db'
+    
+    # Binary snapshot backend; compression is 'none', 'zlib' or 'lzma'
+    BINARY_FILENAME = 'tasks.bin'
+    BINARY_COMPRESSION = 'zlib'
+    
+    # Lines backend: one task per line plus a binary offset index
+    LINES_FILENAME = 'tasks.jsonl'
+    LINES_INDEX_SUFFIX = '.idx'
+    LINES_COMPACT_BYTES = 1024 * 1024
+    
+    # Journal settings (append one record per change instead of rewriting)
+    JOURNAL_SUFFIX = '.journal'
+    JOURNAL_COMPACT_BYTES = 1024 * 1024
+    # Next id of a journal-backed task file, so one-shot adds skip reading the journal
+    NEXT_ID_SUFFIX = '.next'
+    
+    # Durability: 'always' fsyncs every save, 'batched' lets the saves made
+    # within DURABILITY_INTERVAL_MS share one fsync, 'none' leaves it to the OS
+    DURABILITY = 'always'
+    DURABILITY_INTERVAL_MS = 50
+    
+    # Recovery of damaged task files: unreadable bytes go to a side file
+    QUARANTINE_SUFFIX = '.damaged'
+    RECOVERY_CHUNK_BYTES = 1024 * 1024
+    RECOVERY_MAX_RECORD_BYTES = 1024 * 1024
+    
+    # Archive: completed tasks created more than ARCHIVE_AFTER_DAYS ago can be
+    # moved to a side file that is only read when archived tasks are asked for
+    ARCHIVE_SUFFIX = '.archive'
+    ARCHIVE_AFTER_DAYS = 30
+    
+    # Startup cache: decoded tasks and indexes reused while the task file's
+    # size, mtime and first CACHE_HASH_BYTES are unchanged
+    STARTUP_CACHE = True
+    CACHE_SUFFIX = '.cache'
+    CACHE_HASH_BYTES = 64 * 1024
+    
+    # Lock file guarding the task file when several processes share it
+    LOCK_SUFFIX = '.lock'
+    
+    # Daemon (task-03 serve): Unix socket next to the task file, and the
+    # largest length-prefixed JSON message either side accepts
+    SOCKET_SUFFIX = '.sock'
+    DAEMON_MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+    
+    # HTTP API (task-03 http): listening address, worker threads running the
+    # TaskManager, largest request body, and tasks per streamed chunk
+    API_HOST = '127.0.0.1'
+    API_PORT = 8765
+    API_WORKERS = 4
+    API_MAX_BODY_BYTES = 1024 * 1024
+    API_STREAM_BATCH = 500
+    
+    # Thread-safe TaskManager: reads run side by side and return lists of their
+    # own, changes run one at a time and replace the tasks they edit
+    THREAD_SAFE = False
+    
+    # Deleted tasks leave a gap until more than this share of the list is gaps
+    TOMBSTONE_COMPACT_RATIO = 0.5
+    
     # Priority levels
     PRIORITY_LEVELS = ['low', 'medium', 'high']
     DEFAULT_PRIORITY = 'medium'
@@ -35,6 +98,20 @@ class Config:
     # Date format
     DATE_FORMAT = "%Y-%m-%d"
     
+    # Search settings: 'substring' (match any part of the text) or 'ranked' (BM25 over words)
+    SEARCH_MODE = 'substring'
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+    # Trigram index to speed up substring search (costs extra memory)
+    TRIGRAM_INDEX = False
+    # NumPy column view for bulk filtering of large task lists (needs numpy)
+    COLUMNAR_VIEW = False
+    # The query planner intersects another index only while it holds at most
+    # this many times the current candidates; larger ones are checked per task
+    QUERY_INTERSECT_RATIO = 8
+    # Sorted listings (list --sort) kept up to date in memory at once
+    SORTED_VIEWS = 4
+    
     # Tag settings
     TAG_PREFIX = "#"
     MAX_TAGS_DISPLAY = 5
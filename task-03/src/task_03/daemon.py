@@ -0,0 +1,236 @@
+"""
+Long-running daemon that keeps the tasks in memory, and the client that forwards to it
+
+Both sides speak length-prefixed JSON over a Unix socket next to the task
+file: a 4-byte big-endian length, then that many bytes of UTF-8 JSON. The
+client sends {"argv": [...]} and the daemon answers {"output": "...",
+"status": 0 or 1}, on the same connection as often as the client likes.
+"""
+
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+from contextlib import contextmanager
+from task_03.config import Config
+from task_03.storage import default_filename
+from task_03.utils import print_error
+
+HEADER = struct.Struct('>I')
+
+
+def socket_path(filename=None):
+    """The daemon socket for a task file, by default the configured backend's file"""
+    return (filename or default_filename()) + Config.SOCKET_SUFFIX
+
+
+def write_message(stream, message):
+    """Send one message as a length prefix and its JSON"""
+    data = json.dumps(message).encode()
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError("Connection closed mid-message")
+    return data
+
+
+def read_message(stream):
+    """Receive one message; EOFError once the other side has hung up"""
+    header = stream.read(HEADER.size)
+    if not header:
+        raise EOFError("Connection closed")
+    if len(header) < HEADER.size:
+        raise EOFError("Connection closed mid-message")
+    (size,) = HEADER.unpack(header)
+    if size > Config.DAEMON_MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message of {size} bytes is larger than DAEMON_MAX_MESSAGE_BYTES")
+    return json.loads(read_exactly(stream, size))
+
+
+class DaemonClient:
+    """Connection to a running daemon"""
+    
+    def __init__(self, path=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(path or socket_path())
+        except OSError:
+            self.sock.close()
+            raise
+        self.stream = self.sock.makefile('rwb')
+    
+    def run(self, argv):
+        """Run a command in the daemon; return its (output, exit status)"""
+        write_message(self.stream, {'argv': list(argv)})
+        reply = read_message(self.stream)
+        return reply['output'], reply['status']
+    
+    def close(self):
+        try:
+            self.stream.close()
+        except OSError:
+            # The daemon hung up before taking the rest of a request
+            pass
+        self.sock.close()
+
+
+def forward(argv, path=None):
+    """Run a command in the daemon if one is running; return its exit status, or None"""
+    try:
+        client = DaemonClient(path)
+    except OSError:
+        # No socket, or one left behind by a daemon that is gone
+        return None
+    try:
+        output, status = client.run(argv)
+    except (OSError, EOFError, ValueError, KeyError):
+        # The daemon died or is shutting down, or sent a reply we cannot use
+        return None
+    finally:
+        client.close()
+    sys.stdout.write(output)
+    return status
+
+
+class ThreadOutput:
+    """Stands in for sys.stdout so each handler thread prints into its own buffer"""
+    
+    def __init__(self):
+        self.stream = sys.stdout
+        self.local = threading.local()
+        self._installing = threading.Lock()
+    
+    def write(self, text):
+        return getattr(self.local, 'buffer', self.stream).write(text)
+    
+    def flush(self):
+        getattr(self.local, 'buffer', self.stream).flush()
+    
+    def install(self):
+        """Take over sys.stdout, again if something has replaced it since"""
+        with self._installing:
+            if sys.stdout is not self:
+                self.stream, sys.stdout = sys.stdout, self
+    
+    def uninstall(self):
+        with self._installing:
+            if sys.stdout is self:
+                sys.stdout = self.stream
+    
+    @contextmanager
+    def capture(self):
+        """Collect what the current thread prints in the block"""
+        self.install()
+        self.local.buffer = io.StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            del self.local.buffer
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Answers the requests of one client connection until it hangs up"""
+    
+    def handle(self):
+        while True:
+            try:
+                request = read_message(self.rfile)
+            except EOFError:
+                return
+            except ValueError as e:
+                write_message(self.wfile, {'output': f"Error: {e}\n", 'status': 1})
+                return
+            write_message(self.wfile, self.server.daemon.run(request.get('argv') or []))
+
+
+class TaskDaemon:
+    """Serves commands from clients against one TaskManager kept in memory.
+    
+    Each connection gets a thread. The TaskManager must be thread-safe:
+    its reads run side by side while changes take it alone, so a reader
+    never sees a half-applied change.
+    """
+    
+    def __init__(self, tm, path=None):
+        if not tm.thread_safe:
+            raise ValueError("The daemon needs a TaskManager(thread_safe=True)")
+        self.tm = tm
+        self.path = path or socket_path(tm.filename)
+        self.output = ThreadOutput()
+        self.server = socketserver.ThreadingUnixStreamServer(self.path, DaemonHandler,
+                                                             bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.daemon = self
+    
+    def start(self):
+        """Bind the socket, replacing one a dead daemon left behind"""
+        if os.path.exists(self.path):
+            try:
+                DaemonClient(self.path).close()
+            except OSError:
+                os.remove(self.path)
+            else:
+                raise RuntimeError(f"A daemon is already serving {self.path}")
+        self.server.server_bind()
+        self.server.server_activate()
+    
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.output.uninstall()
+    
+    def shutdown(self):
+        """Stop serve_forever from another thread"""
+        self.server.shutdown()
+    
+    def close(self):
+        """Close the socket and the TaskManager"""
+        self.server.server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.tm.close()
+    
+    def run(self, argv):
+        """Run one command; return its output and exit status as a reply message"""
+        from task_03.cli import execute_command
+        # Pick up changes other processes made to the task file
+        if self.tm.stale():
+            self.tm.refresh()
+        with self.output.capture() as buffer:
+            ok = execute_command(self.tm, argv)
+        return {'output': buffer.getvalue(), 'status': 0 if ok else 1}
+
+
+def serve():
+    """Run the daemon until interrupted (task-03 serve)"""
+    if not hasattr(socket, 'AF_UNIX'):
+        print_error("The daemon needs Unix domain sockets")
+        return 1
+    from task_03.task_manager import TaskManager
+    daemon = TaskDaemon(TaskManager(thread_safe=True))
+    try:
+        daemon.start()
+    except RuntimeError as e:
+        daemon.tm.close()
+        print_error(str(e))
+        return 1
+    # Let kill stop the daemon as cleanly as Ctrl-C does
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Serving {daemon.tm.filename} on {daemon.path} (Ctrl-C to stop)")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+    return 0
\ No newline at end of file
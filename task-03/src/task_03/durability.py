@@ -0,0 +1,115 @@
+"""
+Crash-safe file writes and the fsync policy shared by the storage backends
+"""
+
+import os
+import threading
+from task_03.config import Config
+
+DURABILITY_MODES = ('always', 'batched', 'none')
+
+
+class SyncPolicy:
+    """Decides when written files are fsynced.
+
+    'always' syncs before every write returns. 'batched' is group commit:
+    files written within DURABILITY_INTERVAL_MS of the first unsynced write
+    share a single fsync, done by a timer (or on flush/close); a file that
+    replaces another is still synced before the rename, so only recent
+    writes can be lost, never the whole file. 'none' leaves flushing to the
+    operating system.
+    """
+    
+    def __init__(self, mode=None, interval_ms=None):
+        self.mode = mode or Config.DURABILITY
+        if self.mode not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {self.mode}")
+        if interval_ms is None:
+            interval_ms = Config.DURABILITY_INTERVAL_MS
+        self.interval = interval_ms / 1000
+        self.fsync_count = 0
+        self._pending = set()
+        self._timer = None
+        self._lock = threading.Lock()
+    
+    def _fsync(self, fd):
+        os.fsync(fd)
+        self.fsync_count += 1
+    
+    def sync(self, f):
+        """Make an open, flushed file durable according to the policy"""
+        if self.mode == 'always':
+            self._fsync(f.fileno())
+        elif self.mode == 'batched':
+            self.sync_later(f.name)
+    
+    def sync_replacement(self, f):
+        """Sync a flushed file about to be renamed over another, unless syncing is off"""
+        # Group commit can batch the rename, but not the data it points at
+        if self.mode != 'none':
+            self._fsync(f.fileno())
+    
+    def sync_later(self, filename):
+        """Queue a file for the next group fsync"""
+        if self.mode == 'none':
+            return
+        if self.mode == 'always':
+            self._fsync_path(filename)
+            return
+        with self._lock:
+            self._pending.add(os.path.abspath(filename))
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def _fsync_path(self, filename):
+        try:
+            fd = os.open(filename, os.O_RDONLY)
+        except FileNotFoundError:
+            # Replaced or removed since; its successor was queued on its own
+            return
+        try:
+            self._fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def flush(self):
+        """Fsync every queued file now"""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for filename in sorted(pending):
+            self._fsync_path(filename)
+    
+    def close(self):
+        """Flush queued files and stop the timer"""
+        self.flush()
+
+
+def sync_directory(directory, policy):
+    """Make a rename inside a directory durable"""
+    # Windows cannot open directories; its renames are flushed with the file
+    if os.name != 'nt':
+        policy.sync_later(directory)
+
+
+def atomic_write(filename, data, policy):
+    """Replace a file with new contents so readers see the old or the new file, never a mix"""
+    # A name of its own per process and thread, so writers that only share
+    # the task file lock (such as startup cache saves) never rename each other's file
+    temp_filename = f"{filename}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(temp_filename, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+            f.flush()
+            # The data must be on disk before the rename can point at it
+            policy.sync_replacement(f)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+    sync_directory(os.path.dirname(os.path.abspath(filename)), policy)
\ No newline at end of file
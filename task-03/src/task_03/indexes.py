@@ -0,0 +1,449 @@
+"""
+Secondary indexes that TaskManager keeps up to date as tasks change
+"""
+
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from task_03.bitmaps import Bitmap
+from task_03.config import Config
+from task_03.utils import normalize_tag
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Split text into lowercase words"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def task_text(task):
+    """Return the searchable text of a task (description and notes)"""
+    return task['description'] + '\n' + task.get('notes', '')
+
+
+class SecondaryIndex:
+    """Base for indexes whose contents can be saved in the startup cache"""
+    
+    def state(self):
+        """Return the contents of the index as marshallable values"""
+        return vars(self)
+    
+    def restore(self, state):
+        """Replace the contents of the index with a saved state"""
+        self.__dict__.update(state)
+
+
+def tag_path(tag):
+    """Normalized segments of a hierarchical tag: '#Client/Acme' -> ['client', 'acme']"""
+    # Empty segments are kept as written, so '#a/' is a tag of its own and not '#a'
+    return normalize_tag(tag).split('/')
+
+
+def parse_tag_query(text):
+    """Split a tag query into (required, excluded) lists of alternatives
+
+    Terms are separated by spaces and must all match; '#a|#b' matches
+    either tag and a leading '-' excludes tasks matching the term, so
+    '#work #urgent -#blocked' and '#home|#errand' are both queries. A tag
+    also matches the tags below it: '#client' matches '#client/acme'.
+    """
+    required, excluded = [], []
+    for term in text.split():
+        target = required
+        if term.startswith('-'):
+            target, term = excluded, term[1:]
+        tags = [normalize_tag(tag) for tag in term.split('|') if normalize_tag(tag)]
+        if not tags:
+            raise ValueError(f"Empty tag in query: {text!r}")
+        target.append(tags)
+    if not required and not excluded:
+        raise ValueError("Empty tag query")
+    return required, excluded
+
+
+def matches_tag_query(task, query):
+    """Check one task against a parsed tag query"""
+    required, excluded = query
+    tags = set()
+    for tag in task.get('tags', []):
+        path = tag_path(tag)
+        # Each tag stands for itself and every tag above it
+        tags.update('/'.join(path[:depth]) for depth in range(1, len(path) + 1))
+    return (all(tags.intersection(term) for term in required) and
+            not any(tags.intersection(term) for term in excluded))
+
+
+class TagNode:
+    """One segment of the tag tree"""
+    
+    __slots__ = ('children', 'exact', 'ids', 'extra')
+    
+    def __init__(self):
+        self.children = {}
+        # Tasks tagged with exactly this path
+        self.exact = Bitmap()
+        # Tasks tagged at or below this path; leaves use exact instead
+        self.ids = None
+        # References beyond the first, for tasks with several tags in the subtree
+        self.extra = Counter()
+    
+    def subtree(self):
+        """Ids of tasks tagged at or below this node"""
+        return self.exact if self.ids is None else self.ids
+    
+    def state(self):
+        return (self.exact.chunks, None if self.ids is None else self.ids.chunks,
+                dict(self.extra),
+                {segment: child.state() for segment, child in self.children.items()})
+    
+    @classmethod
+    def from_state(cls, state):
+        exact, ids, extra, children = state
+        node = cls()
+        node.exact = Bitmap.from_chunks(exact)
+        node.ids = None if ids is None else Bitmap.from_chunks(ids)
+        node.extra.update(extra)
+        node.children = {segment: cls.from_state(child) for segment, child in children.items()}
+        return node
+    
+    def _ref(self, task_id):
+        if not self.ids.add(task_id):
+            self.extra[task_id] += 1
+    
+    def _unref(self, task_id):
+        if self.extra[task_id]:
+            self.extra[task_id] -= 1
+            if not self.extra[task_id]:
+                del self.extra[task_id]
+        else:
+            self.ids.discard(task_id)
+
+
+class TagTree:
+    """Prefix trie over tag paths; every node knows the tasks of its whole subtree"""
+    
+    def __init__(self):
+        self.root = TagNode()
+    
+    def add(self, path, task_id):
+        """Tag a task with a path, counting it under every node above"""
+        node = self.root.children.get(path[0])
+        if node is None:
+            node = self.root.children[path[0]] = TagNode()
+        for segment in path[1:]:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = TagNode()
+                if node.ids is None:
+                    # First child: the subtree so far is just this node's own tasks
+                    node.ids = Bitmap() | node.exact
+            node._ref(task_id)
+            node = child
+        if node.exact.add(task_id) and node.ids is not None:
+            node._ref(task_id)
+    
+    def remove(self, path, task_id):
+        """Undo add, dropping nodes no task is left under"""
+        nodes = [self.root]
+        for segment in path:
+            node = nodes[-1].children.get(segment)
+            if node is None:
+                return
+            nodes.append(node)
+        node = nodes[-1]
+        if task_id not in node.exact:
+            return
+        node.exact.discard(task_id)
+        for node in nodes[1:]:
+            if node.ids is not None:
+                node._unref(task_id)
+        for segment, parent, node in zip(reversed(path), reversed(nodes[:-1]), reversed(nodes[1:])):
+            if not node.children:
+                node.ids = None
+                node.extra.clear()
+                if not node.exact:
+                    del parent.children[segment]
+    
+    def _find(self, path):
+        node = self.root
+        for segment in path:
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+    
+    def exact(self, path):
+        """Ids of tasks tagged with exactly the path"""
+        node = self._find(path)
+        return Bitmap() if node is None else node.exact
+    
+    def subtree(self, path):
+        """Ids of tasks tagged with the path or anything below it"""
+        node = self._find(path)
+        return Bitmap() if node is None else node.subtree()
+    
+    def walk(self):
+        """Yield (depth, segment, task count) for every node, depth first in name order"""
+        stack = [(0, segment, node) for segment, node in sorted(self.root.children.items(),
+                                                                 reverse=True)]
+        while stack:
+            depth, segment, node = stack.pop()
+            yield depth, segment, len(node.subtree())
+            stack.extend((depth + 1, child_segment, child) for child_segment, child
+                         in sorted(node.children.items(), reverse=True))
+
+
+class TagIndex(SecondaryIndex):
+    """Maps normalized tag paths to bitmaps of the ids of the tasks that carry them"""
+    
+    def __init__(self):
+        self.tree = TagTree()
+        # Path of each tag as written, so tasks sharing a tag only split it once
+        self._paths = {}
+        self.counts = {}
+        # Sorted tag names; names whose count dropped to 0 are pruned lazily
+        self._names = []
+        self._stale = False
+    
+    def add(self, task):
+        """Index the tags of a task"""
+        task_id = task['id']
+        tags = set(task.get('tags', []))
+        for path in {self._paths.get(tag) or self._path(tag) for tag in tags}:
+            self.tree.add(path, task_id)
+        for tag in tags:
+            if tag not in self.counts:
+                self.counts[tag] = 0
+                position = bisect_left(self._names, tag)
+                if position == len(self._names) or self._names[position] != tag:
+                    insort(self._names, tag)
+            self.counts[tag] += 1
+    
+    def remove(self, task):
+        """Drop the tags of a task from the index"""
+        task_id = task['id']
+        tags = set(task.get('tags', []))
+        for path in {self._paths.get(tag) or self._path(tag) for tag in tags}:
+            self.tree.remove(path, task_id)
+        for tag in tags:
+            self.counts[tag] -= 1
+            if self.counts[tag] == 0:
+                del self.counts[tag]
+                self._stale = True
+    
+    def _path(self, tag):
+        path = self._paths[tag] = tuple(tag_path(tag))
+        return path
+    
+    def lookup(self, tag):
+        """Return the ids of tasks carrying a tag (case and # insensitive)"""
+        return self.tree.exact(tag_path(tag))
+    
+    def query(self, query):
+        """Return a bitmap of the ids of tasks matching a parsed tag query"""
+        required, excluded = query
+        if not required:
+            raise ValueError("A tag query needs at least one tag that is not excluded")
+        # AND the rarest alternatives first so the running result stays small
+        terms = sorted((self.union(term) for term in required), key=len)
+        result = terms[0]
+        for bitmap in terms[1:]:
+            if not result:
+                break
+            result = result & bitmap
+        for term in excluded:
+            result = result - self.union(term)
+        return result
+    
+    def union(self, tags):
+        """Bitmap of the tasks carrying any of the given normalized tags or their descendants"""
+        bitmaps = [self.tree.subtree(tag.split('/')) for tag in tags]
+        bitmaps = [bitmap for bitmap in bitmaps if bitmap]
+        if not bitmaps:
+            return Bitmap()
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = result | bitmap
+        return result
+    
+    def state(self):
+        # Bitmaps are saved as their chunk dicts, which marshal can write
+        state = dict(vars(self))
+        state['tree'] = self.tree.root.state()
+        return state
+    
+    def restore(self, state):
+        super().restore(state)
+        tree = TagTree()
+        tree.root = TagNode.from_state(self.tree)
+        self.tree = tree
+    
+    def names(self):
+        """Return every tag in use, sorted"""
+        if self._stale:
+            self._names = [tag for tag in self._names if tag in self.counts]
+            self._stale = False
+        return list(self._names)
+
+
+class FieldIndex(SecondaryIndex):
+    """Bitmaps of task ids per priority and per status, and ids in creation order"""
+    
+    def __init__(self):
+        self.priorities = {}
+        self.statuses = {}
+        # Parallel lists sorted by creation time, for range lookups by bisection
+        self.created_times = []
+        self.created_ids = []
+    
+    def add(self, task):
+        """Index the priority, status and creation time of a task"""
+        for buckets, key in ((self.priorities, int(task.priority)), (self.statuses, task.completed)):
+            if key not in buckets:
+                buckets[key] = Bitmap()
+            buckets[key].add(task.id)
+        position = bisect_right(self.created_times, task.created_at)
+        self.created_times.insert(position, task.created_at)
+        self.created_ids.insert(position, task.id)
+    
+    def remove(self, task):
+        """Drop a task from the index"""
+        self.priorities[int(task.priority)].discard(task.id)
+        self.statuses[task.completed].discard(task.id)
+        position = bisect_left(self.created_times, task.created_at)
+        while self.created_ids[position] != task.id:
+            position += 1
+        del self.created_times[position]
+        del self.created_ids[position]
+    
+    def priority_ids(self, priority):
+        """Bitmap of the ids of tasks with a priority"""
+        return self.priorities.get(int(priority), Bitmap())
+    
+    def status_ids(self, completed):
+        """Bitmap of the ids of completed (or pending) tasks"""
+        return self.statuses.get(bool(completed), Bitmap())
+    
+    def created_range(self, op, timestamp):
+        """Slice of created_ids holding tasks whose creation time compares to timestamp with op"""
+        times = self.created_times
+        if op == '>':
+            return bisect_right(times, timestamp), len(times)
+        if op == '>=':
+            return bisect_left(times, timestamp), len(times)
+        if op == '<':
+            return 0, bisect_left(times, timestamp)
+        if op == '<=':
+            return 0, bisect_right(times, timestamp)
+        raise ValueError(f"Unknown comparison: {op}")
+    
+    def state(self):
+        state = dict(vars(self))
+        state['priorities'] = {key: ids.chunks for key, ids in self.priorities.items()}
+        state['statuses'] = {key: ids.chunks for key, ids in self.statuses.items()}
+        return state
+    
+    def restore(self, state):
+        super().restore(state)
+        self.priorities = {key: Bitmap.from_chunks(chunks) for key, chunks in self.priorities.items()}
+        self.statuses = {key: Bitmap.from_chunks(chunks) for key, chunks in self.statuses.items()}
+
+
+class TextIndex(SecondaryIndex):
+    """Inverted word index over task descriptions and notes, ranked with BM25"""
+    
+    def __init__(self):
+        self.postings = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+    
+    def add(self, task):
+        """Index the words of a task"""
+        words = tokenize(task_text(task))
+        for word, count in Counter(words).items():
+            self.postings.setdefault(word, {})[task['id']] = count
+        self.doc_lengths[task['id']] = len(words)
+        self.total_length += len(words)
+    
+    def remove(self, task):
+        """Drop the words of a task from the index"""
+        for word in set(tokenize(task_text(task))):
+            postings = self.postings.get(word)
+            if postings is not None:
+                postings.pop(task['id'], None)
+                if not postings:
+                    del self.postings[word]
+        self.total_length -= self.doc_lengths.pop(task['id'], 0)
+    
+    def search(self, query):
+        """Return ids of tasks containing every query word, best match first"""
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+        postings = [self.postings.get(word, {}) for word in words]
+        # Intersect starting from the rarest word to keep the candidate set small
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for word_postings in postings[1:]:
+            candidates.intersection_update(word_postings)
+            if not candidates:
+                return []
+        
+        doc_count = len(self.doc_lengths)
+        average_length = self.total_length / doc_count if doc_count else 0
+        k1, b = Config.BM25_K1, Config.BM25_B
+        scores = {}
+        for word_postings in postings:
+            df = len(word_postings)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for task_id in candidates:
+                tf = word_postings[task_id]
+                norm = 1 - b + b * self.doc_lengths[task_id] / (average_length or 1)
+                scores[task_id] = scores.get(task_id, 0) + idf * tf * (k1 + 1) / (tf + k1 * norm)
+        return sorted(candidates, key=lambda task_id: (-scores[task_id], task_id))
+
+
+def trigrams(text):
+    """Return the set of 3-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex(SecondaryIndex):
+    """Trigram index over lowercased descriptions and notes for substring search"""
+    
+    def __init__(self):
+        self.postings = {}
+    
+    def _task_trigrams(self, task):
+        """Trigrams of each searchable field, kept apart so none spans two fields"""
+        return (trigrams(task['description'].lower()) |
+                trigrams(task.get('notes', '').lower()))
+    
+    def add(self, task):
+        """Index the trigrams of a task"""
+        for gram in self._task_trigrams(task):
+            self.postings.setdefault(gram, set()).add(task['id'])
+    
+    def remove(self, task):
+        """Drop the trigrams of a task from the index"""
+        for gram in self._task_trigrams(task):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(task['id'])
+                if not ids:
+                    del self.postings[gram]
+    
+    def candidates(self, keyword):
+        """Return ids of tasks that may contain keyword, or None if any task may"""
+        grams = trigrams(keyword.lower())
+        if not grams:
+            return None
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                break
+        return candidates
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Append-only operation journal for the Task Manager
+"""
+
+import json
+import os
+import warnings
+from task_03.config import Config
+from task_03.durability import SyncPolicy, atomic_write
+
+
+class TaskJournal:
+    """Append-only log of task mutations stored next to the task file"""
+    
+    def __init__(self, filename, sync=None):
+        self.filename = filename
+        # SyncPolicy deciding when appended records are fsynced
+        self.sync = sync
+    
+    def append(self, record):
+        """Append a single mutation record as one compact JSON line"""
+        self.extend([record])
+    
+    def extend(self, records):
+        """Append several mutation records with a single write"""
+        lines = ''.join(json.dumps(record, separators=(',', ':')) + '\n'
+                        for record in records)
+        with open(self.filename, 'a') as f:
+            f.write(lines)
+            if self.sync is not None:
+                f.flush()
+                self.sync.sync(f)
+    
+    def read(self):
+        """Yield every intact record in the journal, oldest first.
+        
+        A last line cut off mid-write is dropped. A complete line that does not
+        parse is moved to the quarantine file, so the records around it still
+        replay and the task file can be opened (and recovered) as usual.
+        """
+        if not os.path.exists(self.filename):
+            return
+        valid_bytes = 0
+        damaged = []
+        with open(self.filename, 'rb') as f:
+            for line in f:
+                # A line without a newline was cut off mid-write; ignore it
+                if not line.endswith(b'\n'):
+                    break
+                offset = valid_bytes
+                valid_bytes += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict):
+                    damaged.append((offset, line))
+                    continue
+                yield record
+        if damaged:
+            self._quarantine(damaged, valid_bytes)
+        # Drop the torn tail so the next append starts on a fresh line
+        elif valid_bytes < self.size():
+            with open(self.filename, 'r+b') as f:
+                f.truncate(valid_bytes)
+    
+    def _quarantine(self, damaged, valid_bytes):
+        """Move damaged lines to the quarantine file and rewrite the journal without them"""
+        quarantine_filename = self.filename + Config.QUARANTINE_SUFFIX
+        with open(quarantine_filename, 'ab') as f:
+            for offset, line in damaged:
+                f.write(b'--- %s offset %d, %d bytes\n' % (
+                    self.filename.encode(), offset, len(line)) + line)
+        with open(self.filename, 'rb') as f:
+            data = f.read(valid_bytes)
+        for offset, line in reversed(damaged):
+            data = data[:offset] + data[offset + len(line):]
+        atomic_write(self.filename, data, self.sync or SyncPolicy())
+        warnings.warn(f"Moved {len(damaged)} damaged record(s) from {self.filename} "
+                      f"to {quarantine_filename}")
+    
+    def size(self):
+        """Return the size of the journal file in bytes"""
+        try:
+            return os.path.getsize(self.filename)
+        except OSError:
+            return 0
+    
+    def clear(self):
+        """Remove all records from the journal"""
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
\ No newline at end of file
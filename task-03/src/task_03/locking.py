@@ -0,0 +1,163 @@
+"""
+Advisory file locking shared by Task Manager processes, and reader-writer
+locking for threads sharing one TaskManager
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on this platform; a single process is still safe
+    fcntl = None
+
+
+class FileLock:
+    """Reentrant advisory lock on a small file that also holds a change counter.
+    
+    Every process that saves the task file bumps the counter while holding
+    the lock, so the others can tell the file changed even when its mtime
+    and size happen to look the same.
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = None
+        self._depth = 0
+        # flock only keeps processes apart; threads of this one take turns here
+        self._mutex = threading.RLock()
+        self._owner = None
+    
+    @property
+    def held(self):
+        """Whether the current thread holds the lock"""
+        return self._depth > 0 and self._owner == threading.get_ident()
+    
+    def _open(self):
+        if self._file is None:
+            fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o644)
+            self._file = os.fdopen(fd, 'r+b')
+        return self._file
+    
+    def acquire(self, shared=False):
+        """Block until the lock is held; nested calls only count depth"""
+        self._mutex.acquire()
+        if self._depth == 0 and fcntl is not None:
+            fcntl.flock(self._open().fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        self._depth += 1
+        self._owner = threading.get_ident()
+    
+    def release(self):
+        """Release one level of the lock"""
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._mutex.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.release()
+    
+    @contextmanager
+    def shared(self):
+        """Hold the lock for reading; joins an exclusive lock already held"""
+        self.acquire(shared=True)
+        try:
+            yield self
+        finally:
+            self.release()
+    
+    def generation(self):
+        """Return the change counter stored in the lock file"""
+        f = self._open()
+        f.seek(0)
+        data = f.read(8)
+        return int.from_bytes(data, 'little') if len(data) == 8 else 0
+    
+    def bump(self):
+        """Increment the change counter; call while holding the lock"""
+        generation = self.generation() + 1
+        f = self._open()
+        f.seek(0)
+        f.write(generation.to_bytes(8, 'little'))
+        f.flush()
+        return generation
+    
+    def close(self):
+        """Close the lock file, releasing the lock if this thread holds it"""
+        while self.held:
+            self.release()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ReadWriteLock:
+    """Lets any number of threads read at once while a writer waits for them all.
+    
+    A waiting writer holds back new readers, so a steady stream of reads
+    cannot starve changes. A thread may nest reads, and reads inside its
+    own write, but cannot start writing while it reads. Both context
+    managers yield whether this is the thread's outermost hold.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = None
+        self._writers_waiting = 0
+        self._local = threading.local()
+    
+    @contextmanager
+    def reading(self):
+        """Hold the lock shared with other readers"""
+        depth = getattr(self._local, 'reads', 0)
+        if self._writer == threading.get_ident() or depth:
+            # Already safe inside this thread's own write or read
+            self._local.reads = depth + 1
+            try:
+                yield False
+            finally:
+                self._local.reads = depth
+            return
+        with self._condition:
+            while self._writer is not None or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        self._local.reads = 1
+        try:
+            yield True
+        finally:
+            self._local.reads = 0
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+    
+    @contextmanager
+    def writing(self):
+        """Hold the lock alone, once the readers already inside have left"""
+        if self._writer == threading.get_ident():
+            yield False
+            return
+        if getattr(self._local, 'reads', 0):
+            raise RuntimeError("A thread cannot start writing while it is reading")
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = threading.get_ident()
+        try:
+            yield True
+        finally:
+            with self._condition:
+                self._writer = None
+                self._condition.notify_all()
\ No newline at end of file
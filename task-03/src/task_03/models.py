@@ -0,0 +1,173 @@
+"""
+Compact task record used by the Task Manager
+"""
+
+import sys
+from datetime import datetime
+from enum import IntEnum
+from task_03.config import Config
+
+
+class Priority(IntEnum):
+    """Task priority levels, stored as small integers"""
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+    
+    @classmethod
+    def parse(cls, value):
+        """Convert a priority name ('high') or number into a Priority"""
+        if isinstance(value, str):
+            return cls[value.upper()]
+        return cls(value)
+    
+    @classmethod
+    def coerce(cls, value):
+        """Like parse, but unknown priorities (say a hand-edited 'urgent') become the default"""
+        try:
+            return cls.parse(value)
+        except (KeyError, ValueError, TypeError):
+            return cls.parse(Config.DEFAULT_PRIORITY)
+    
+    def __str__(self):
+        return self.name.lower()
+
+
+def parse_timestamp(value):
+    """Convert an ISO date string or epoch seconds into epoch seconds"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+class Task:
+    """A single task, readable and writable like the old task dictionaries"""
+    
+    # Slots instead of a per-task dict; priority is a Priority, created_at is
+    # epoch seconds and tags are interned, but task['priority'] and
+    # task['created_at'] still return the strings stored in the JSON file
+    FIELDS = ('id', 'description', 'priority', 'tags', 'notes', 'created_at', 'completed')
+    __slots__ = FIELDS
+    
+    def __init__(self, id, description, priority=Priority.MEDIUM, tags=None, notes='',
+                 created_at=None, completed=False):
+        self.id = id
+        self.description = description
+        self.priority = Priority.parse(priority)
+        self.tags = [sys.intern(tag) for tag in tags or []]
+        self.notes = notes
+        self.created_at = (datetime.now().timestamp() if created_at is None
+                           else parse_timestamp(created_at))
+        self.completed = bool(completed)
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a task from the dictionary form stored in JSON files"""
+        return cls(data['id'], data['description'], Priority.coerce(data.get('priority')),
+                   data.get('tags'), data.get('notes', ''), data.get('created_at'),
+                   data.get('completed', False))
+    
+    def to_dict(self):
+        """Return the dictionary form stored in JSON files"""
+        return {field: self[field] for field in self.FIELDS}
+    
+    def copy(self):
+        """Return a copy of the task with its own tags list"""
+        task = Task.__new__(Task)
+        for field in self.__slots__:
+            setattr(task, field, getattr(self, field))
+        task.tags = list(self.tags)
+        return task
+    
+    def update(self, other):
+        """Overwrite every field with the values of another task"""
+        for field in self.__slots__:
+            setattr(self, field, getattr(other, field))
+    
+    def apply(self, record):
+        """Change the fields of the task as described by a mutation record"""
+        op = record['op']
+        if op == 'complete':
+            self.completed = True
+        elif op == 'note':
+            self.notes = record['notes']
+        elif op == 'tag':
+            existing_tags = list(self.tags)
+            # Add new tags, avoid duplicates
+            for tag in record['tags']:
+                if tag not in existing_tags:
+                    existing_tags.append(tag)
+            self.tags = [sys.intern(tag) for tag in existing_tags]
+        elif op == 'untag':
+            existing_tags = list(self.tags)
+            for tag in record['tags']:
+                if tag in existing_tags:
+                    existing_tags.remove(tag)
+            self.tags = existing_tags
+        elif op == 'update':
+            if 'description' in record:
+                self.description = record['description']
+            if 'priority' in record:
+                self.priority = Priority.parse(record['priority'])
+            if 'tags' in record:
+                self.tags = [sys.intern(tag) for tag in record['tags']]
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+    
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        if key == 'priority':
+            return str(self.priority)
+        if key == 'created_at':
+            return datetime.fromtimestamp(self.created_at).isoformat()
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        # A write here would skip the TaskManager's indexes and journal
+        raise TypeError("Tasks are read-only as dictionaries; change them through "
+                        "TaskManager methods such as update_task, complete_task and add_tags")
+    
+    def get(self, key, default=None):
+        """Return a field like dict.get"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def keys(self):
+        return list(self.FIELDS)
+    
+    def __contains__(self, key):
+        return key in self.FIELDS
+    
+    def __iter__(self):
+        return iter(self.FIELDS)
+    
+    def __eq__(self, other):
+        if isinstance(other, Task):
+            return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+
+def add_record(task_id, description, priority='medium', tags=None, notes='', created_at=None):
+    """The 'add' mutation record for a new task, created now unless a time is given"""
+    # Normalized to the ISO form task files store, whether given as a string or epoch seconds
+    created_at = (datetime.now() if created_at is None
+                  else datetime.fromtimestamp(parse_timestamp(created_at)))
+    return {'op': 'add', 'task': {
+        'id': task_id,
+        'description': description,
+        'priority': priority,
+        'tags': tags or [],
+        'notes': notes,
+        'created_at': created_at.isoformat(),
+        'completed': False
+    }}
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""
+Compound task queries and the planner that picks which index answers them
+"""
+
+import operator
+import re
+import shlex
+from collections import namedtuple
+from task_03.bitmaps import Bitmap
+from task_03.config import Config
+from task_03.indexes import matches_tag_query, parse_tag_query
+from task_03.models import Priority, parse_timestamp
+
+CREATED_PATTERN = re.compile(r'created(>=|<=|>|<)(.+)$')
+COMPARISONS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+STATUSES = {'pending': False, 'done': True, 'completed': True}
+
+# The structures a plan may read: tasks by id, the TagIndex and the FieldIndex
+QueryIndexes = namedtuple('QueryIndexes', ['tasks', 'tags', 'fields'])
+
+
+class IdTerm:
+    """id:<n> - a single task"""
+    
+    negated = False
+    
+    def __init__(self, task_id):
+        self.task_id = task_id
+    
+    def estimate(self, indexes):
+        return int(self.task_id in indexes.tasks)
+    
+    def lookup(self, indexes):
+        return Bitmap([self.task_id] if self.task_id in indexes.tasks else [])
+    
+    def matches(self, task):
+        return task.id == self.task_id
+    
+    def __str__(self):
+        return f"id:{self.task_id}"
+
+
+class TagTerm:
+    """#tag, #a|#b or -#tag, matching nested tags as filter does"""
+    
+    def __init__(self, text):
+        self.text = text
+        self.query = parse_tag_query(text)
+        required, excluded = self.query
+        self.tags = (required or excluded)[0]
+        self.negated = bool(excluded)
+    
+    def estimate(self, indexes):
+        # An upper bound; tasks carrying several of the tags are counted twice
+        return sum(len(indexes.tags.tree.subtree(tag.split('/'))) for tag in self.tags)
+    
+    def lookup(self, indexes):
+        return indexes.tags.union(self.tags)
+    
+    def matches(self, task):
+        return matches_tag_query(task, self.query)
+    
+    def __str__(self):
+        return self.text
+
+
+class PriorityTerm:
+    """priority:high or priority:high,medium"""
+    
+    negated = False
+    
+    def __init__(self, priorities):
+        self.priorities = priorities
+    
+    def estimate(self, indexes):
+        return sum(len(indexes.fields.priority_ids(priority)) for priority in self.priorities)
+    
+    def lookup(self, indexes):
+        result = Bitmap()
+        for priority in self.priorities:
+            result = result | indexes.fields.priority_ids(priority)
+        return result
+    
+    def matches(self, task):
+        return task.priority in self.priorities
+    
+    def __str__(self):
+        return "priority:" + ','.join(str(priority) for priority in self.priorities)
+
+
+class StatusTerm:
+    """status:pending or status:done"""
+    
+    negated = False
+    
+    def __init__(self, completed):
+        self.completed = completed
+    
+    def estimate(self, indexes):
+        return len(indexes.fields.status_ids(self.completed))
+    
+    def lookup(self, indexes):
+        return indexes.fields.status_ids(self.completed)
+    
+    def matches(self, task):
+        return task.completed == self.completed
+    
+    def __str__(self):
+        return "status:" + ('done' if self.completed else 'pending')
+
+
+class CreatedTerm:
+    """created>DATE, created>=DATE, created<DATE or created<=DATE"""
+    
+    negated = False
+    
+    def __init__(self, op, text):
+        self.op = op
+        self.text = text
+        self.timestamp = parse_timestamp(text)
+    
+    def estimate(self, indexes):
+        start, end = indexes.fields.created_range(self.op, self.timestamp)
+        return end - start
+    
+    def lookup(self, indexes):
+        start, end = indexes.fields.created_range(self.op, self.timestamp)
+        return Bitmap(indexes.fields.created_ids[start:end])
+    
+    def matches(self, task):
+        return COMPARISONS[self.op](task.created_at, self.timestamp)
+    
+    def __str__(self):
+        return f"created{self.op}{self.text}"
+
+
+class TextTerm:
+    """Any other word or "quoted phrase", found anywhere in the description or notes"""
+    
+    negated = False
+    
+    def __init__(self, text):
+        self.text = text
+    
+    def estimate(self, indexes):
+        return None
+    
+    def matches(self, task):
+        text = self.text.lower()
+        return text in task['description'].lower() or text in task.get('notes', '').lower()
+    
+    def __str__(self):
+        return f'"{self.text}"'
+
+
+def parse_term(word):
+    """Turn one word of a query into a term"""
+    lowered = word.lower()
+    if word.startswith('#') or word.startswith('-#'):
+        return TagTerm(word)
+    if lowered.startswith('id:'):
+        return IdTerm(int(word[3:]))
+    if lowered.startswith('priority:'):
+        return PriorityTerm([Priority.parse(name) for name in lowered[9:].split(',')])
+    if lowered.startswith('status:'):
+        if lowered[7:] not in STATUSES:
+            raise ValueError(f"Unknown status: {word[7:]} (use pending or done)")
+        return StatusTerm(STATUSES[lowered[7:]])
+    match = CREATED_PATTERN.match(lowered)
+    if match:
+        return CreatedTerm(match.group(1), match.group(2))
+    return TextTerm(word)
+
+
+def parse_query(text):
+    """Split a query such as '#work priority:high status:pending "deploy"' into terms"""
+    try:
+        words = shlex.split(text)
+    except ValueError as e:
+        raise ValueError(f"Bad query: {e}")
+    if not words:
+        raise ValueError("Empty query")
+    try:
+        return [parse_term(word) for word in words]
+    except KeyError as e:
+        raise ValueError(f"Unknown priority: {e.args[0].lower()}")
+
+
+class QueryPlan:
+    """The order in which a query's terms are answered, and what running it cost.
+
+    steps holds (action, term, estimated rows) in execution order. The first
+    step either looks up the most selective term's index or scans every
+    task; later indexed terms are intersected (or excluded) while their
+    index is small next to the candidates, and checked task by task
+    otherwise.
+    """
+    
+    def __init__(self, steps):
+        self.steps = steps
+        self.examined = 0
+        self.matched = 0
+    
+    def candidate_ids(self, indexes):
+        """Ids of the tasks left after the index steps, or None to scan every task"""
+        ids = None
+        for action, term, _ in self.steps:
+            if action == 'lookup':
+                ids = term.lookup(indexes)
+            elif action == 'intersect':
+                ids = ids & term.lookup(indexes)
+            elif action == 'exclude':
+                ids = ids - term.lookup(indexes)
+        return ids
+    
+    def filter(self, tasks):
+        """Check the remaining terms against each candidate task"""
+        terms = [term for action, term, _ in self.steps if action == 'filter']
+        tasks = list(tasks)
+        self.examined = len(tasks)
+        matched = [task for task in tasks if all(term.matches(task) for term in terms)]
+        self.matched = len(matched)
+        return matched
+
+
+def plan_query(terms, indexes, total):
+    """Order the terms of a query, starting from the most selective index"""
+    if indexes is None:
+        # No indexes to use (lazy storage): check everything against every task
+        return QueryPlan([('scan', None, total)] + [('filter', term, None) for term in terms])
+    
+    estimated = [(term.estimate(indexes), term) for term in terms]
+    indexed = sorted(((estimate, term) for estimate, term in estimated
+                      if estimate is not None and not term.negated), key=lambda pair: pair[0])
+    steps = []
+    if indexed:
+        rows, driver = indexed.pop(0)
+        steps.append(('lookup', driver, rows))
+    else:
+        rows, driver = total, None
+        steps.append(('scan', None, total))
+    
+    filters = []
+    # Smallest indexes first, then the terms no index covers
+    for estimate, term in sorted(estimated, key=lambda pair: (pair[0] is None, pair[0] or 0)):
+        if term is driver:
+            continue
+        if driver is not None and estimate is not None and (
+                estimate <= rows * Config.QUERY_INTERSECT_RATIO):
+            if term.negated:
+                steps.append(('exclude', term, estimate))
+            else:
+                steps.append(('intersect', term, estimate))
+                rows = min(rows, estimate)
+        else:
+            filters.append(('filter', term, estimate))
+    return QueryPlan(steps + filters)
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Salvage tasks from a damaged task file
+"""
+
+import json
+import re
+from task_03.config import Config
+from task_03.models import Task
+
+# Tasks are written with "id" as their first key, and an unescaped quote
+# cannot occur inside a JSON string, so this only matches where a task starts
+RECORD_START = re.compile(rb'\{\s*"id"\s*:')
+HEADER = re.compile(rb'\s*\{\s*"next_id"\s*:\s*(\d+|null)\s*,\s*"tasks"\s*:\s*\[')
+TASK_ID = re.compile(rb'"id"\s*:\s*(\d+)')
+# Bytes that can sit between tasks in an intact file
+SEPARATORS = b' \t\r\n,[]{}'
+# Tail kept between reads so a record start split across two chunks is still found
+OVERLAP = 64
+
+
+class RecoveryReport:
+    """What a recovery pass kept and what it had to give up"""
+    
+    def __init__(self, filename, quarantine_filename):
+        self.filename = filename
+        self.quarantine_filename = quarantine_filename
+        self.tasks = []
+        self.next_id = None
+        self.damaged_fragments = 0
+        self.damaged_bytes = 0
+        self.lost_ids = []
+    
+    @property
+    def damaged(self):
+        """Whether any part of the file could not be read"""
+        return self.damaged_fragments > 0
+    
+    def summary(self):
+        """Describe the outcome in one line"""
+        text = f"Recovered {len(self.tasks)} task(s) from {self.filename}"
+        if not self.damaged:
+            return text + "; no damage found"
+        text += (f"; {self.damaged_fragments} damaged fragment(s) ({self.damaged_bytes} bytes)"
+                 f" saved to {self.quarantine_filename}")
+        if self.lost_ids:
+            text += "; lost task ids: " + ", ".join(str(i) for i in self.lost_ids)
+        return text
+
+
+class _Salvager:
+    """Single streaming pass over a task file that keeps every record that still parses"""
+    
+    def __init__(self, report):
+        self.report = report
+        self.decoder = json.JSONDecoder()
+        self.quarantine = None
+    
+    def gap(self, data, offset):
+        """Bytes between records; anything but separators is damage"""
+        if data.translate(None, SEPARATORS):
+            self.damage(data, offset)
+    
+    def record(self, data, offset):
+        """Decode one task from the start of data; quarantine whatever does not parse"""
+        try:
+            text = data.decode('utf-8')
+            fields, end = self.decoder.raw_decode(text)
+            task = Task.from_dict(fields)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.damage(data, offset)
+            return
+        self.report.tasks.append(task)
+        consumed = len(text[:end].encode('utf-8'))
+        self.gap(data[consumed:], offset + consumed)
+    
+    def damage(self, data, offset):
+        report = self.report
+        if self.quarantine is None:
+            self.quarantine = open(report.quarantine_filename, 'ab')
+        self.quarantine.write(b'--- %s offset %d, %d bytes\n' % (
+            report.filename.encode(), offset, len(data)) + data + b'\n')
+        report.damaged_fragments += 1
+        report.damaged_bytes += len(data)
+        report.lost_ids.extend(int(task_id) for task_id in TASK_ID.findall(data))
+    
+    def run(self, f, chunk_size, max_record_bytes):
+        buffer = b''
+        base = 0
+        eof = False
+        header_checked = False
+        while True:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            position = 0
+            
+            if not header_checked and (eof or len(buffer) >= OVERLAP * 4):
+                header = HEADER.match(buffer)
+                if header is not None:
+                    if header.group(1) != b'null':
+                        self.report.next_id = int(header.group(1))
+                    position = header.end()
+                header_checked = True
+            
+            while header_checked:
+                start = RECORD_START.search(buffer, position)
+                if start is None:
+                    keep = len(buffer) if eof else max(position, len(buffer) - OVERLAP)
+                    self.gap(buffer[position:keep], base + position)
+                    position = keep
+                    break
+                self.gap(buffer[position:start.start()], base + position)
+                position = start.start()
+                following = RECORD_START.search(buffer, start.end())
+                if (following is None and not eof
+                        and len(buffer) - position <= max_record_bytes):
+                    # The record may continue in the next chunk
+                    break
+                end = following.start() if following is not None else len(buffer)
+                self.record(buffer[position:end], base + position)
+                position = end
+            
+            if eof:
+                break
+            buffer = buffer[position:]
+            base += position
+        
+        if self.quarantine is not None:
+            self.quarantine.close()
+
+
+def recover_tasks(filename, quarantine_filename=None, chunk_size=None):
+    """Read every intact task from a damaged task file in one streaming pass.
+    
+    Damaged bytes are appended to the quarantine file and summarised in the
+    returned RecoveryReport, whose tasks and next_id can be saved as is.
+    """
+    if quarantine_filename is None:
+        quarantine_filename = filename + Config.QUARANTINE_SUFFIX
+    report = RecoveryReport(filename, quarantine_filename)
+    with open(filename, 'rb') as f:
+        _Salvager(report).run(f, chunk_size or Config.RECOVERY_CHUNK_BYTES,
+                              Config.RECOVERY_MAX_RECORD_BYTES)
+    
+    recovered = {task['id'] for task in report.tasks}
+    report.lost_ids = sorted(set(report.lost_ids) - recovered)
+    highest = max(recovered | set(report.lost_ids), default=0)
+    report.next_id = max(report.next_id or 1, highest + 1)
+    return report
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Compact binary snapshot format for task lists
+"""
+
+import lzma
+import struct
+import sys
+import zlib
+from array import array
+from task_03.models import Priority, Task
+
+MAGIC = b'TASKSNAP'
+VERSION = 2
+# Version 1 stored the tag count of each task in 16 bits
+TAG_COUNT_TYPECODES = {1: 'H', 2: 'I'}
+# magic, format version, compression
+HEADER = struct.Struct('<8sHB')
+# next id, task count, string table size
+COUNTS = struct.Struct('<QII')
+COMPRESSION = {'none': 0, 'zlib': 1, 'lzma': 2}
+
+
+def _compress(kind, data):
+    if kind == 'zlib':
+        return zlib.compress(data, 6)
+    if kind == 'lzma':
+        return lzma.compress(data)
+    return data
+
+
+def _decompress(code, data):
+    if code == COMPRESSION['zlib']:
+        return zlib.decompress(data)
+    if code == COMPRESSION['lzma']:
+        return lzma.decompress(data)
+    return data
+
+
+def _column(typecode, values=()):
+    """Array stored little-endian regardless of the machine"""
+    column = array(typecode, values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _text(strings):
+    """Character lengths plus one UTF-8 blob, so decoding is a single call"""
+    blob = ''.join(strings).encode('utf-8')
+    return _column('I', [len(s) for s in strings]) + struct.pack('<I', len(blob)) + blob
+
+
+def encode_tasks(tasks, next_id, compression='zlib'):
+    """Serialize tasks into the binary snapshot format.
+    
+    Tag and priority names go into a string table once; each task stores
+    table indexes plus fixed-width id, created_at and completed columns,
+    and its description and notes as length-prefixed text.
+    """
+    if compression not in COMPRESSION:
+        raise ValueError(f"Unknown snapshot compression: {compression}")
+    strings = {str(priority): i for i, priority in enumerate(Priority)}
+    tag_refs = []
+    for task in tasks:
+        for tag in task.tags:
+            tag_refs.append(strings.setdefault(tag, len(strings)))
+    
+    body = b''.join([
+        COUNTS.pack(next_id or 0, len(tasks), len(strings)),
+        _text(list(strings)),
+        _column('Q', [task.id for task in tasks]),
+        _column('d', [task.created_at for task in tasks]),
+        bytes(strings[str(task.priority)] for task in tasks),
+        bytes(task.completed for task in tasks),
+        _column(TAG_COUNT_TYPECODES[VERSION], [len(task.tags) for task in tasks]),
+        _column('I', tag_refs),
+        _text([text for task in tasks for text in (task.description, task.notes)]),
+    ])
+    header = HEADER.pack(MAGIC, VERSION, COMPRESSION[compression])
+    return header + _compress(compression, body)
+
+
+class _Reader:
+    """Sequential reader over a decompressed snapshot body"""
+    
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.position = 0
+    
+    def unpack(self, fmt):
+        values = fmt.unpack_from(self.data, self.position)
+        self.position += fmt.size
+        return values
+    
+    def _end(self, size):
+        end = self.position + size
+        if end > len(self.data):
+            raise ValueError("Damaged task snapshot: it ends early")
+        return end
+    
+    def column(self, typecode, count):
+        column = array(typecode)
+        end = self._end(count * column.itemsize)
+        column.frombytes(self.data[self.position:end])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        self.position = end
+        return column
+    
+    def raw(self, count):
+        end = self._end(count)
+        data = self.data[self.position:end]
+        self.position = end
+        return bytes(data)
+    
+    def text(self, count):
+        lengths = self.column('I', count)
+        blob = self.raw(self.unpack(struct.Struct('<I'))[0]).decode('utf-8')
+        strings = []
+        start = 0
+        for length in lengths:
+            strings.append(blob[start:start + length])
+            start += length
+        return strings
+
+
+def decode_tasks(data):
+    """Parse a binary snapshot; return (tasks, next_id)"""
+    if len(data) < HEADER.size:
+        raise ValueError("Not a task snapshot: file too short")
+    magic, version, compression = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a task snapshot: bad magic number")
+    if version not in TAG_COUNT_TYPECODES:
+        raise ValueError(f"Unsupported task snapshot version: {version}")
+    try:
+        return _decode_body(version, _decompress(compression, data[HEADER.size:]))
+    except (struct.error, zlib.error, lzma.LZMAError, IndexError, KeyError) as e:
+        raise ValueError(f"Damaged task snapshot ({type(e).__name__}: {e})") from e
+
+
+def _decode_body(version, body):
+    reader = _Reader(body)
+    next_id, count, string_count = reader.unpack(COUNTS)
+    strings = [sys.intern(s) for s in reader.text(string_count)]
+    priorities = {i: Priority.parse(name) for i, name in enumerate(strings[:len(Priority)])}
+    ids = reader.column('Q', count)
+    created = reader.column('d', count)
+    priority_refs = reader.raw(count)
+    completed = reader.raw(count)
+    tag_counts = reader.column(TAG_COUNT_TYPECODES[version], count)
+    tag_refs = reader.column('I', sum(tag_counts))
+    texts = reader.text(2 * count)
+    
+    tasks = []
+    tag_position = 0
+    for i in range(count):
+        # Fields are already in their stored form, so skip Task.__init__ parsing
+        task = Task.__new__(Task)
+        task.id = ids[i]
+        task.description = texts[2 * i]
+        task.priority = priorities[priority_refs[i]]
+        tags_end = tag_position + tag_counts[i]
+        task.tags = [strings[ref] for ref in tag_refs[tag_position:tags_end]]
+        tag_position = tags_end
+        task.notes = texts[2 * i + 1]
+        task.created_at = created[i]
+        task.completed = bool(completed[i])
+        tasks.append(task)
+    return tasks, next_id or None
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Sorted task listings with cursor-based pagination
+"""
+
+import base64
+import binascii
+import heapq
+import json
+from bisect import bisect_left, bisect_right, insort
+
+# Sort fields and the value each sorts by; priority puts high first
+SORT_FIELDS = {
+    'priority': lambda task: -int(task.priority),
+    'created': lambda task: task.created_at,
+    'id': lambda task: task.id,
+}
+
+
+def parse_sort(spec):
+    """Turn 'priority,-created' into (('priority', False), ('created', True))"""
+    fields = []
+    for name in spec.split(','):
+        name = name.strip().lower()
+        descending = name.startswith('-')
+        name = name.lstrip('-')
+        if name not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {name} (use {', '.join(SORT_FIELDS)})")
+        fields.append((name, descending))
+    return tuple(fields)
+
+
+def sort_key(fields):
+    """Key function for a parsed sort; ties are broken by id so every key is unique"""
+    getters = [(SORT_FIELDS[name], -1 if descending else 1) for name, descending in fields]
+    
+    def key(task):
+        return tuple(sign * getter(task) for getter, sign in getters) + (task.id,)
+    return key
+
+
+def format_sort(fields):
+    return ','.join(('-' if descending else '') + name for name, descending in fields)
+
+
+def encode_cursor(fields, key):
+    """Opaque cursor pointing just past the task with the given sort key"""
+    data = json.dumps([format_sort(fields), list(key)]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(fields, cursor):
+    """Sort key a cursor points past; it must come from the same sort"""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        spec, key = json.loads(data)
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError(f"Bad cursor: {cursor}")
+    if spec != format_sort(fields):
+        raise ValueError(f"Cursor belongs to --sort {spec}")
+    # One number per sort field plus the id, or comparing it with task keys fails later
+    if (not isinstance(key, list) or len(key) != len(fields) + 1 or
+            not all(isinstance(part, (int, float)) and not isinstance(part, bool)
+                    for part in key)):
+        raise ValueError(f"Bad cursor: {cursor}")
+    return tuple(key)
+
+
+def top_k(tasks, key, limit=None, after=None):
+    """The first limit tasks by key after the cursor key, using a heap instead of a full sort"""
+    if after is not None:
+        tasks = (task for task in tasks if key(task) > after)
+    if limit is None:
+        return sorted(tasks, key=key)
+    return heapq.nsmallest(limit, tasks, key=key)
+
+
+class SortedView:
+    """Sort keys of the tasks shown by one listing, kept in order as tasks change.
+
+    Updated through the same add/remove hooks as the secondary indexes, so
+    a page is a bisection and a slice instead of a sort of every task.
+    """
+    
+    def __init__(self, fields, show_completed):
+        self.fields = fields
+        self.show_completed = show_completed
+        self.key = sort_key(fields)
+        self.keys = []
+    
+    def build(self, tasks):
+        """Fill the view from the full task list"""
+        self.keys = sorted(self.key(task) for task in tasks
+                           if self.show_completed or not task.completed)
+    
+    def add(self, task):
+        if self.show_completed or not task.completed:
+            insort(self.keys, self.key(task))
+    
+    def remove(self, task):
+        key = self.key(task)
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+    
+    def page(self, limit=None, after=None):
+        """Ids of the first limit tasks after the cursor key"""
+        start = 0 if after is None else bisect_right(self.keys, after)
+        end = len(self.keys) if limit is None else start + limit
+        return [key[-1] for key in self.keys[start:end]]
\ No newline at end of file
@@ -0,0 +1,893 @@
+"""
+Storage backends for the Task Manager
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import warnings
+from contextlib import contextmanager
+from task_03.config import Config
+from task_03.durability import SyncPolicy, atomic_write
+from task_03.journal import TaskJournal
+from task_03.models import Task
+from task_03.utils import normalize_tag
+
+
+class StorageBackend:
+    """Base class describing how a TaskManager persists its tasks"""
+    
+    DEFAULT_FILENAME = Config.DEFAULT_FILENAME
+    
+    # Lazy backends answer queries themselves instead of loading every task
+    lazy = False
+    
+    # Backends whose storage locks itself skip the task file lock
+    locks_itself = False
+    
+    def __init__(self, filename=None, durability=None):
+        self.filename = filename or self.DEFAULT_FILENAME
+        self.sync = SyncPolicy(durability)
+    
+    def load(self):
+        """Return the stored tasks and the next unused id (None if unknown)"""
+        raise NotImplementedError
+    
+    def save(self, tasks, next_id):
+        """Replace the stored tasks with the given list"""
+        raise NotImplementedError
+    
+    def replay(self):
+        """Yield mutation records to apply on top of the loaded tasks"""
+        return iter(())
+    
+    def next_id(self):
+        """Return the id the next added task should use, or None if finding it means loading every task"""
+        return None
+    
+    def append(self, record):
+        """Store an 'add' record without reading the other tasks; only when next_id() is known"""
+        raise NotImplementedError
+    
+    def commit(self, records):
+        """Persist mutation records; return False if a full save is needed"""
+        return False
+    
+    def wants_compaction(self):
+        """Whether appended records have grown past the point a full save should fold them in"""
+        return False
+    
+    @contextmanager
+    def transaction(self):
+        """Run several mutations as one unit"""
+        yield
+    
+    def refresh(self):
+        """Pick up files another process replaced since they were opened"""
+    
+    def signature(self):
+        """Return a cheap stamp that changes when the stored tasks change"""
+        return None
+    
+    def recover(self):
+        """Salvage the readable tasks from damaged storage; return a RecoveryReport"""
+        raise NotImplementedError(f"{type(self).__name__} does not support recovery")
+    
+    def close(self):
+        """Release any resources held by the backend"""
+        self.sync.close()
+
+
+def replaced(f, filename):
+    """Whether the path of an open file now names a different file"""
+    try:
+        return os.stat(filename).st_ino != os.fstat(f.fileno()).st_ino
+    except FileNotFoundError:
+        return True
+
+
+def file_signature(filename):
+    """Return (mtime, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def tasks_from_dicts(records, filename):
+    """Build tasks from a file that parsed as JSON.
+
+    A task that is valid JSON but not a valid task is reported instead of
+    quarantined: recovery would drop it from the file on the next save.
+    """
+    tasks = []
+    for position, record in enumerate(records):
+        try:
+            tasks.append(Task.from_dict(record))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{filename}: task #{position + 1} is not a valid task "
+                             f"({type(e).__name__}: {e}); fix or remove it by hand") from e
+    return tasks
+
+
+class JsonBackend(StorageBackend):
+    """Stores every task in a single JSON file, rewritten on each change"""
+    
+    def load(self):
+        """Load tasks from JSON file"""
+        if os.path.exists(self.filename):
+            with open(self.filename, 'rb') as f:
+                text = f.read()
+            if not text.strip():
+                # An empty file holds no tasks yet
+                return [], None
+            try:
+                data = json.loads(text)
+                # Files written before the id counter existed hold a bare list
+                if isinstance(data, list):
+                    data = {'tasks': data}
+                records, next_id = data['tasks'], data.get('next_id')
+            except (ValueError, KeyError, TypeError):
+                # Keep every task that is still intact instead of starting empty, and
+                # save them straight away so the damage is only quarantined once
+                report = self.recover()
+                JsonBackend.save(self, report.tasks, report.next_id)
+                warnings.warn(report.summary())
+                return report.tasks, report.next_id
+            return tasks_from_dicts(records, self.filename), next_id
+        return [], None
+    
+    def recover(self):
+        """Salvage the intact tasks, moving damaged bytes to a quarantine file"""
+        from task_03.recovery import recover_tasks
+        return recover_tasks(self.filename)
+    
+    def save(self, tasks, next_id):
+        """Save tasks to JSON file through a temporary file and an atomic rename"""
+        data = {'next_id': next_id, 'tasks': [task.to_dict() for task in tasks]}
+        atomic_write(self.filename, json.dumps(data, indent=Config.JSON_INDENT), self.sync)
+    
+    def signature(self):
+        """Return the mtime and size of the JSON file"""
+        return file_signature(self.filename)
+
+
+class JournalBackend(JsonBackend):
+    """JSON snapshot plus an append-only journal of later changes"""
+    
+    # Snapshots are written with next_id ahead of the tasks, so it can be read
+    # from the first bytes of the file without parsing the rest
+    NEXT_ID_PATTERN = re.compile(rb'\{\s*"next_id":\s*(\d+)')
+    # next id, then the journal size and snapshot (mtime, size) it was worked out for
+    NEXT_ID_FILE = struct.Struct('<QQqq')
+    
+    def __init__(self, filename=None, durability=None):
+        super().__init__(filename, durability)
+        self.journal = TaskJournal(self.filename + Config.JOURNAL_SUFFIX, self.sync)
+        self.next_id_filename = self.filename + Config.NEXT_ID_SUFFIX
+    
+    def replay(self):
+        """Yield the journal records written since the last snapshot"""
+        return self.journal.read()
+    
+    def save(self, tasks, next_id):
+        """Write a fresh snapshot and clear the journal it replaces"""
+        super().save(tasks, next_id)
+        self.journal.clear()
+        if next_id is not None:
+            self._store_next_id(next_id)
+    
+    def commit(self, records):
+        """Append the records to the journal; ask for a snapshot once it grows large"""
+        self._extend(records)
+        return not self.wants_compaction()
+    
+    def wants_compaction(self):
+        """Whether the journal has grown past JOURNAL_COMPACT_BYTES"""
+        return self.journal.size() > Config.JOURNAL_COMPACT_BYTES
+    
+    def _extend(self, records):
+        """Append records to the journal, keeping the stored next id current if it was"""
+        next_id = self._stored_next_id()
+        self.journal.extend(records)
+        if next_id is not None:
+            for record in records:
+                if record['op'] == 'add':
+                    next_id = max(next_id, record['task']['id'] + 1)
+            self._store_next_id(next_id)
+    
+    def _files_stamp(self):
+        return (self.journal.size(),) + (file_signature(self.filename) or (0, 0))
+    
+    def _stored_next_id(self):
+        """The next id kept beside the task file, or None if the files changed since"""
+        try:
+            with open(self.next_id_filename, 'rb') as f:
+                next_id, *stamp = self.NEXT_ID_FILE.unpack(f.read())
+        except (OSError, struct.error):
+            return None
+        return next_id if tuple(stamp) == self._files_stamp() else None
+    
+    def _store_next_id(self, next_id):
+        # Rewritten in place: it is only a shortcut, and a mismatch falls back to reading
+        fd = os.open(self.next_id_filename, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, self.NEXT_ID_FILE.pack(next_id, *self._files_stamp()))
+        finally:
+            os.close(fd)
+    
+    def next_id(self):
+        """Return the next id, stored beside the task file or read from the snapshot and journal"""
+        next_id = self._stored_next_id()
+        if next_id is None:
+            next_id = self._read_next_id()
+            if next_id is not None:
+                self._store_next_id(next_id)
+        return next_id
+    
+    def _read_next_id(self):
+        """Read the next id from the head of the snapshot and the adds in the journal"""
+        try:
+            with open(self.filename, 'rb') as f:
+                match = self.NEXT_ID_PATTERN.match(f.read(64))
+        except FileNotFoundError:
+            next_id = 1
+        else:
+            if match is None:
+                # Older snapshots store a bare list or a null counter
+                return None
+            next_id = int(match.group(1))
+        for record in self.journal.read():
+            if record['op'] == 'add':
+                next_id = max(next_id, record['task']['id'] + 1)
+        return next_id
+    
+    def append(self, record):
+        """Append the record to the journal; the next full save folds it into the snapshot"""
+        self._extend([record])
+    
+    def signature(self):
+        """Return the mtime and size of the snapshot and the journal"""
+        return super().signature(), file_signature(self.journal.filename)
+
+
+class BinaryBackend(StorageBackend):
+    """Stores every task in a compact, optionally compressed binary snapshot"""
+    
+    DEFAULT_FILENAME = Config.BINARY_FILENAME
+    
+    def load(self):
+        """Load tasks from the snapshot file"""
+        if not os.path.exists(self.filename):
+            return [], None
+        from task_03.snapshot import decode_tasks
+        with open(self.filename, 'rb') as f:
+            return decode_tasks(f.read())
+    
+    def save(self, tasks, next_id):
+        """Save tasks to the snapshot file through an atomic rename"""
+        from task_03.snapshot import encode_tasks
+        data = encode_tasks(tasks, next_id, Config.BINARY_COMPRESSION)
+        atomic_write(self.filename, data, self.sync)
+    
+    def signature(self):
+        """Return the mtime and size of the snapshot file"""
+        return file_signature(self.filename)
+
+
+class LazyBackend(StorageBackend):
+    """Base class for backends that read tasks on demand instead of all at once"""
+    
+    lazy = True
+    
+    def get(self, task_id):
+        """Look up a single task by id"""
+        raise NotImplementedError
+    
+    def apply(self, record):
+        """Apply a mutation record directly to storage"""
+        raise NotImplementedError
+    
+    def next_id(self):
+        """Return the id the next added task should use"""
+        raise NotImplementedError
+    
+    def append(self, record):
+        """Store an 'add' record; lazy backends never load the other tasks"""
+        self.apply(record)
+    
+    def compact(self):
+        """Reclaim space left behind by changed and deleted tasks"""
+    
+    def list_tasks(self, show_completed=False):
+        """List tasks, optionally filtering by completion status"""
+        tasks = self.load()[0]
+        if show_completed:
+            return tasks
+        return [task for task in tasks if not task['completed']]
+    
+    def search_by_tag(self, tag):
+        """Find tasks carrying a tag"""
+        tag = normalize_tag(tag)
+        return [task for task in self.load()[0]
+                if any(tag == normalize_tag(t) for t in task['tags'])]
+    
+    def all_tags(self):
+        """Return every distinct tag in sorted order"""
+        return list(self.tag_counts())
+    
+    def tag_counts(self):
+        """Return the number of tasks using each tag, sorted by tag"""
+        counts = {}
+        for task in self.load()[0]:
+            for tag in set(task['tags']):
+                counts[tag] = counts.get(tag, 0) + 1
+        return dict(sorted(counts.items()))
+
+
+class SqliteBackend(LazyBackend):
+    """Stores tasks in an indexed SQLite database"""
+    
+    DEFAULT_FILENAME = Config.SQLITE_FILENAME
+    
+    locks_itself = True
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            notes TEXT NOT NULL DEFAULT '',
+            created_at TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS task_tags (
+            task_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            tag TEXT NOT NULL,
+            tag_key TEXT NOT NULL,
+            PRIMARY KEY (task_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed, id);
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority, id);
+        CREATE INDEX IF NOT EXISTS idx_task_tags_key ON task_tags (tag_key, task_id);
+        CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags (tag);
+    """
+    
+    # Tags are folded into a JSON array so a task is fetched in one row
+    SELECT_TASKS = """
+        SELECT t.id, t.description, t.priority,
+               (SELECT json_group_array(tag) FROM
+                   (SELECT tag FROM task_tags WHERE task_id = t.id ORDER BY position)),
+               t.notes, t.created_at, t.completed
+        FROM tasks t
+    """
+    
+    INSERT_TASK = """
+        INSERT INTO tasks (id, description, priority, notes, created_at, completed)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+    INSERT_TAG = "INSERT INTO task_tags (task_id, position, tag, tag_key) VALUES (?, ?, ?, ?)"
+    
+    # SQLite groups its own commits; map the durability policy onto its setting
+    SYNCHRONOUS = {'always': 'FULL', 'batched': 'NORMAL', 'none': 'OFF'}
+    
+    def __init__(self, filename=None, durability=None):
+        super().__init__(filename, durability)
+        self.in_transaction = False
+        # Imported here so commands on other backends do not load SQLite
+        import sqlite3
+        # The daemon hands the connection from thread to thread, one at a time
+        self.conn = sqlite3.connect(self.filename, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={self.SYNCHRONOUS[self.sync.mode]}")
+        self.conn.executescript(self.SCHEMA)
+    
+    def _row_to_task(self, row):
+        """Convert a SELECT_TASKS row into a Task"""
+        return Task(row[0], row[1], row[2], json.loads(row[3]), row[4], row[5], row[6])
+    
+    def _select(self, where='', params=()):
+        """Run SELECT_TASKS with an optional WHERE clause, ordered by id"""
+        rows = self.conn.execute(f"{self.SELECT_TASKS} {where} ORDER BY t.id", params)
+        return [self._row_to_task(row) for row in rows]
+    
+    def load(self):
+        """Load every task from the database"""
+        return self._select(), self.next_id()
+    
+    def save(self, tasks, next_id):
+        """Replace the contents of the database with the given tasks"""
+        with self.conn:
+            self.conn.execute("DELETE FROM task_tags")
+            self.conn.execute("DELETE FROM tasks")
+            for task in tasks:
+                self._insert(task)
+            # Make sure AUTOINCREMENT never hands out an id below next_id
+            last_id = max(next_id, self.next_id()) - 1
+            self.conn.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+            self.conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)",
+                              (last_id,))
+    
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+        super().close()
+    
+    def get(self, task_id):
+        """Look up a single task by its primary key"""
+        tasks = self._select("WHERE t.id = ?", (task_id,))
+        return tasks[0] if tasks else None
+    
+    def list_tasks(self, show_completed=False):
+        """List tasks using the completion index"""
+        if show_completed:
+            return self._select()
+        return self._select("WHERE t.completed = 0")
+    
+    def search_by_tag(self, tag):
+        """Find tasks through the normalized tag index"""
+        return self._select(
+            "WHERE t.id IN (SELECT task_id FROM task_tags WHERE tag_key = ?)",
+            (normalize_tag(tag),))
+    
+    def all_tags(self):
+        """Return every distinct tag in sorted order"""
+        rows = self.conn.execute("SELECT DISTINCT tag FROM task_tags ORDER BY tag")
+        return [row[0] for row in rows]
+    
+    def tag_counts(self):
+        """Return the number of tasks using each tag, sorted by tag"""
+        rows = self.conn.execute(
+            "SELECT tag, COUNT(DISTINCT task_id) FROM task_tags GROUP BY tag ORDER BY tag")
+        return dict(rows.fetchall())
+    
+    def next_id(self):
+        """Return the id the next added task should use"""
+        # AUTOINCREMENT remembers the largest id ever used, even after deletes
+        row = self.conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+        return (row[0] if row else 0) + 1
+    
+    def _insert(self, task):
+        """Insert a task and its tags"""
+        self.conn.execute(self.INSERT_TASK, (
+            task['id'], task['description'], task['priority'],
+            task.get('notes', ''), task['created_at'], int(task['completed'])))
+        self.conn.executemany(self.INSERT_TAG, [
+            (task['id'], position, tag, normalize_tag(tag))
+            for position, tag in enumerate(task.get('tags', []))])
+    
+    def apply(self, record):
+        """Apply a mutation record directly to the database"""
+        if self.in_transaction:
+            return self._apply(record)
+        with self.conn:
+            return self._apply(record)
+    
+    @contextmanager
+    def transaction(self):
+        """Run several mutations as one database transaction"""
+        if self.in_transaction:
+            yield
+            return
+        self.in_transaction = True
+        try:
+            with self.conn:
+                # Take the write lock up front, so an id read inside is still free at the insert
+                self.conn.execute("BEGIN IMMEDIATE")
+                yield
+        finally:
+            self.in_transaction = False
+    
+    def _apply(self, record):
+        """Translate a mutation record into SQL statements"""
+        op = record['op']
+        if op == 'add':
+            self._insert(record['task'])
+            return Task.from_dict(record['task'])
+        
+        task = self.get(record['id'])
+        if task is None:
+            return None if op == 'delete' else False
+        
+        if op == 'delete':
+            self.conn.execute("DELETE FROM task_tags WHERE task_id = ?", (task['id'],))
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (task['id'],))
+            return task
+        if op == 'complete':
+            self.conn.execute("UPDATE tasks SET completed = 1 WHERE id = ?", (task['id'],))
+        elif op == 'note':
+            self.conn.execute("UPDATE tasks SET notes = ? WHERE id = ?",
+                              (record['notes'], task['id']))
+        elif op == 'tag':
+            position = self.conn.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM task_tags WHERE task_id = ?",
+                (task['id'],)).fetchone()[0]
+            existing_tags = task['tags']
+            for tag in record['tags']:
+                if tag not in existing_tags:
+                    self.conn.execute(self.INSERT_TAG,
+                                      (task['id'], position, tag, normalize_tag(tag)))
+                    existing_tags.append(tag)
+                    position += 1
+        elif op == 'untag':
+            for tag in record['tags']:
+                # Like list.remove, only the first matching tag is dropped
+                self.conn.execute("""
+                    DELETE FROM task_tags WHERE task_id = ? AND position = (
+                        SELECT MIN(position) FROM task_tags WHERE task_id = ? AND tag = ?)
+                """, (task['id'], task['id'], tag))
+        elif op == 'update':
+            if 'description' in record:
+                self.conn.execute("UPDATE tasks SET description = ? WHERE id = ?",
+                                  (record['description'], task['id']))
+            if 'priority' in record:
+                self.conn.execute("UPDATE tasks SET priority = ? WHERE id = ?",
+                                  (record['priority'], task['id']))
+            if 'tags' in record:
+                self.conn.execute("DELETE FROM task_tags WHERE task_id = ?", (task['id'],))
+                self.conn.executemany(self.INSERT_TAG, [
+                    (task['id'], position, tag, normalize_tag(tag))
+                    for position, tag in enumerate(record['tags'])])
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+        return True
+
+
+class LinesBackend(LazyBackend):
+    """One JSON task per line, found through a memory-mapped offset index.
+
+    The data file is only ever appended to: a change writes the new version
+    of the task (or a deletion marker) at the end and points the index entry
+    at it. The index holds fixed-width (id, offset, length) entries sorted
+    by id, so opening the file and reading one task cost the same no matter
+    how many tasks there are. The index can always be rebuilt from the data.
+    """
+    
+    DEFAULT_FILENAME = Config.LINES_FILENAME
+    
+    INDEX_MAGIC = b'TASKIDX1'
+    # magic, next id, bytes of stale lines, size of the data file the index covers
+    INDEX_HEADER = struct.Struct('<8sQQQ')
+    # task id, offset of its line, line length (0 once the task is deleted)
+    INDEX_ENTRY = struct.Struct('<QQI')
+    
+    def __init__(self, filename=None, durability=None):
+        super().__init__(filename, durability)
+        self.index_filename = self.filename + Config.LINES_INDEX_SUFFIX
+        self._undo = None
+        self._open()
+    
+    def _open(self):
+        """Open the data and index files, rebuilding the index if it is stale"""
+        self._data = open(self.filename, 'a+b')
+        self._data_map = None
+        self._index_map = None
+        if not self._index_is_current():
+            self.rebuild_index()
+        self._index = open(self.index_filename, 'r+b')
+    
+    def close(self):
+        """Close the files and their memory maps"""
+        for mapped in (self._data_map, self._index_map):
+            if mapped is not None:
+                mapped.close()
+        self._data_map = self._index_map = None
+        self._data.close()
+        self._index.close()
+        super().close()
+    
+    def refresh(self):
+        """Reopen the files if another process compacted the data or rebuilt the index"""
+        if (replaced(self._data, self.filename) or replaced(self._index, self.index_filename)
+                or not self._index_is_current()):
+            self.close()
+            self._open()
+    
+    def _map(self, f, current):
+        """Map a whole file read-only, remapping when its size has changed"""
+        size = os.fstat(f.fileno()).st_size
+        if current is not None and len(current) == size:
+            return current
+        if current is not None:
+            current.close()
+        if size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def _data_view(self):
+        self._data_map = self._map(self._data, self._data_map)
+        return self._data_map
+    
+    def _index_view(self):
+        self._index_map = self._map(self._index, self._index_map)
+        return self._index_map
+    
+    def _index_is_current(self):
+        """Check that the index exists and covers exactly the data file"""
+        try:
+            with open(self.index_filename, 'rb') as f:
+                header = f.read(self.INDEX_HEADER.size)
+                size = os.fstat(f.fileno()).st_size
+        except OSError:
+            return False
+        if len(header) < self.INDEX_HEADER.size:
+            return False
+        magic, _, _, data_bytes = self.INDEX_HEADER.unpack(header)
+        return (magic == self.INDEX_MAGIC
+                and (size - self.INDEX_HEADER.size) % self.INDEX_ENTRY.size == 0
+                and data_bytes == os.fstat(self._data.fileno()).st_size)
+    
+    def rebuild_index(self):
+        """Recreate the index by scanning the data file"""
+        latest = {}
+        next_id = 1
+        offset = 0
+        self._data.seek(0)
+        for line in self._data:
+            if not line.endswith(b'\n'):
+                # Cut off mid-write; drop it so the next append starts cleanly
+                self._data.truncate(offset)
+                break
+            record = json.loads(line)
+            next_id = max(next_id, record['id'] + 1)
+            latest[record['id']] = (offset, 0 if record.get('deleted') else len(line))
+            offset += len(line)
+        
+        live_bytes = sum(length for _, length in latest.values())
+        entries = [self.INDEX_ENTRY.pack(task_id, line_offset, length)
+                   for task_id, (line_offset, length) in sorted(latest.items()) if length]
+        header = self.INDEX_HEADER.pack(self.INDEX_MAGIC, next_id, offset - live_bytes, offset)
+        # Replaced rather than rewritten, so other processes keep a whole index until they reopen
+        atomic_write(self.index_filename, header + b''.join(entries), SyncPolicy('none'))
+    
+    def _header(self):
+        """Return (next_id, stale_bytes, data_bytes) from the index header"""
+        return self.INDEX_HEADER.unpack_from(self._index_view(), 0)[1:]
+    
+    def _write_header(self, next_id, stale_bytes, data_bytes):
+        self._write_index(0, self.INDEX_HEADER.pack(
+            self.INDEX_MAGIC, next_id, stale_bytes, data_bytes))
+    
+    def _entry_count(self):
+        return (len(self._index_view()) - self.INDEX_HEADER.size) // self.INDEX_ENTRY.size
+    
+    def _entry_position(self, slot):
+        return self.INDEX_HEADER.size + slot * self.INDEX_ENTRY.size
+    
+    def _entry(self, slot):
+        """Return (id, offset, length) of the index entry in a slot"""
+        return self.INDEX_ENTRY.unpack_from(self._index_view(), self._entry_position(slot))
+    
+    def _find(self, task_id):
+        """Binary search the index for the slot a task id belongs in"""
+        low, high = 0, self._entry_count()
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < task_id:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def _write_index(self, position, data):
+        """Write bytes into the index, keeping the originals during a transaction"""
+        undo = self._undo
+        if undo is not None and position < undo['index_bytes'] and position not in undo['regions']:
+            undo['regions'][position] = self._index_view()[position:position + len(data)]
+        os.pwrite(self._index.fileno(), data, position)
+    
+    def _set_entry(self, task_id, offset, length):
+        """Point the index entry of a task at a line, inserting it if needed"""
+        slot = self._find(task_id)
+        entry = self.INDEX_ENTRY.pack(task_id, offset, length)
+        if slot < self._entry_count() and self._entry(slot)[0] == task_id:
+            self._write_index(self._entry_position(slot), entry)
+            return
+        # New ids are normally the largest, so this tail is usually empty
+        tail = self._index_view()[self._entry_position(slot):]
+        self._write_index(self._entry_position(slot), entry + tail)
+    
+    def _append(self, data):
+        """Append one JSON line to the data file; return (offset, length)"""
+        line = json.dumps(data, separators=(',', ':')).encode() + b'\n'
+        self._data.seek(0, os.SEEK_END)
+        offset = self._data.tell()
+        self._data.write(line)
+        self._data.flush()
+        # Only the data needs syncing; a stale index is rebuilt from it
+        self.sync.sync(self._data)
+        return offset, len(line)
+    
+    def _read(self, offset, length):
+        """Decode the task stored at a byte range of the data file"""
+        return Task.from_dict(json.loads(self._data_view()[offset:offset + length]))
+    
+    def _line(self, task_id):
+        """Return (offset, length) of the current line of a task, or None"""
+        slot = self._find(task_id)
+        if slot < self._entry_count():
+            entry_id, offset, length = self._entry(slot)
+            if entry_id == task_id and length:
+                return offset, length
+        return None
+    
+    def get(self, task_id):
+        """Look up a single task, decoding only its own line"""
+        line = self._line(task_id)
+        return self._read(*line) if line else None
+    
+    def load(self):
+        """Decode every live task in id order"""
+        tasks = []
+        for slot in range(self._entry_count()):
+            _, offset, length = self._entry(slot)
+            if length:
+                tasks.append(self._read(offset, length))
+        return tasks, self.next_id()
+    
+    def next_id(self):
+        """Return the id the next added task should use"""
+        return self._header()[0]
+    
+    def save(self, tasks, next_id):
+        """Rewrite the data file with just the given tasks"""
+        data = b''.join(json.dumps(task.to_dict(), separators=(',', ':')).encode() + b'\n'
+                        for task in sorted(tasks, key=lambda task: task['id']))
+        self.close()
+        atomic_write(self.filename, data, self.sync)
+        self._open()
+        stored_next_id, stale_bytes, data_bytes = self._header()
+        self._write_header(max(next_id, stored_next_id), stale_bytes, data_bytes)
+    
+    def compact(self):
+        """Drop old task versions and deletion markers from the data file"""
+        self.save(*self.load())
+    
+    def _compact_if_needed(self):
+        _, stale_bytes, data_bytes = self._header()
+        if stale_bytes > Config.LINES_COMPACT_BYTES and stale_bytes * 2 > data_bytes:
+            self.compact()
+    
+    @contextmanager
+    def transaction(self):
+        """Group mutations; on error drop the appended lines and restore the index"""
+        if self._undo is not None:
+            yield
+            return
+        self._undo = {
+            'regions': {},
+            'data_bytes': os.fstat(self._data.fileno()).st_size,
+            'index_bytes': os.fstat(self._index.fileno()).st_size,
+        }
+        try:
+            yield
+        except BaseException:
+            self._data.truncate(self._undo['data_bytes'])
+            self._index.truncate(self._undo['index_bytes'])
+            for position, original in self._undo['regions'].items():
+                os.pwrite(self._index.fileno(), original, position)
+            raise
+        finally:
+            self._undo = None
+        self._compact_if_needed()
+    
+    def apply(self, record):
+        """Append the change to the data file and repoint the index at it"""
+        op = record['op']
+        next_id, stale_bytes, _ = self._header()
+        if op == 'add':
+            task = Task.from_dict(record['task'])
+            offset, length = self._append(task.to_dict())
+            self._set_entry(task.id, offset, length)
+            self._write_header(max(next_id, task.id + 1), stale_bytes, offset + length)
+            return task
+        
+        line = self._line(record['id'])
+        if line is None:
+            return None if op == 'delete' else False
+        task = self._read(*line)
+        
+        if op == 'delete':
+            offset, length = self._append({'id': task.id, 'deleted': True})
+            self._set_entry(task.id, offset, 0)
+            stale_bytes += line[1] + length
+            result = task
+        else:
+            task.apply(record)
+            offset, length = self._append(task.to_dict())
+            self._set_entry(task.id, offset, length)
+            stale_bytes += line[1]
+            result = True
+        self._write_header(next_id, stale_bytes, offset + length)
+        if self._undo is None:
+            self._compact_if_needed()
+        return result
+
+
+
+BACKENDS = {
+    'json': JsonBackend,
+    'journal': JournalBackend,
+    'sqlite': SqliteBackend,
+    'lines': LinesBackend,
+    'binary': BinaryBackend,
+}
+
+
+def open_storage(kind=None, filename=None, durability=None):
+    """Create the storage backend registered under the given name"""
+    kind = kind or Config.STORAGE_BACKEND
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {kind}")
+    return BACKENDS[kind](filename, durability)
+
+
+def default_filename(kind=None):
+    """The file a backend uses when none is named"""
+    kind = kind or Config.STORAGE_BACKEND
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {kind}")
+    return BACKENDS[kind].DEFAULT_FILENAME
+
+
+def renumber_duplicate_ids(tasks, next_id=None):
+    """Give tasks that repeat an earlier id a fresh one; return the next free id"""
+    # Older versions derived ids from the list length, which could repeat
+    next_id = max([next_id or 1] + [task['id'] + 1 for task in tasks])
+    seen = set()
+    for task in tasks:
+        if task['id'] in seen:
+            task.id = next_id
+            next_id += 1
+        seen.add(task['id'])
+    return next_id
+
+
+# Backend to use for a file when none is named, by extension
+EXTENSIONS = {'.jsonl': 'lines', '.bin': 'binary', '.db': 'sqlite', '.json': 'json'}
+
+
+def backend_for(filename, default='sqlite'):
+    """Guess the storage backend of a file from its extension"""
+    return EXTENSIONS.get(os.path.splitext(filename)[1], default)
+
+
+def migrate_json(json_filename, target_filename, kind=None):
+    """Import the tasks from a JSON task file into another storage backend"""
+    if kind is None:
+        kind = backend_for(target_filename)
+    tasks, next_id = JsonBackend(json_filename).load()
+    next_id = renumber_duplicate_ids(tasks, next_id)
+    
+    backend = open_storage(kind, target_filename)
+    try:
+        backend.save(tasks, next_id)
+    finally:
+        backend.close()
+    return len(tasks)
+
+
+def migrate_json_to_sqlite(json_filename, db_filename):
+    """Import the tasks from a JSON task file into an SQLite database"""
+    return migrate_json(json_filename, db_filename, 'sqlite')
+
+
+def export_json(source_filename, json_filename, kind=None):
+    """Write the tasks of any storage backend out as a JSON task file"""
+    source = open_storage(kind or backend_for(source_filename), source_filename)
+    try:
+        tasks, next_id = source.load()
+    finally:
+        source.close()
+    
+    target = JsonBackend(json_filename)
+    try:
+        target.save(tasks, next_id)
+    finally:
+        target.close()
+    return len(tasks)
\ No newline at end of file
@@ -1,135 +1,775 @@
-import json
-import os
+import functools
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from task_03.archive import TaskArchive
+from task_03.bitmaps import Bitmap
+from task_03.cache import StartupCache, file_fingerprint
 from task_03.config import Config
+from task_03.indexes import (FieldIndex, SecondaryIndex, TagIndex, TextIndex, TrigramIndex,
+                             matches_tag_query, parse_tag_query)
+from task_03.locking import FileLock, ReadWriteLock
+from task_03.models import Priority, Task, add_record, parse_timestamp
+from task_03.storage import StorageBackend, open_storage, renumber_duplicate_ids
+from task_03.utils import normalize_tag, validate_priority
+
+
+def _snapshot(result):
+    """A read's result in lists of its own, so later changes never show through"""
+    # Thread-safe writes replace a changed task instead of editing it, so the
+    # tasks themselves can be shared; only the live lists around them cannot
+    if isinstance(result, list):
+        return list(result)
+    if isinstance(result, tuple):
+        return tuple(_snapshot(item) for item in result)
+    return result
+
+
+def _reads(method):
+    """Run a TaskManager method alongside other reads when it is thread-safe"""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        if self.storage.lazy:
+            # Every thread shares one connection or file; they take turns
+            with self._exclusive(), self._read_locked():
+                return method(self, *args, **kwargs)
+        if self._rw is None:
+            return method(self, *args, **kwargs)
+        with self._rw.reading() as outermost:
+            result = method(self, *args, **kwargs)
+            # Calls nested in this thread's own reads and writes keep the live tasks
+            return _snapshot(result) if outermost else result
+    return locked
+
+
+def _writes(method):
+    """Give a TaskManager method the tasks to itself when it is thread-safe"""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._exclusive():
+            return method(self, *args, **kwargs)
+    return locked
+
 
 class TaskManager:
-    """Main class for managing tasks with JSON storage"""
+    """Main class for managing tasks with pluggable storage (JSON by default)"""
+    
+    def __init__(self, filename=None, storage=None, trigram_index=None, durability=None,
+                 startup_cache=None, columnar=None, thread_safe=None):
+        if thread_safe is None:
+            thread_safe = Config.THREAD_SAFE
+        # Reads share this lock and changes take it alone; None when one thread uses us
+        self._rw = ReadWriteLock() if thread_safe else None
+        # Guards the cache of sorted views, which concurrent reads may fill
+        self._views_lock = threading.Lock()
+        if isinstance(storage, StorageBackend):
+            self.storage = storage
+        else:
+            self.storage = open_storage(storage, filename, durability)
+        self.filename = self.storage.filename
+        if trigram_index is None:
+            trigram_index = Config.TRIGRAM_INDEX
+        self._trigram_index = TrigramIndex() if trigram_index else None
+        if columnar is None:
+            columnar = Config.COLUMNAR_VIEW
+        self._columns = None
+        if columnar and not self.storage.lazy:
+            # Imported here so numpy is only loaded when the view is wanted
+            from task_03.columns import ColumnarIndex
+            self._columns = ColumnarIndex()
+        self._batch = None
+        self._lock = FileLock(self.filename + Config.LOCK_SUFFIX)
+        self._archive = TaskArchive(self.filename + Config.ARCHIVE_SUFFIX, self.storage.sync)
+        self._stamp = None
+        if startup_cache is None:
+            startup_cache = Config.STARTUP_CACHE
+        self._cache = None
+        if startup_cache and not self.storage.lazy:
+            self._cache = StartupCache(self.filename + Config.CACHE_SUFFIX)
+        self._cache_fingerprint = None
+        self.next_id = 1
+        if not self.storage.lazy:
+            self.load_tasks()
+    
+    @property
+    def thread_safe(self):
+        """Whether threads may share this TaskManager"""
+        return self._rw is not None
+    
+    @property
+    def tasks(self):
+        """All tasks; lazy backends return a fresh read-only copy each time"""
+        if self.storage.lazy:
+            with self._read_locked():
+                return self.storage.load()[0]
+        if self._deleted:
+            self._compact_tombstones()
+        return self._tasks
     
-    def __init__(self, filename=None):
-        self.filename = filename or Config.DEFAULT_FILENAME
-        self.tasks = self.load_tasks()
+    @tasks.setter
+    def tasks(self, tasks):
+        self._tasks = tasks
+        self._reindex()
     
+    def _reindex(self, index_states=None):
+        """Rebuild the id index and secondary indexes, or restore them from saved states"""
+        self._index = {}
+        self._positions = {}
+        self._deleted = 0
+        self._tag_index = TagIndex()
+        self._text_index = TextIndex()
+        self._field_index = FieldIndex()
+        self._indexes = [self._tag_index, self._text_index, self._field_index]
+        if self._trigram_index is not None:
+            self._trigram_index = TrigramIndex()
+            self._indexes.append(self._trigram_index)
+        if self._columns is not None:
+            self._columns = type(self._columns)()
+            self._indexes.append(self._columns)
+        # Sorted listings, rebuilt on first use
+        self._views = {}
+        
+        index_states = index_states or {}
+        rebuilt = []
+        for index in self._indexes:
+            state = index_states.get(type(index).__name__)
+            if state is not None:
+                index.restore(state)
+            else:
+                rebuilt.append(index)
+        # The column view fills whole columns at once; the rest index task by task
+        per_task = [index for index in rebuilt if index is not self._columns]
+        for position, task in enumerate(self._tasks):
+            self._index[task['id']] = task
+            self._positions[task['id']] = position
+            for index in per_task:
+                index.add(task)
+        if self._columns is not None:
+            self._columns.add_many(self._tasks)
+        self.next_id = max(self.next_id, max(self._index, default=0) + 1)
+    
+    def _add_to_indexes(self, task):
+        """Add a task to every secondary index"""
+        for index in self._indexes:
+            index.add(task)
+    
+    def _remove_from_indexes(self, task):
+        """Remove a task from every secondary index"""
+        for index in self._indexes:
+            index.remove(task)
+    
+    def _compact_tombstones(self):
+        """Drop the gaps left by deleted tasks from the task list"""
+        self._tasks = [task for task in self._tasks if task is not None]
+        self._positions = {task['id']: position for position, task in enumerate(self._tasks)}
+        self._deleted = 0
+    
+    @_writes
     def load_tasks(self):
-        """Load tasks from JSON file"""
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return []
-        return []
+        """Load tasks from storage, replaying any pending journal records"""
+        if self.storage.lazy:
+            with self._read_locked():
+                return self.storage.load()[0]
+        with self._lock.shared():
+            self._stamp = self._current_stamp()
+            if not self._load_cache():
+                self._install(*self.storage.load())
+        return self.tasks
+    
+    def _install(self, tasks, next_id):
+        """Make a freshly read task list current, replaying any pending journal records"""
+        self.next_id = renumber_duplicate_ids(tasks, next_id)
+        self.tasks = tasks
+        for record in self.storage.replay():
+            self._apply(record)
+    
+    def _fingerprint(self):
+        return file_fingerprint(self.filename, self._stamp)
+    
+    def _index_states(self):
+        """Contents of the secondary indexes, keyed by index type"""
+        # NumPy columns and sorted views are cheap to rebuild and are not saved
+        return {type(index).__name__: index.state() for index in self._indexes
+                if isinstance(index, SecondaryIndex)}
+    
+    def _load_cache(self):
+        """Restore tasks and indexes from the startup cache if it matches the task file"""
+        if self._cache is None:
+            return False
+        fingerprint = self._fingerprint()
+        cached = self._cache.load(fingerprint)
+        if cached is None:
+            return False
+        tasks, next_id, index_states = cached
+        if self._trigram_index is not None and 'TrigramIndex' not in index_states:
+            return False
+        self.next_id = next_id
+        self._tasks = tasks
+        self._reindex(index_states)
+        self._cache_fingerprint = fingerprint
+        return True
+    
+    def _save_cache(self):
+        """Rewrite the startup cache if the task file changed since it was written"""
+        with self._lock.shared():
+            # Only cache tasks that still match the file
+            if self._current_stamp() != self._stamp:
+                return
+            fingerprint = self._fingerprint()
+            if (fingerprint != self._cache_fingerprint and
+                    self._cache.save(fingerprint, self.tasks, self.next_id, self._index_states())):
+                self._cache_fingerprint = fingerprint
     
+    @_writes
+    def recover(self):
+        """Salvage what is readable from a damaged task file and save it cleanly"""
+        if self.storage.lazy:
+            return self.storage.recover()
+        # Lock without the usual reload, which would run a second recovery
+        with self._lock:
+            report = self.storage.recover()
+            self._install(report.tasks, report.next_id)
+            self.save_tasks()
+        return report
+    
+    @_writes
     def save_tasks(self):
-        """Save tasks to JSON file"""
-        with open(self.filename, 'w') as f:
-            json.dump(self.tasks, f, indent=Config.JSON_INDENT)
+        """Save all tasks to storage"""
+        if not self.storage.lazy:
+            with self._locked():
+                self.storage.save(self.tasks, self.next_id)
+                self._saved()
+    
+    def _current_stamp(self):
+        """Stamp of the stored task file as other processes last left it"""
+        return self._lock.generation(), self.storage.signature()
+    
+    def _saved(self):
+        """Tell other processes the task file changed and remember its new stamp"""
+        self._lock.bump()
+        self._stamp = self._current_stamp()
+    
+    @_reads
+    def stale(self):
+        """Whether another process changed the task file since we read it"""
+        if self.storage.lazy or self._lock.held:
+            return False
+        with self._lock.shared():
+            return self._current_stamp() != self._stamp
+    
+    @_writes
+    def refresh(self):
+        """Reload the tasks if another process changed the task file since we read it"""
+        if self.storage.lazy or self._lock.held:
+            return False
+        with self._lock.shared():
+            if self._current_stamp() == self._stamp:
+                return False
+            self.load_tasks()
+        return True
+    
+    @contextmanager
+    def _locked(self):
+        """Hold the task file lock for a change, starting from the latest tasks"""
+        if self.storage.locks_itself or self._lock.held:
+            yield
+            return
+        with self._lock:
+            if self.storage.lazy:
+                self.storage.refresh()
+            elif self._current_stamp() != self._stamp:
+                self.load_tasks()
+            yield
+    
+    @contextmanager
+    def _read_locked(self):
+        """Hold the task file lock shared for a read of lazy storage, from its latest files"""
+        # Lazy backends change their files in place, so a read without the
+        # lock could see another process halfway through a change
+        if self.storage.locks_itself or self._lock.held:
+            yield
+            return
+        with self._lock.shared():
+            self.storage.refresh()
+            yield
+    
+    @_writes
+    def compact(self):
+        """Fold any journal or stale records into a fresh copy of the task file"""
+        if self.storage.lazy:
+            self.storage.compact()
+        else:
+            self.save_tasks()
+    
+    @_writes
+    def close(self):
+        """Release the storage backend, refreshing the startup cache first"""
+        if self._cache is not None:
+            self._save_cache()
+        self.storage.close()
+        self._lock.close()
+    
+    @contextmanager
+    def _exclusive(self):
+        """Hold the tasks alone for a change when thread-safe"""
+        if self._rw is None:
+            yield
+            return
+        with self._rw.writing() as outermost:
+            try:
+                yield
+            finally:
+                # Close deleted tasks' gaps now, while no reader is iterating the list
+                if outermost and not self.storage.lazy and self._deleted:
+                    self._compact_tombstones()
+    
+    @contextmanager
+    def transaction(self):
+        """Save all changes made in the block at once, or undo them on error"""
+        with self._exclusive():
+            with self._transaction():
+                yield self
+    
+    @contextmanager
+    def _transaction(self):
+        if self._batch is not None:
+            # Nested blocks join the outer transaction
+            yield self
+            return
+        if self.storage.lazy:
+            self._batch = []
+            try:
+                with self._locked(), self.storage.transaction():
+                    yield self
+            finally:
+                self._batch = None
+            return
+        
+        with self._locked():
+            self._batch = []
+            self._originals = {}
+            saved_tasks = list(self.tasks)
+            try:
+                yield self
+            except BaseException:
+                for task, original in self._originals.values():
+                    task.update(original)
+                self.tasks = saved_tasks
+                raise
+            else:
+                if self._batch:
+                    self._persist(self._batch)
+            finally:
+                self._batch = None
+                self._originals = None
+    
+    batch = transaction
+    
+    def _remember(self, task_id):
+        """Keep a copy of a task before its first change in a transaction"""
+        if task_id in self._originals:
+            return
+        task = self.get_task_by_id(task_id)
+        if task is not None:
+            self._originals[task_id] = (task, task.copy())
+    
+    def _execute(self, record):
+        """Apply a mutation record to the tasks and persist it"""
+        if self.storage.lazy:
+            with self._locked():
+                return self.storage.apply(record)
+        with self._locked():
+            if self._batch is not None and 'id' in record:
+                self._remember(record['id'])
+            result = self._apply(record)
+            if result:
+                if self._batch is not None:
+                    self._batch.append(record)
+                else:
+                    self._persist([record])
+        return result
+    
+    def _persist(self, records):
+        """Write records incrementally, or a full snapshot if storage needs one"""
+        if self.storage.commit(records):
+            self._saved()
+        else:
+            self.save_tasks()
     
-    def add_task(self, description, priority='medium', tags=None, notes=''):
-        """Add a new task with optional tags and notes"""
+    def _apply(self, record):
+        """Apply a mutation record to the in-memory task list"""
+        # Records are safe to replay twice, so a journal left behind by an
+        # interrupted compaction can be replayed over the new snapshot
+        op = record['op']
+        if op == 'add':
+            task = Task.from_dict(record['task'])
+            if task.id in self._index:
+                return self._index[task.id]
+            self._index[task.id] = task
+            self._positions[task.id] = len(self._tasks)
+            self._tasks.append(task)
+            self._add_to_indexes(task)
+            self.next_id = max(self.next_id, task.id + 1)
+            return task
+        
+        if op == 'delete':
+            position = self._positions.pop(record['id'], None)
+            if position is None:
+                return None
+            # Leave a tombstone instead of shifting every later task
+            task = self._index.pop(record['id'])
+            self._remove_from_indexes(task)
+            self._tasks[position] = None
+            self._deleted += 1
+            if self._deleted > len(self._tasks) * Config.TOMBSTONE_COMPACT_RATIO:
+                self._compact_tombstones()
+            return task
+        
+        task = self._index.get(record['id'])
+        if task is None:
+            return False
+        # Re-index the task around the change so every index sees the new values
+        self._remove_from_indexes(task)
+        if self._rw is not None:
+            # Change a copy, leaving the task readers may hold as it was
+            task = task.copy()
+            self._index[task.id] = task
+            self._tasks[self._positions[task.id]] = task
+        try:
+            task.apply(record)
+        finally:
+            self._add_to_indexes(task)
+        return True
+    
+    @_writes
+    def add_task(self, description, priority='medium', tags=None, notes='', created_at=None):
+        """Add a new task with optional tags, notes and creation time (ISO string or epoch seconds)"""
         if priority not in Config.PRIORITY_LEVELS:
             priority = 'medium'
         
-        task = {
-            'id': len(self.tasks) + 1,
-            'description': description,
-            'priority': priority,
-            'tags': tags or [],
-            'notes': notes,
-            'created_at': datetime.now().isoformat(),
-            'completed': False
-        }
-        self.tasks.append(task)
-        self.save_tasks()
-        return task
+        # Pick the id under the lock so processes sharing the file never collide
+        if self.storage.lazy:
+            with self._locked(), self.storage.transaction():
+                task_id = self.storage.next_id()
+                return self._execute(add_record(task_id, description, priority, tags, notes,
+                                                created_at))
+        with self._locked():
+            return self._execute(add_record(self.next_id, description, priority, tags, notes,
+                                            created_at))
     
-    def list_tasks(self, show_completed=False):
+    @_reads
+    def list_tasks(self, show_completed=False, archived=False):
         """List all tasks, optionally filtering by completion status"""
-        if not self.tasks:
-            return []
+        if self.storage.lazy:
+            tasks = self.storage.list_tasks(show_completed)
+        elif not self.tasks:
+            tasks = []
+        elif show_completed:
+            tasks = self.tasks
+        elif self._columns is not None:
+            tasks = self._tasks_by_ids(self._columns.select(completed=False))
+        else:
+            tasks = [task for task in self.tasks if not task['completed']]
         
-        if show_completed:
-            return self.tasks
+        if archived:
+            return self._with_archived(tasks, self.archived_tasks())
+        return tasks
+    
+    @_reads
+    def list_sorted(self, sort='id', limit=None, after=None, show_completed=False, archived=False):
+        """List tasks in sort order a page at a time, returning (tasks, cursor for the next page)"""
+        # Imported on first use so one-shot commands that never sort skip loading them
+        from task_03.sorting import decode_cursor, encode_cursor, parse_sort, sort_key, top_k
+        fields = parse_sort(sort)
+        key = sort_key(fields)
+        if limit is not None and limit < 1:
+            raise ValueError("The page size must be at least 1")
+        after_key = None if after is None else decode_cursor(fields, after)
+        # One extra task tells whether there is another page
+        wanted = None if limit is None else limit + 1
+        if self.storage.lazy:
+            tasks = top_k(self.list_tasks(show_completed), key, wanted, after_key)
         else:
-            return [task for task in self.tasks if not task['completed']]
+            view = self._sorted_view(fields, show_completed)
+            tasks = [self._index[task_id] for task_id in view.page(wanted, after_key)]
+        if archived:
+            tasks = top_k(tasks + top_k(self.archived_tasks(), key, wanted, after_key), key, wanted)
+        
+        if limit is not None and len(tasks) > limit:
+            tasks = tasks[:limit]
+            return tasks, encode_cursor(fields, key(tasks[-1]))
+        return tasks, None
+    
+    def _sorted_view(self, fields, show_completed):
+        """Sorted view for a listing, built on first use and kept up to date afterwards"""
+        name = (fields, show_completed)
+        with self._views_lock:
+            view = self._views.pop(name, None)
+            if view is None:
+                from task_03.sorting import SortedView
+                view = SortedView(fields, show_completed)
+                view.build(self.tasks)
+                self._indexes.append(view)
+                if len(self._views) >= Config.SORTED_VIEWS:
+                    # Drop the least recently used view
+                    self._indexes.remove(self._views.pop(next(iter(self._views))))
+            self._views[name] = view
+            return view
+    
+    @_reads
+    def filter_tasks(self, completed=None, priority=None, created_after=None,
+                     created_before=None, tag=None):
+        """Return tasks matching every given predicate, in list order"""
+        # priority is a name or a list of names; dates are ISO strings or epoch seconds
+        predicates = self._predicates(completed, priority, created_after, created_before, tag)
+        if self._columns is not None:
+            return self._tasks_by_ids(self._columns.select(**predicates))
+        return [task for task in self.tasks if self._matches(task, **predicates)]
+    
+    @_reads
+    def priority_counts(self, completed=None, priority=None, created_after=None,
+                        created_before=None, tag=None):
+        """Count the tasks matching filter_tasks predicates per priority"""
+        predicates = self._predicates(completed, priority, created_after, created_before, tag)
+        if self._columns is not None:
+            return self._columns.priority_counts(**predicates)
+        counts = {str(p): 0 for p in Priority}
+        for task in self.tasks:
+            if self._matches(task, **predicates):
+                counts[task['priority']] += 1
+        return counts
+    
+    def _predicates(self, completed, priority, created_after, created_before, tag):
+        if created_after is not None:
+            created_after = parse_timestamp(created_after)
+        if created_before is not None:
+            created_before = parse_timestamp(created_before)
+        return dict(completed=completed, priority=priority, created_after=created_after,
+                    created_before=created_before, tag=tag)
+    
+    def _matches(self, task, completed=None, priority=None, created_after=None,
+                 created_before=None, tag=None):
+        """Check one task against the filter_tasks predicates"""
+        if completed is not None and task.completed != bool(completed):
+            return False
+        if priority is not None:
+            if isinstance(priority, (str, int)):
+                priority = [priority]
+            if task.priority not in [Priority.parse(p) for p in priority]:
+                return False
+        if created_after is not None and task.created_at < created_after:
+            return False
+        if created_before is not None and task.created_at >= created_before:
+            return False
+        if tag is not None and normalize_tag(tag) not in {normalize_tag(t) for t in task.tags}:
+            return False
+        return True
     
-    def search_tasks(self, keyword):
+    @_reads
+    def search_tasks(self, keyword, mode='substring', archived=False):
         """Search tasks by keyword in description or notes"""
-        return [task for task in self.tasks 
+        # 'substring' matches any part of the text, in list order; 'ranked'
+        # needs every word of the keyword and puts the best matches first
+        if mode == 'ranked':
+            return self._ranked_search(keyword, self.archived_tasks() if archived else [])
+        if mode != 'substring':
+            raise ValueError(f"Unknown search mode: {mode}")
+        
+        tasks = self.tasks
+        if self._trigram_index is not None and not self.storage.lazy:
+            # Only tasks holding every trigram of the keyword can match
+            candidates = self._trigram_index.candidates(keyword)
+            if candidates is not None:
+                tasks = self._tasks_by_ids(candidates)
+        if archived:
+            tasks = self._with_archived(tasks, self.archived_tasks())
+        return [task for task in tasks
                 if keyword.lower() in task['description'].lower() or
                 keyword.lower() in task.get('notes', '').lower()]
     
-    def search_by_tag(self, tag):
+    def _ranked_search(self, query, archived=()):
+        """Rank tasks matching every word of the query with BM25"""
+        if self.storage.lazy or archived:
+            # No word index covers these tasks, so build one for this query
+            index = TextIndex()
+            tasks = {}
+            for task in list(self.tasks) + list(archived):
+                index.add(task)
+                tasks[task['id']] = task
+            return [tasks[task_id] for task_id in index.search(query)]
+        return [self._index[task_id] for task_id in self._text_index.search(query)]
+    
+    @_reads
+    def search_by_tag(self, tag, archived=False):
         """Search tasks by tag"""
-        # Remove # prefix if provided
-        tag = tag.lstrip('#').lower()
-        return [task for task in self.tasks 
-                if any(tag == t.lstrip('#').lower() for t in task.get('tags', []))]
+        if self.storage.lazy:
+            tasks = self.storage.search_by_tag(tag)
+        else:
+            tasks = self._tasks_by_ids(self._tag_index.lookup(tag))
+        
+        if archived:
+            key = normalize_tag(tag)
+            return self._with_archived(tasks, [
+                task for task in self.archived_tasks()
+                if any(normalize_tag(task_tag) == key for task_tag in task['tags'])])
+        return tasks
+    
+    @_reads
+    def filter_by_tags(self, query, archived=False):
+        """Return tasks matching a tag query such as '#work #urgent -#blocked' or '#a|#b'"""
+        parsed = parse_tag_query(query)
+        required, excluded = parsed
+        if self.storage.lazy:
+            tasks = [task for task in self.tasks if matches_tag_query(task, parsed)]
+        elif required:
+            tasks = self._tasks_by_ids(self._tag_index.query(parsed))
+        else:
+            # Only exclusions: most tasks match, so walk the list instead
+            skipped = Bitmap()
+            for term in excluded:
+                skipped = skipped | self._tag_index.union(term)
+            tasks = [task for task in self.tasks if task.id not in skipped]
+        
+        if archived:
+            return self._with_archived(tasks, [task for task in self.archived_tasks()
+                                               if matches_tag_query(task, parsed)])
+        return tasks
+    
+    @_reads
+    def query(self, text):
+        """Return tasks matching a query such as '#work priority:high status:pending "deploy"'"""
+        return self._run_query(text)[0]
     
+    @_reads
+    def explain(self, text):
+        """Run a query and return its QueryPlan, with the rows examined and matched"""
+        return self._run_query(text)[1]
+    
+    def _run_query(self, text):
+        """Plan a query against the indexes, then fetch and check the candidate tasks"""
+        from task_03.query import QueryIndexes, parse_query, plan_query
+        terms = parse_query(text)
+        if self.storage.lazy:
+            tasks = self.tasks
+            plan = plan_query(terms, None, len(tasks))
+            return plan.filter(tasks), plan
+        indexes = QueryIndexes(self._index, self._tag_index, self._field_index)
+        plan = plan_query(terms, indexes, len(self._index))
+        ids = plan.candidate_ids(indexes)
+        return plan.filter(self.tasks if ids is None else self._tasks_by_ids(ids)), plan
+    
+    def _tasks_by_ids(self, task_ids):
+        """Return the tasks with the given ids in list order"""
+        positions = sorted(self._positions[task_id] for task_id in task_ids)
+        return [self._tasks[position] for position in positions]
+    
+    @_reads
     def get_all_tags(self):
         """Get a list of all unique tags used across all tasks"""
-        all_tags = set()
-        for task in self.tasks:
-            all_tags.update(task.get('tags', []))
-        return sorted(list(all_tags))
+        if self.storage.lazy:
+            return self.storage.all_tags()
+        return self._tag_index.names()
+    
+    @_reads
+    def get_tag_counts(self):
+        """Get the number of tasks using each tag, sorted by tag"""
+        if self.storage.lazy:
+            return self.storage.tag_counts()
+        return {tag: self._tag_index.counts[tag] for tag in self._tag_index.names()}
     
+    @_reads
+    def get_tag_tree(self):
+        """Get (depth, segment, task count) for each level of the tag hierarchy, in tree order"""
+        if self.storage.lazy:
+            # No tag index is kept for these, so build one for this call
+            index = TagIndex()
+            for task in self.tasks:
+                index.add(task)
+            tree = index.tree
+        else:
+            tree = self._tag_index.tree
+        return list(tree.walk())
+    
+    @_writes
     def add_note(self, task_id, note_text):
         """Add or update notes for a task"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                task['notes'] = note_text
-                self.save_tasks()
-                return True
-        return False
+        return self._execute({'op': 'note', 'id': task_id, 'notes': note_text})
+    
+    @_writes
+    def update_task(self, task_id, description=None, priority=None, tags=None):
+        """Change the description, priority or tags (replacing them all) of a task"""
+        record = {'op': 'update', 'id': task_id}
+        if description is not None:
+            record['description'] = description
+        if priority is not None:
+            record['priority'] = validate_priority(priority)
+        if tags is not None:
+            record['tags'] = list(tags)
+        return self._execute(record)
     
+    @_writes
     def add_tags(self, task_id, tags):
         """Add tags to a task"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                existing_tags = task.get('tags', [])
-                # Add new tags, avoid duplicates
-                for tag in tags:
-                    if tag not in existing_tags:
-                        existing_tags.append(tag)
-                task['tags'] = existing_tags
-                self.save_tasks()
-                return True
-        return False
+        return self._execute({'op': 'tag', 'id': task_id, 'tags': list(tags)})
     
+    @_writes
     def remove_tags(self, task_id, tags):
         """Remove tags from a task"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                existing_tags = task.get('tags', [])
-                for tag in tags:
-                    if tag in existing_tags:
-                        existing_tags.remove(tag)
-                task['tags'] = existing_tags
-                self.save_tasks()
-                return True
-        return False
+        return self._execute({'op': 'untag', 'id': task_id, 'tags': list(tags)})
     
+    @_writes
     def complete_task(self, task_id):
         """Mark a task as completed"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                task['completed'] = True
-                self.save_tasks()
-                return True
-        return False
+        return self._execute({'op': 'complete', 'id': task_id})
     
+    @_writes
     def delete_task(self, task_id):
         """Delete a task by ID"""
-        for i, task in enumerate(self.tasks):
-            if task['id'] == task_id:
-                removed_task = self.tasks.pop(i)
-                self.save_tasks()
-                return removed_task
-        return None
-    
-    def get_task_by_id(self, task_id):
+        return self._execute({'op': 'delete', 'id': task_id})
+    
+    @_reads
+    def get_task_by_id(self, task_id, archived=False):
         """Retrieve a specific task by ID"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                return task
-        return None
\ No newline at end of file
+        if self.storage.lazy:
+            task = self.storage.get(task_id)
+        else:
+            task = self._index.get(task_id)
+        if task is None and archived:
+            task = next((t for t in self.archived_tasks() if t['id'] == task_id), None)
+        return task
+    
+    @_writes
+    def archive_tasks(self, older_than_days=None):
+        """Move completed tasks created more than the given number of days ago to the archive"""
+        if older_than_days is None:
+            older_than_days = Config.ARCHIVE_AFTER_DAYS
+        cutoff = datetime.now().timestamp() - older_than_days * 24 * 60 * 60
+        with self.transaction():
+            tasks = [task for task in self.tasks
+                     if task.completed and task.created_at < cutoff]
+            if tasks:
+                # Archive before deleting; an interruption leaves a copy in both, not neither
+                self._archive.append(tasks)
+                for task in tasks:
+                    self._execute({'op': 'delete', 'id': task.id})
+        return tasks
+    
+    @_reads
+    def archived_tasks(self):
+        """All archived tasks in id order, read from the archive on first use"""
+        with self._lock.shared():
+            tasks = self._archive.tasks()
+        if not tasks:
+            return []
+        # Skip tasks an interrupted archive run left in the working set as well
+        if self.storage.lazy:
+            live = {task['id'] for task in self.tasks}
+        else:
+            live = self._index
+        return [task for task in tasks if task['id'] not in live]
+    
+    def _with_archived(self, tasks, archived):
+        """Merge archived tasks into a list of working tasks by id"""
+        if not archived:
+            return tasks
+        return sorted(list(tasks) + archived, key=lambda task: task['id'])
\ No newline at end of file
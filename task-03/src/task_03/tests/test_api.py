@@ -0,0 +1,161 @@
+"""
+Tests for the asyncio HTTP API
+"""
+
+import asyncio
+import json
+from task_03.api import TaskApi
+from task_03.task_manager import TaskManager
+
+
+async def request(reader, writer, method, path, body=None):
+    """Send one request on a kept-alive connection; return (status, headers, body bytes)"""
+    data = b'' if body is None else json.dumps(body).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n\r\n"
+                 .encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        content = b''
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if not size:
+                break
+            content += chunk[:-2]
+    else:
+        content = await reader.readexactly(int(headers['content-length']))
+    return status, headers, content
+
+
+def run_against_api(tmp_path, scenario):
+    """Start an API over a fresh task file, run scenario(reader, writer, api) against it"""
+    async def main():
+        api = TaskApi(TaskManager(str(tmp_path / "tasks.json"), thread_safe=True))
+        server = await api.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            await scenario(reader, writer, api)
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            api.close()
+    asyncio.run(main())
+
+
+def ndjson(content):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+def test_routes(tmp_path):
+    """Test adding, reading, changing and deleting tasks over one kept-alive connection"""
+    async def scenario(reader, writer, api):
+        status, _, body = await request(reader, writer, 'POST', '/tasks',
+                                        {'description': 'Report', 'priority': 'high',
+                                         'tags': ['#work']})
+        assert status == 201
+        assert json.loads(body)['id'] == 1
+        await request(reader, writer, 'POST', '/tasks', {'description': 'Groceries'})
+        
+        status, headers, body = await request(reader, writer, 'GET', '/tasks')
+        assert headers['transfer-encoding'] == 'chunked'
+        assert [task['description'] for task in ndjson(body)] == ['Report', 'Groceries']
+        
+        status, _, body = await request(reader, writer, 'PUT', '/tasks/2/notes', {'notes': 'milk'})
+        assert json.loads(body)['notes'] == 'milk'
+        status, _, body = await request(reader, writer, 'POST', '/tasks/1/complete')
+        assert json.loads(body)['completed'] is True
+        
+        _, _, body = await request(reader, writer, 'GET', '/filter?q=%23work')
+        assert [task['id'] for task in ndjson(body)] == [1]
+        _, _, body = await request(reader, writer, 'GET', '/search?q=groceries')
+        assert [task['id'] for task in ndjson(body)] == [2]
+        
+        status, _, _ = await request(reader, writer, 'DELETE', '/tasks/2')
+        assert status == 200
+        status, _, _ = await request(reader, writer, 'GET', '/tasks/2')
+        assert status == 404
+        _, _, body = await request(reader, writer, 'GET', '/tasks?all=1')
+        assert [task['id'] for task in ndjson(body)] == [1]
+    run_against_api(tmp_path, scenario)
+    
+    tm = TaskManager(str(tmp_path / "tasks.json"))
+    assert [task['description'] for task in tm.tasks] == ['Report']
+    tm.close()
+
+
+def test_sorted_pages(tmp_path):
+    """Test that sorted listings pass the next page's cursor in a header"""
+    async def scenario(reader, writer, api):
+        for i in range(5):
+            await request(reader, writer, 'POST', '/tasks', {'description': f'Task {i}'})
+        _, headers, body = await request(reader, writer, 'GET', '/tasks?sort=-id&limit=3')
+        assert [task['id'] for task in ndjson(body)] == [5, 4, 3]
+        _, headers, body = await request(reader, writer, 'GET',
+                                         f"/tasks?sort=-id&limit=3&after={headers['x-next-cursor']}")
+        assert [task['id'] for task in ndjson(body)] == [2, 1]
+        assert 'x-next-cursor' not in headers
+    run_against_api(tmp_path, scenario)
+
+
+def test_errors(tmp_path):
+    """Test the status codes of bad requests"""
+    async def scenario(reader, writer, api):
+        assert (await request(reader, writer, 'GET', '/nowhere'))[0] == 404
+        assert (await request(reader, writer, 'PATCH', '/tasks'))[0] == 405
+        assert (await request(reader, writer, 'POST', '/tasks', {'description': ' '}))[0] == 400
+        assert (await request(reader, writer, 'GET', '/filter'))[0] == 400
+        assert (await request(reader, writer, 'GET', '/tasks?sort=colour'))[0] == 400
+        # A cursor of the right sort whose key holds a string
+        assert (await request(reader, writer, 'GET',
+                              '/tasks?sort=id&after=WyJpZCIsIFsieCIsIDFdXQ'))[0] == 400
+        assert (await request(reader, writer, 'POST', '/tasks/9/complete'))[0] == 404
+    run_against_api(tmp_path, scenario)
+
+
+def test_add_validates_fields(tmp_path):
+    """Test that badly typed tags and unknown priorities get 400 instead of 500"""
+    async def scenario(reader, writer, api):
+        for body in ({'description': 'Report', 'tags': [1]},
+                     {'description': 'Report', 'tags': [None]},
+                     {'description': 'Report', 'tags': '#work'},
+                     {'description': 'Report', 'priority': 2},
+                     {'description': 'Report', 'priority': 'urgent'},
+                     {'description': 'Report', 'notes': ['milk']}):
+            status, _, content = await request(reader, writer, 'POST', '/tasks', body)
+            assert status == 400, body
+            assert 'error' in json.loads(content)
+        status, _, content = await request(reader, writer, 'POST', '/tasks',
+                                           {'description': 'Report', 'priority': 'HIGH'})
+        assert status == 201
+        assert json.loads(content)['priority'] == 'high'
+        assert api.tm.tasks == [api.tm.get_task_by_id(1)]
+    run_against_api(tmp_path, scenario)
+
+
+def test_parallel_clients(tmp_path):
+    """Test that concurrent connections adding and listing lose no task"""
+    async def scenario(reader, writer, api):
+        port = writer.get_extra_info('peername')[1]
+        
+        async def client(number):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            for i in range(10):
+                await request(reader, writer, 'POST', '/tasks', {'description': f'{number}-{i}'})
+                status, _, _ = await request(reader, writer, 'GET', '/tasks')
+                assert status == 200
+            writer.close()
+        await asyncio.gather(*(client(number) for number in range(5)))
+        
+        _, _, body = await request(reader, writer, 'GET', '/tasks')
+        assert sorted(task['id'] for task in ndjson(body)) == list(range(1, 51))
+    run_against_api(tmp_path, scenario)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Tests for running the CLI non-interactively
+"""
+
+import io
+import json
+from task_03.cli import main
+from task_03.config import Config
+from task_03.journal import TaskJournal
+from task_03.storage import JsonBackend
+from task_03.task_manager import TaskManager
+
+
+def descriptions(path):
+    with open(path) as f:
+        return [task['description'] for task in json.load(f)['tasks']]
+
+
+def test_script_runs_as_one_batch(tmp_path, monkeypatch, capsys):
+    """Test that a script's commands are saved together and errors do not stop it"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "commands.txt").write_text(
+        "# set up\nadd Report high #work\n\nadd Groceries\ncomplete 7\ncomplete 1\n")
+    
+    assert main(["run", "commands.txt"]) == 0
+    
+    assert descriptions(tmp_path / "tasks.json") == ["Report", "Groceries"]
+    assert "Task 7 not found" in capsys.readouterr().out
+
+
+def test_strict_script_stops_and_undoes(tmp_path, monkeypatch, capsys):
+    """Test that --strict exits non-zero at the first error and saves nothing from the script"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("sys.stdin", io.StringIO("add First\n"))
+    assert main(["-"]) == 0
+    
+    monkeypatch.setattr("sys.stdin", io.StringIO("add Second\ncomplete x\nadd Third\n"))
+    assert main(["-", "--strict"]) == 1
+    
+    assert descriptions(tmp_path / "tasks.json") == ["First"]
+    assert "Stopped at line 2" in capsys.readouterr().out
+
+
+def test_one_shot_add_appends_without_loading(tmp_path, monkeypatch, capsys):
+    """Test that add on journal storage picks the next id without reading the snapshot's tasks"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "STORAGE_BACKEND", "journal")
+    tm = TaskManager()
+    tm.add_task("Old")
+    tm.save_tasks()
+    tm.add_task("Journaled")
+    tm.close()
+    
+    def refuse_load(self):
+        raise AssertionError("the task file was loaded")
+    monkeypatch.setattr(JsonBackend, "load", refuse_load)
+    assert main(["add", "deploy hotfix", "high", "#ops"]) == 0
+    monkeypatch.undo()
+    
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "STORAGE_BACKEND", "journal")
+    tm = TaskManager()
+    task = tm.get_task_by_id(3)
+    assert (task['description'], task['priority'], task['tags']) == ("deploy hotfix", "high", ["#ops"])
+    assert tm.add_task("Next")['id'] == 4
+    tm.close()
+
+
+def test_one_shot_adds_keep_the_journal_small(tmp_path, monkeypatch, capsys):
+    """Test that repeated one-shot adds read a stored next id and compact the journal"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "STORAGE_BACKEND", "journal")
+    monkeypatch.setattr(Config, "JOURNAL_COMPACT_BYTES", 2000)
+    assert main(["add", "Task 1"]) == 0
+    
+    reads = []
+    real_read = TaskJournal.read
+    
+    def counting_read(self):
+        reads.append(self.filename)
+        return real_read(self)
+    monkeypatch.setattr(TaskJournal, "read", counting_read)
+    journal = tmp_path / "tasks.json.journal"
+    for i in range(2, 41):
+        assert main(["add", f"Task {i}"]) == 0
+        assert not journal.exists() or journal.stat().st_size <= 2000
+    # Only the loads that compacted the journal read it, not every add
+    assert 0 < len(reads) < 10
+    
+    tm = TaskManager()
+    assert [task['id'] for task in tm.tasks] == list(range(1, 41))
+    assert tm.add_task("Next")['id'] == 41
+    tm.close()
+
+
+def test_one_shot_commands(tmp_path, monkeypatch, capsys):
+    """Test that other commands load the tasks and report failure in the exit status"""
+    monkeypatch.chdir(tmp_path)
+    assert main(["add", "Report", "#work"]) == 0
+    assert main(["complete", "1"]) == 0
+    assert main(["complete", "9"]) == 1
+    assert main(["view", "9"]) == 1
+    assert main(["list", "all"]) == 0
+    
+    assert descriptions(tmp_path / "tasks.json") == ["Report"]
+    assert "Task 9 not found" in capsys.readouterr().out
+
+
+def test_search_matches_substrings_by_default(tmp_path, monkeypatch, capsys):
+    """Test that search matches any part of the text unless --ranked is given"""
+    monkeypatch.chdir(tmp_path)
+    assert main(["add", "Buy groceries"]) == 0
+    capsys.readouterr()
+    
+    assert main(["search", "roc"]) == 0
+    assert "Buy groceries" in capsys.readouterr().out
+    assert main(["search", "--ranked", "roc"]) == 0
+    assert "Buy groceries" not in capsys.readouterr().out
+
+
+def test_tag_skips_stray_words(tmp_path, monkeypatch, capsys):
+    """Test that tag and untag take several leading ids and skip words that are not tags"""
+    monkeypatch.chdir(tmp_path)
+    assert main(["add", "Report"]) == 0
+    assert main(["add", "Groceries"]) == 0
+    
+    assert main(["tag", "1", "2", "urgent", "#work"]) == 0
+    assert main(["untag", "2", "please", "#work"]) == 0
+    assert main(["tag", "urgent", "#work"]) == 1
+    
+    tm = TaskManager()
+    assert [task['tags'] for task in tm.tasks] == [["#work"], []]
+    tm.close()
+    assert "Invalid task ID" in capsys.readouterr().out
+
+
+def test_one_shot_arguments_are_passed_as_given(tmp_path, monkeypatch):
+    """Test that --strict is not part of a one-shot command and quoted spacing survives"""
+    monkeypatch.chdir(tmp_path)
+    assert main(["add", "Report", "--strict"]) == 0
+    assert main(["note", "1", "Call  Anna", "--strict"]) == 0
+    
+    tm = TaskManager()
+    task = tm.get_task_by_id(1)
+    assert (task['description'], task['notes']) == ("Report", "Call  Anna")
+    tm.close()
\ No newline at end of file
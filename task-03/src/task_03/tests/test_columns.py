@@ -0,0 +1,88 @@
+"""
+Tests for filtering tasks, with and without the NumPy column view
+"""
+
+import pytest
+from task_03.task_manager import TaskManager
+
+
+def make_task_manager(tmp_path, columnar):
+    tm = TaskManager(filename=str(tmp_path / "tasks.json"), columnar=columnar)
+    tm.add_task("Report", priority="high", tags=["#work"], created_at="2025-01-01T00:00:00")
+    tm.add_task("Groceries", priority="low", tags=["#home", "#shopping"],
+                created_at="2025-02-01T00:00:00")
+    tm.add_task("Client call", priority="high", tags=["#Work"], created_at="2025-03-01T00:00:00")
+    tm.add_task("Taxes", priority="medium", created_at="2025-04-01T00:00:00")
+    tm.complete_task(3)
+    return tm
+
+
+@pytest.fixture(params=[False, pytest.param(True, id="numpy")])
+def task_manager(request, tmp_path):
+    """A TaskManager with and without the column view"""
+    if request.param:
+        pytest.importorskip("numpy")
+    tm = make_task_manager(tmp_path, request.param)
+    yield tm
+    tm.close()
+
+
+def ids(tasks):
+    return [task['id'] for task in tasks]
+
+
+def test_filter_predicates(task_manager):
+    """Test each predicate and their combination"""
+    tm = task_manager
+    assert ids(tm.filter_tasks(completed=False)) == [1, 2, 4]
+    assert ids(tm.filter_tasks(priority="high")) == [1, 3]
+    assert ids(tm.filter_tasks(priority=["low", "medium"])) == [2, 4]
+    assert ids(tm.filter_tasks(created_after="2025-02-01", created_before="2025-04-01")) == [2, 3]
+    assert ids(tm.filter_tasks(tag="work")) == [1, 3]
+    assert ids(tm.filter_tasks(tag="#work", completed=False)) == [1]
+    assert ids(tm.filter_tasks(tag="#nothing")) == []
+    assert tm.priority_counts(completed=False) == {"low": 1, "medium": 1, "high": 1}
+
+
+def test_filters_follow_changes(task_manager):
+    """Test that mutations update the view without a rebuild"""
+    tm = task_manager
+    tm.add_tags(4, ["#work"])
+    tm.remove_tags(1, ["#work"])
+    tm.delete_task(2)
+    tm.add_task("New", priority="high", tags=["#work"])
+    
+    assert ids(tm.filter_tasks(tag="#work")) == [3, 4, 5]
+    assert ids(tm.list_tasks()) == [1, 4, 5]
+    assert tm.priority_counts() == {"low": 0, "medium": 1, "high": 3}
+
+
+def test_columns_compact_after_deletes(tmp_path):
+    """Test that dead rows are dropped once they outnumber live ones"""
+    pytest.importorskip("numpy")
+    tm = make_task_manager(tmp_path, True)
+    for task_id in (1, 2, 4):
+        tm.delete_task(task_id)
+    
+    assert tm._columns.size == 1
+    assert ids(tm.filter_tasks(tag="#work")) == [3]
+    tm.add_tags(3, ["#home"])
+    assert ids(tm.filter_tasks(tag="#home")) == [3]
+    tm.close()
+
+
+def test_untagged_rows_survive_compaction(tmp_path):
+    """Test that tasks without tags can still change after dead rows are dropped"""
+    pytest.importorskip("numpy")
+    tm = TaskManager(filename=str(tmp_path / "tasks.json"), columnar=True)
+    for i in range(4):
+        tm.add_task(f"Task {i}")
+    for task_id in (1, 2, 3):
+        tm.delete_task(task_id)
+    
+    assert tm.complete_task(4)
+    assert ids(tm.filter_tasks(completed=True)) == [4]
+    tm.add_tags(4, ["#done"])
+    assert ids(tm.filter_tasks(tag="#done")) == [4]
+    assert ids(tm.search_by_tag("#done")) == [4]
+    tm.close()
\ No newline at end of file
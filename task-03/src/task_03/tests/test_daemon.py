@@ -0,0 +1,120 @@
+"""
+Tests for the task daemon and the client that forwards to it
+"""
+
+import socket
+import threading
+import pytest
+from task_03.cli import main
+from task_03.daemon import DaemonClient, TaskDaemon, forward
+from task_03.task_manager import TaskManager
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    """A daemon serving tasks.json in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    daemon = TaskDaemon(TaskManager(thread_safe=True))
+    daemon.start()
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    thread.join()
+    daemon.close()
+
+
+def test_client_runs_commands_in_daemon(daemon, capsys):
+    """Test that one-shot commands go to the daemon and change its tasks in memory"""
+    assert main(["add", "deploy hotfix", "high", "#ops"]) == 0
+    assert main(["complete", "9"]) == 1
+    
+    assert [task['description'] for task in daemon.tm.tasks] == ["deploy hotfix"]
+    out = capsys.readouterr().out
+    assert "Task added: deploy hotfix" in out
+    assert "Task 9 not found" in out
+
+
+def test_connection_serves_several_requests(daemon):
+    """Test that a client can send several commands over one connection"""
+    client = DaemonClient(daemon.path)
+    try:
+        assert client.run(["add", "First"])[1] == 0
+        assert client.run(["note", "1", "Call  Anna"])[1] == 0
+        output, status = client.run(["list"])
+    finally:
+        client.close()
+    assert status == 0
+    assert "First" in output
+    # Arguments arrive as given, not joined and split again
+    assert daemon.tm.get_task_by_id(1)['notes'] == "Call  Anna"
+
+
+def test_daemon_picks_up_other_processes_changes(daemon):
+    """Test that a read reloads the task file when another TaskManager changed it"""
+    other = TaskManager()
+    other.add_task("From elsewhere")
+    other.close()
+    
+    client = DaemonClient(daemon.path)
+    try:
+        output, _ = client.run(["list"])
+    finally:
+        client.close()
+    assert "From elsewhere" in output
+
+
+def test_concurrent_clients(daemon):
+    """Test that parallel readers and writers all get answers and no add is lost"""
+    failures = []
+    
+    def work(worker):
+        client = DaemonClient(daemon.path)
+        try:
+            for i in range(20):
+                command = ["add", f"Task {worker}-{i}"] if i % 2 else ["list", "all"]
+                if client.run(command)[1] != 0:
+                    failures.append(command)
+        finally:
+            client.close()
+    
+    threads = [threading.Thread(target=work, args=(worker,)) for worker in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert failures == []
+    assert len(daemon.tm.tasks) == 60
+    assert len({task['id'] for task in daemon.tm.tasks}) == 60
+
+
+def test_fallback_without_daemon(tmp_path, monkeypatch):
+    """Test that forwarding reports no daemon when the socket is missing or dead"""
+    monkeypatch.chdir(tmp_path)
+    assert forward(["list"], "tasks.json.sock") is None
+    (tmp_path / "tasks.json.sock").write_text("")
+    assert forward(["list"], "tasks.json.sock") is None
+    assert main(["add", "Offline"]) == 0
+
+
+def test_fallback_when_daemon_hangs_up(tmp_path, monkeypatch, capsys):
+    """Test that a daemon closing the connection without a reply runs the command in-process"""
+    monkeypatch.chdir(tmp_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind("tasks.json.sock")
+    server.listen()
+    
+    def hang_up():
+        for _ in range(2):
+            connection, _ = server.accept()
+            connection.close()
+    thread = threading.Thread(target=hang_up)
+    thread.start()
+    try:
+        assert forward(["list"], "tasks.json.sock") is None
+        assert main(["add", "Offline"]) == 0
+    finally:
+        thread.join()
+        server.close()
+    assert "Task added: Offline" in capsys.readouterr().out
\ No newline at end of file
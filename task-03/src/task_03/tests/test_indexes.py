@@ -0,0 +1,247 @@
+"""
+Tests for the secondary indexes kept by TaskManager
+"""
+
+import pytest
+from task_03.bitmaps import Bitmap
+from task_03.indexes import matches_tag_query, parse_tag_query
+from task_03.task_manager import TaskManager
+
+
+@pytest.fixture
+def temp_task_manager(tmp_path):
+    """Create a TaskManager with a temporary file for testing"""
+    test_file = tmp_path / "test_tasks.json"
+    return TaskManager(filename=str(test_file))
+
+
+def test_tag_index_follows_changes(temp_task_manager):
+    """Test that tag lookups stay correct as tags are added and removed"""
+    tm = temp_task_manager
+    tm.add_task("Task 1", tags=["#Work", "#urgent"])
+    tm.add_task("Task 2", tags=["#work"])
+    tm.add_task("Task 3")
+    tm.add_tags(3, ["#WORK"])
+    tm.remove_tags(1, ["#Work"])
+    tm.delete_task(2)
+    
+    assert [t['id'] for t in tm.search_by_tag("work")] == [3]
+    assert [t['id'] for t in tm.search_by_tag("#URGENT")] == [1]
+    assert tm.search_by_tag("#missing") == []
+
+
+def test_tag_counts(temp_task_manager):
+    """Test usage counts per tag"""
+    tm = temp_task_manager
+    tm.add_task("Task 1", tags=["#work", "#urgent"])
+    tm.add_task("Task 2", tags=["#work"])
+    tm.add_task("Task 3", tags=["#home"])
+    tm.delete_task(3)
+    tm.complete_task(1)
+    
+    assert tm.get_tag_counts() == {"#urgent": 1, "#work": 2}
+    assert tm.get_all_tags() == ["#urgent", "#work"]
+    
+    tm.add_tags(2, ["#home"])
+    assert tm.get_all_tags() == ["#home", "#urgent", "#work"]
+
+
+def test_tag_index_matches_full_scan(temp_task_manager):
+    """Test the index against a linear scan after many changes"""
+    tm = temp_task_manager
+    with tm.transaction():
+        for i in range(200):
+            tm.add_task(f"Task {i}", tags=[f"#t{i % 7}", f"#T{i % 3}"])
+        for i in range(1, 200, 5):
+            tm.delete_task(i)
+        for i in range(2, 200, 3):
+            tm.remove_tags(i, [f"#t{(i - 1) % 7}"])
+    
+    for tag in ["#t0", "#t1", "#t2", "#t5"]:
+        expected = [t for t in tm.tasks
+                    if any(tag.lower() == x.lower() for x in t['tags'])]
+        assert tm.search_by_tag(tag) == expected
+
+
+def test_ranked_search_requires_every_word(temp_task_manager):
+    """Test that ranked search is an AND over the query words"""
+    tm = temp_task_manager
+    tm.add_task("Buy milk")
+    tm.add_task("Buy bread", notes="and milk from the corner shop")
+    tm.add_task("Drink milk")
+    
+    results = tm.search_tasks("milk buy", mode="ranked")
+    assert sorted(t['id'] for t in results) == [1, 2]
+    assert tm.search_tasks("buy cheese", mode="ranked") == []
+
+
+def test_ranked_search_orders_by_relevance(temp_task_manager):
+    """Test that tasks mentioning a rare word more often rank first"""
+    tm = temp_task_manager
+    tm.add_task("Deploy the app", notes="long notes about many other things entirely")
+    tm.add_task("Deploy deploy deploy")
+    tm.add_task("Write docs")
+    
+    assert [t['id'] for t in tm.search_tasks("deploy", mode="ranked")] == [2, 1]
+
+
+def test_text_index_follows_notes_and_deletes(temp_task_manager):
+    """Test that note changes and deletes update the word index"""
+    tm = temp_task_manager
+    tm.add_task("Task 1", notes="groceries")
+    tm.add_task("Task 2")
+    tm.add_note(1, "laundry")
+    tm.add_note(2, "groceries")
+    tm.delete_task(2)
+    
+    assert tm.search_tasks("groceries", mode="ranked") == []
+    assert [t['id'] for t in tm.search_tasks("laundry", mode="ranked")] == [1]
+
+
+def test_substring_mode_is_unchanged(temp_task_manager):
+    """Test that the default search still matches parts of words"""
+    tm = temp_task_manager
+    tm.add_task("Buy groceries")
+    
+    assert len(tm.search_tasks("roc")) == 1
+    assert tm.search_tasks("roc", mode="ranked") == []
+
+
+def test_trigram_search_matches_linear_scan(tmp_path):
+    """Test that the trigram index returns exactly what a full scan does"""
+    plain = TaskManager(filename=str(tmp_path / "plain.json"))
+    indexed = TaskManager(filename=str(tmp_path / "indexed.json"), trigram_index=True)
+    words = ["groceries", "Rocket", "crocus", "report", "ÉCOLE", "deploy api", "go"]
+    for tm in (plain, indexed):
+        with tm.transaction():
+            for i in range(60):
+                tm.add_task(f"{words[i % 7]} {i}", notes=words[(i * 3) % 7])
+            for i in range(1, 60, 4):
+                tm.delete_task(i)
+            for i in range(2, 60, 9):
+                tm.add_note(i, "unrelated")
+    
+    for keyword in ["roc", "ROCK", "école", "y a", "go", "", "s 1", "zzz", "report 5"]:
+        expected = [t['id'] for t in plain.search_tasks(keyword)]
+        assert [t['id'] for t in indexed.search_tasks(keyword)] == expected
+
+
+def test_trigram_candidates_are_narrow(tmp_path):
+    """Test that only tasks holding the keyword's trigrams are checked"""
+    tm = TaskManager(filename=str(tmp_path / "tasks.json"), trigram_index=True)
+    with tm.transaction():
+        for i in range(500):
+            tm.add_task(f"Task number {i}")
+        tm.add_task("Buy groceries")
+    
+    assert len(tm._trigram_index.candidates("roc")) == 1
+    assert [t['description'] for t in tm.search_tasks("roc")] == ["Buy groceries"]
+
+
+def test_bitmap_set_operations():
+    """Test bitmap operations across sparse and dense chunks"""
+    dense = Bitmap(range(0, 200_000, 3))
+    sparse = Bitmap([1, 3, 6, 70_000, 70_002, 10**9])
+    
+    assert list(dense & sparse) == [3, 6, 70_002]
+    assert list(sparse - dense) == [1, 70_000, 10**9]
+    assert len(dense | sparse) == len(dense) + 3
+    assert list(dense - dense) == []
+    
+    dense.discard(3)
+    dense.add(1)
+    assert 3 not in dense and 1 in dense and 4 not in dense
+    assert list(dense)[:4] == [0, 1, 6, 9]
+
+
+def test_parse_tag_query():
+    """Test splitting a tag query into required and excluded alternatives"""
+    assert parse_tag_query("#work #Urgent -#blocked") == ([["work"], ["urgent"]], [["blocked"]])
+    assert parse_tag_query("#a|#b -#c|#d") == ([["a", "b"]], [["c", "d"]])
+    with pytest.raises(ValueError):
+        parse_tag_query("  ")
+    with pytest.raises(ValueError):
+        parse_tag_query("#work -#")
+
+
+def test_tag_query_matches_full_scan(temp_task_manager):
+    """Test AND/OR/NOT tag queries against a linear scan"""
+    tm = temp_task_manager
+    with tm.transaction():
+        for i in range(300):
+            tm.add_task(f"Task {i}", tags=[f"#t{i % 5}", f"#u{i % 7}"])
+        for i in range(1, 300, 11):
+            tm.delete_task(i)
+    
+    for query in ["#t1 #u2", "#t1|#t2 -#u0", "-#t0", "#t1 #t2", "#missing|#u3"]:
+        parsed = parse_tag_query(query)
+        expected = [t for t in tm.tasks if matches_tag_query(t, parsed)]
+        assert tm.filter_by_tags(query) == expected
+    assert tm.filter_by_tags("#t1 #t2") == []
+
+
+def test_tag_query_survives_startup_cache(tmp_path):
+    """Test that tag bitmaps are restored from the startup cache"""
+    filename = str(tmp_path / "tasks.json")
+    tm = TaskManager(filename=filename)
+    tm.add_task("Task 1", tags=["#work", "#urgent"])
+    tm.add_task("Task 2", tags=["#work/docs", "#blocked"])
+    tm.close()
+    
+    warm = TaskManager(filename=filename)
+    assert warm._cache_fingerprint is not None
+    assert [t['id'] for t in warm.filter_by_tags("#work -#blocked")] == [1]
+    assert [t['id'] for t in warm.filter_by_tags("#work")] == [1, 2]
+    warm.add_tags(2, ["#urgent"])
+    assert [t['id'] for t in warm.filter_by_tags("#urgent")] == [1, 2]
+    warm.close()
+
+
+def test_filter_matches_nested_tags(temp_task_manager):
+    """Test that a tag query matches every tag below it in the hierarchy"""
+    tm = temp_task_manager
+    tm.add_task("Task 1", tags=["#client/acme/infra"])
+    tm.add_task("Task 2", tags=["#Client/Acme"])
+    tm.add_task("Task 3", tags=["#client/globex", "#client/acme/web"])
+    tm.add_task("Task 4", tags=["#clientele"])
+    
+    assert [t['id'] for t in tm.filter_by_tags("#client/acme")] == [1, 2, 3]
+    assert [t['id'] for t in tm.filter_by_tags("#client -#client/acme")] == []
+    assert [t['id'] for t in tm.filter_by_tags("#client/acme/infra|#client/globex")] == [1, 3]
+    assert [t['id'] for t in tm.search_by_tag("#client/acme")] == [2]
+    
+    tm.remove_tags(3, ["#client/acme/web"])
+    assert [t['id'] for t in tm.filter_by_tags("#client -#client/acme")] == [3]
+
+
+def test_empty_tag_segments_are_kept(temp_task_manager):
+    """Test that '#a/', '#a//b' and '#/a' are not read as '#a' or '#a/b'"""
+    tm = temp_task_manager
+    tm.add_task("Task 1", tags=["#a"])
+    tm.add_task("Task 2", tags=["#a/b"])
+    tm.add_task("Task 3", tags=["#a/", "#a//b", "#/a"])
+    
+    assert [t['id'] for t in tm.search_by_tag("#a")] == [1]
+    assert [t['id'] for t in tm.search_by_tag("#a/")] == [3]
+    assert [t['id'] for t in tm.search_by_tag("#a/b")] == [2]
+    assert [t['id'] for t in tm.filter_by_tags("#a/b")] == [2]
+    assert [t['id'] for t in tm.filter_by_tags("#a -#a/")] == [1, 2]
+    assert [t['id'] for t in tm.filter_by_tags("#/a")] == [3]
+    
+    tm.delete_task(3)
+    assert [t['id'] for t in tm.filter_by_tags("#a")] == [1, 2]
+    assert tm.get_tag_tree() == [(0, "a", 2), (1, "b", 1)]
+
+
+def test_tag_tree_counts(temp_task_manager):
+    """Test that the tag tree counts each task once per level"""
+    tm = temp_task_manager
+    tm.add_task("Task 1", tags=["#client/acme/infra", "#client/acme/web"])
+    tm.add_task("Task 2", tags=["#client/globex", "#work"])
+    
+    assert tm.get_tag_tree() == [(0, "client", 2), (1, "acme", 1), (2, "infra", 1),
+                                 (2, "web", 1), (1, "globex", 1), (0, "work", 1)]
+    
+    tm.remove_tags(1, ["#client/acme/infra"])
+    tm.delete_task(2)
+    assert tm.get_tag_tree() == [(0, "client", 1), (1, "acme", 1), (2, "web", 1)]
\ No newline at end of file
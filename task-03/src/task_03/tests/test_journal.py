@@ -0,0 +1,91 @@
+"""
+Tests for journal-backed storage
+"""
+
+import pytest
+import json
+from task_03.config import Config
+from task_03.task_manager import TaskManager
+
+
+@pytest.fixture
+def journal_file(tmp_path):
+    """Path to a temporary task file used in journal mode"""
+    return str(tmp_path / "test_tasks.json")
+
+
+def test_mutations_append_to_journal(journal_file):
+    """Test that changes go to the journal instead of the task file"""
+    tm = TaskManager(filename=journal_file, storage="journal")
+    tm.add_task("Task 1", tags=["#work"])
+    tm.complete_task(1)
+    
+    with open(journal_file + Config.JOURNAL_SUFFIX) as f:
+        records = [json.loads(line) for line in f]
+    assert [r['op'] for r in records] == ['add', 'complete']
+
+
+def test_reload_replays_journal(journal_file):
+    """Test that state is rebuilt from the snapshot plus the journal"""
+    tm = TaskManager(filename=journal_file, storage="journal")
+    tm.add_task("Task 1")
+    tm.add_task("Task 2", tags=["#work", "#urgent"])
+    tm.save_tasks()
+    tm.add_note(1, "A note")
+    tm.remove_tags(2, ["#urgent"])
+    tm.complete_task(2)
+    tm.delete_task(1)
+    
+    reloaded = TaskManager(filename=journal_file, storage="journal")
+    assert reloaded.tasks == tm.tasks
+    assert reloaded.tasks[0]['tags'] == ["#work"]
+    assert reloaded.tasks[0]['completed'] == True
+
+
+def test_journal_compacts_past_threshold(journal_file, monkeypatch):
+    """Test that a large journal is folded into a new snapshot"""
+    monkeypatch.setattr(Config, 'JOURNAL_COMPACT_BYTES', 500)
+    tm = TaskManager(filename=journal_file, storage="journal")
+    for i in range(10):
+        tm.add_task(f"Task {i}")
+    
+    with open(journal_file) as f:
+        assert len(json.load(f)['tasks']) >= 5
+    assert TaskManager(filename=journal_file, storage="journal").tasks == tm.tasks
+
+
+def test_replay_ignores_torn_last_record(journal_file):
+    """Test that a record cut off mid-write is skipped on load"""
+    tm = TaskManager(filename=journal_file, storage="journal")
+    tm.add_task("Task 1")
+    with open(journal_file + Config.JOURNAL_SUFFIX, 'a') as f:
+        f.write('{"op":"complete","id"')
+    
+    reloaded = TaskManager(filename=journal_file, storage="journal")
+    assert reloaded.tasks[0]['completed'] == False
+    
+    reloaded.complete_task(1)
+    assert TaskManager(filename=journal_file, storage="journal").tasks[0]['completed'] == True
+
+
+def test_damaged_record_is_quarantined(journal_file):
+    """Test that a corrupted line mid-journal is set aside and the records after it still replay"""
+    tm = TaskManager(filename=journal_file, storage="journal")
+    tm.add_task("Task 1")
+    tm.complete_task(1)
+    tm.add_task("Task 2")
+    journal = journal_file + Config.JOURNAL_SUFFIX
+    with open(journal) as f:
+        lines = f.readlines()
+    lines[1] = '{"op":"compl\x00\n'
+    with open(journal, 'w') as f:
+        f.writelines(lines)
+    
+    with pytest.warns(UserWarning, match="Moved 1 damaged record"):
+        reloaded = TaskManager(filename=journal_file, storage="journal")
+    assert [(t['id'], t['completed']) for t in reloaded.tasks] == [(1, False), (2, False)]
+    assert '"compl\x00' in open(journal + Config.QUARANTINE_SUFFIX).read()
+    with open(journal) as f:
+        assert len(f.readlines()) == 2
+    assert reloaded.add_task("Task 3")['id'] == 3
+    reloaded.close()
\ No newline at end of file
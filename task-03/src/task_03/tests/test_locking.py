@@ -0,0 +1,90 @@
+"""
+Tests for sharing one task file between several processes
+"""
+
+import multiprocessing
+import threading
+import pytest
+from task_03.task_manager import TaskManager
+
+PROCESSES = 4
+ADDS_PER_PROCESS = 25
+
+
+def add_tasks(filename, storage, worker):
+    """Add tasks from a separate process, interleaved with the other workers"""
+    tm = TaskManager(filename=filename, storage=storage)
+    for i in range(ADDS_PER_PROCESS):
+        task = tm.add_task(f"Worker {worker} task {i}", tags=[f"#w{worker}"])
+        if i % 5 == 0:
+            tm.add_note(task['id'], f"Checked by worker {worker}")
+    tm.close()
+
+
+@pytest.mark.parametrize('storage', ['json', 'journal', 'lines', 'sqlite'])
+def test_concurrent_adds_are_not_lost(tmp_path, storage):
+    """Test that processes adding to the same file never drop each other's tasks"""
+    filename = str(tmp_path / "tasks.json")
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=add_tasks, args=(filename, storage, worker))
+               for worker in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+    
+    tm = TaskManager(filename=filename, storage=storage)
+    ids = [task['id'] for task in tm.tasks]
+    assert len(ids) == PROCESSES * ADDS_PER_PROCESS
+    assert sorted(ids) == list(range(1, len(ids) + 1))
+    assert len([t for t in tm.tasks if t['notes']]) == PROCESSES * ADDS_PER_PROCESS // 5
+    tm.close()
+
+
+def test_refresh_reloads_only_after_a_change(tmp_path):
+    """Test that a stale TaskManager reloads once another one saves"""
+    filename = str(tmp_path / "tasks.json")
+    first = TaskManager(filename=filename)
+    second = TaskManager(filename=filename)
+    first.add_task("Task 1")
+    
+    assert second.refresh() == True
+    assert second.refresh() == False
+    assert [t['id'] for t in second.tasks] == [1]
+    
+    # Changes go on top of the latest file, not the stale copy
+    assert second.add_task("Task 2")['id'] == 2
+    first.complete_task(1)
+    second.close()
+    
+    reopened = TaskManager(filename=filename)
+    assert [(t['id'], t['completed']) for t in reopened.tasks] == [(1, True), (2, False)]
+    first.close()
+    reopened.close()
+
+
+def test_lines_reads_wait_for_writers(tmp_path):
+    """Test that a lines read waits for another TaskManager's change and then sees all of it"""
+    filename = str(tmp_path / "tasks.jsonl")
+    reader = TaskManager(filename=filename, storage='lines')
+    writer = TaskManager(filename=filename, storage='lines')
+    for i in range(1, 6):
+        writer.add_task(f"Task {i}")
+    seen = []
+    
+    with writer._lock:
+        thread = threading.Thread(target=lambda: seen.append(reader.get_task_by_id(3)))
+        thread.start()
+        thread.join(0.2)
+        # Blocked on the file lock while the change is under way
+        assert thread.is_alive()
+        writer.delete_task(1)
+        writer.add_note(3, "Moved")
+        writer.compact()
+    thread.join(5)
+    
+    assert seen[0]['notes'] == "Moved"
+    assert [task['id'] for task in reader.tasks] == [2, 3, 4, 5]
+    reader.close()
+    writer.close()
\ No newline at end of file
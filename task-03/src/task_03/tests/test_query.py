@@ -0,0 +1,76 @@
+"""
+Tests for compound queries and the query planner
+"""
+
+import random
+import pytest
+from task_03.query import parse_query
+from task_03.task_manager import TaskManager
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def task_manager(request, tmp_path):
+    """A small task list on indexed (json) and lazy (sqlite) storage"""
+    tm = TaskManager(filename=str(tmp_path / "tasks"), storage=request.param)
+    rng = random.Random(4)
+    with tm.transaction():
+        for i in range(120):
+            tm.add_task(f"Task {i} {'deploy' if i % 5 == 0 else 'review'}",
+                        priority=["low", "medium", "high"][i % 3],
+                        tags=[f"#t{i % 4}", f"#client/c{i % 3}"],
+                        created_at=f"2025-{rng.randint(1, 12):02d}-01T00:00:00")
+        for i in range(1, 121, 7):
+            tm.complete_task(i)
+    yield tm
+    tm.close()
+
+
+def ids(tasks):
+    return [task['id'] for task in tasks]
+
+
+@pytest.mark.parametrize('text', [
+    '#t1 priority:high',
+    '#client status:pending "deploy"',
+    'priority:low,medium -#t2 created>=2025-06-01',
+    'created>2025-03-01 created<=2025-05-01 #client/c1',
+    'id:7 status:done',
+    'deploy -#client/c0',
+])
+def test_query_matches_full_scan(task_manager, text):
+    """Test every plan against checking each term on every task"""
+    tm = task_manager
+    terms = parse_query(text)
+    expected = [task for task in tm.tasks if all(term.matches(task) for term in terms)]
+    assert ids(tm.query(text)) == ids(expected)
+
+
+def test_planner_starts_from_most_selective_index(tmp_path):
+    """Test that the smallest index drives the query and others are intersected"""
+    tm = TaskManager(filename=str(tmp_path / "tasks.json"))
+    with tm.transaction():
+        for i in range(200):
+            tm.add_task(f"Task {i}", priority="high" if i < 100 else "low",
+                        tags=["#rare"] * (i % 50 == 0) + ["#some"] * (i % 10 == 0))
+    
+    plan = tm.explain('priority:high "task" #some #rare')
+    
+    # 100 high-priority tasks is too many to intersect with 4 candidates
+    assert [(action, str(term)) for action, term, _ in plan.steps] == [
+        ('lookup', '#rare'), ('intersect', '#some'), ('filter', 'priority:high'),
+        ('filter', '"task"')]
+    assert (plan.examined, plan.matched) == (4, 2)
+    
+    plan = tm.explain('"task 1"')
+    assert plan.steps[0][0] == 'scan'
+    assert plan.examined == 200
+    tm.close()
+
+
+def test_bad_queries(tmp_path):
+    """Test that malformed terms are reported as ValueError"""
+    tm = TaskManager(filename=str(tmp_path / "tasks.json"))
+    for text in ['', 'priority:urgent', 'status:maybe', 'created>someday', 'id:x', '"open']:
+        with pytest.raises(ValueError):
+            tm.query(text)
+    tm.close()
\ No newline at end of file
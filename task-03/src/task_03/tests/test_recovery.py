@@ -0,0 +1,120 @@
+"""
+Tests for salvaging tasks from damaged task files
+"""
+
+import pytest
+from task_03.cli import process_command
+from task_03.recovery import recover_tasks
+from task_03.task_manager import TaskManager
+
+
+@pytest.fixture
+def task_file(tmp_path):
+    """A task file with ten tasks"""
+    filename = str(tmp_path / "tasks.json")
+    tm = TaskManager(filename=filename)
+    for i in range(1, 11):
+        tm.add_task(f"Task {i}", tags=["#work"])
+    tm.close()
+    return tmp_path / "tasks.json"
+
+
+def damage(path, text, replacement):
+    """Overwrite the first occurrence of text in a file"""
+    data = path.read_bytes()
+    path.write_bytes(data.replace(text.encode(), replacement.encode(), 1))
+
+
+def test_recover_keeps_intact_tasks(task_file):
+    """Test that one bad byte only costs the task it lands in"""
+    damage(task_file, '"description": "Task 4"', '"description": "Task 4\x00')
+    
+    report = recover_tasks(str(task_file))
+    
+    assert [t['id'] for t in report.tasks] == [1, 2, 3, 5, 6, 7, 8, 9, 10]
+    assert report.lost_ids == [4]
+    assert report.next_id == 11
+    quarantined = (task_file.parent / "tasks.json.damaged").read_text()
+    assert '"Task 4' in quarantined and '"Task 5"' not in quarantined
+
+
+def test_recover_streams_in_small_chunks(task_file):
+    """Test that record boundaries split across reads do not matter"""
+    damage(task_file, '"id": 7', '"id": 7, ]]')
+    
+    whole = recover_tasks(str(task_file))
+    chunked = recover_tasks(str(task_file), chunk_size=7)
+    
+    assert [t['id'] for t in chunked.tasks] == [t['id'] for t in whole.tasks]
+    assert chunked.lost_ids == whole.lost_ids == [7]
+
+
+def test_truncated_file_recovers_on_load(task_file):
+    """Test that loading a cut-off file keeps every complete task"""
+    data = task_file.read_bytes()
+    task_file.write_bytes(data[:data.index(b'"Task 9"')])
+    
+    with pytest.warns(UserWarning, match="lost task ids: 9"):
+        tm = TaskManager(filename=str(task_file))
+    assert [t['id'] for t in tm.tasks] == list(range(1, 9))
+    # The header survived, so ids handed out before the damage stay used
+    assert tm.add_task("Task 11")['id'] == 11
+    tm.close()
+
+
+def test_damage_is_quarantined_once(task_file):
+    """Test that a recovered load saves the intact tasks so the damage is not moved aside again"""
+    damage(task_file, '"description": "Task 4"', '"description": "Task 4\x00')
+    quarantine = task_file.parent / "tasks.json.damaged"
+    
+    with pytest.warns(UserWarning, match="lost task ids: 4"):
+        TaskManager(filename=str(task_file)).close()
+    size = quarantine.stat().st_size
+    tm = TaskManager(filename=str(task_file))
+    assert len(tm.tasks) == 9
+    report = tm.recover()
+    tm.close()
+    
+    assert not report.damaged
+    assert quarantine.stat().st_size == size
+
+
+def test_empty_file_holds_no_tasks(task_file, recwarn):
+    """Test that an empty task file loads as no tasks without a recovery"""
+    task_file.write_text("  \n")
+    tm = TaskManager(filename=str(task_file))
+    assert tm.tasks == []
+    tm.close()
+    assert len(recwarn) == 0
+    assert not (task_file.parent / "tasks.json.damaged").exists()
+
+
+def test_schema_problems_are_not_damage(task_file):
+    """Test that a hand-edited priority is coerced and an invalid task is reported, not quarantined"""
+    damage(task_file, '"priority": "medium"', '"priority": "urgent"')
+    tm = TaskManager(filename=str(task_file))
+    assert tm.get_task_by_id(1)['priority'] == 'medium'
+    assert len(tm.tasks) == 10
+    tm.close()
+    
+    damage(task_file, '"created_at": "', '"created_at": "someday')
+    before = task_file.read_bytes()
+    with pytest.raises(ValueError, match="task #1 is not a valid task"):
+        TaskManager(filename=str(task_file))
+    assert task_file.read_bytes() == before
+    assert not (task_file.parent / "tasks.json.damaged").exists()
+
+
+def test_recover_command(task_file, capsys):
+    """Test that the recover command rewrites a clean task file"""
+    tm = TaskManager(filename=str(task_file))
+    damage(task_file, '"Task 2"', '"Task 2')
+    
+    process_command(tm, "recover")
+    output = capsys.readouterr().out
+    
+    assert "Recovered 9 task(s)" in output and "lost task ids: 2" in output
+    reopened = TaskManager(filename=str(task_file))
+    assert len(reopened.tasks) == 9
+    tm.close()
+    reopened.close()
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Tests for sorted listings and cursor pagination
+"""
+
+import base64
+import json
+import pytest
+from task_03.task_manager import TaskManager
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def task_manager(request, tmp_path):
+    """Tasks with repeated priorities and creation times, on indexed and lazy storage"""
+    tm = TaskManager(filename=str(tmp_path / "tasks"), storage=request.param)
+    with tm.transaction():
+        for i in range(50):
+            tm.add_task(f"Task {i}", priority=["low", "medium", "high"][i * 7 % 3],
+                        created_at=f"2025-01-{i % 9 + 1:02d}T00:00:00")
+        for i in range(1, 51, 4):
+            tm.complete_task(i)
+    yield tm
+    tm.close()
+
+
+def all_pages(tm, sort, limit, show_completed=False):
+    pages, cursor = [], None
+    while True:
+        tasks, cursor = tm.list_sorted(sort, limit, cursor, show_completed=show_completed)
+        pages.append([task['id'] for task in tasks])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize('sort', ['priority,-created', '-created', 'created,-id', '-priority'])
+def test_pages_match_full_sort(task_manager, sort):
+    """Test that walking the pages gives the fully sorted list, each task once"""
+    tm = task_manager
+    fields = {'priority': lambda t: -t.priority, 'created': lambda t: t.created_at,
+              'id': lambda t: t.id}
+    
+    def key(task):
+        values = []
+        for name in sort.split(','):
+            value = fields[name.lstrip('-')](task)
+            values.append(-value if name.startswith('-') else value)
+        return values + [task.id]
+    expected = [task['id'] for task in sorted(tm.list_tasks(), key=key)]
+    
+    pages = all_pages(tm, sort, 7)
+    
+    assert [len(page) for page in pages[:-1]] == [7] * (len(pages) - 1)
+    assert sum(pages, []) == expected
+
+
+def test_sorted_view_follows_changes(task_manager):
+    """Test that later changes show up in the next listing"""
+    tm = task_manager
+    first = tm.list_sorted('priority,-created', 3)[0]
+    tm.complete_task(first[0]['id'])
+    added = tm.add_task("Urgent", priority="high")
+    tm.delete_task(first[1]['id'])
+    
+    tasks, _ = tm.list_sorted('priority,-created', 3)
+    
+    assert tasks[0]['id'] == added['id']
+    assert first[0] not in tasks and first[1] not in tasks
+    assert len(sum(all_pages(tm, 'id', 10, show_completed=True), [])) == 50
+
+
+def test_bad_sort_and_cursor(task_manager):
+    """Test that unknown fields and cursors from another sort are rejected"""
+    tm = task_manager
+    _, cursor = tm.list_sorted('created', 5)
+    with pytest.raises(ValueError):
+        tm.list_sorted('due', 5)
+    with pytest.raises(ValueError):
+        tm.list_sorted('priority', 5, cursor)
+    with pytest.raises(ValueError):
+        tm.list_sorted('created', 5, "not-a-cursor")
+    # Well-formed cursors whose key does not fit the sort
+    for key in ({"a": 1}, [1], [1, 2, 3], ["x", 1], [True, 1]):
+        forged = base64.urlsafe_b64encode(json.dumps(["created", key]).encode()).decode()
+        with pytest.raises(ValueError, match="Bad cursor"):
+            tm.list_sorted('created', 5, forged)
\ No newline at end of file
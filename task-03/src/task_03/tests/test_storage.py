@@ -0,0 +1,346 @@
+"""
+Tests for the storage backends
+"""
+
+import pytest
+import json
+import os
+from task_03.task_manager import TaskManager
+from task_03.config import Config
+from task_03.durability import SyncPolicy
+from task_03.models import Task
+from task_03.snapshot import decode_tasks, encode_tasks
+from task_03.storage import (JsonBackend, LinesBackend, SqliteBackend, export_json, migrate_json,
+                             migrate_json_to_sqlite)
+
+
+@pytest.fixture(params=['json', 'journal', 'sqlite', 'lines', 'binary'])
+def storage_task_manager(request, tmp_path):
+    """Create a TaskManager for each storage backend"""
+    tm = TaskManager(filename=str(tmp_path / "test_tasks"), storage=request.param)
+    yield tm
+    tm.close()
+
+
+def test_backends_behave_the_same(storage_task_manager):
+    """Test the core operations against every backend"""
+    tm = storage_task_manager
+    tm.add_task("Buy groceries", priority="high", tags=["#shopping", "#Urgent"])
+    tm.add_task("Write report", tags=["#work"])
+    tm.add_task("Buy milk", tags=["#shopping"])
+    
+    assert tm.complete_task(1) == True
+    assert tm.add_note(2, "Due Friday") == True
+    assert tm.add_tags(3, ["#urgent", "#shopping"]) == True
+    assert tm.remove_tags(1, ["#Urgent"]) == True
+    assert tm.complete_task(99) == False
+    
+    assert [t['id'] for t in tm.list_tasks()] == [2, 3]
+    assert [t['id'] for t in tm.list_tasks(show_completed=True)] == [1, 2, 3]
+    assert [t['id'] for t in tm.search_by_tag("#SHOPPING")] == [1, 3]
+    assert [t['id'] for t in tm.search_tasks("buy")] == [1, 3]
+    assert tm.get_all_tags() == ["#shopping", "#urgent", "#work"]
+    assert tm.get_tag_counts() == {"#shopping": 2, "#urgent": 1, "#work": 1}
+    assert [t['id'] for t in tm.filter_by_tags("#shopping -#urgent")] == [1]
+    assert tm.get_tag_tree() == [(0, "shopping", 2), (0, "urgent", 1), (0, "work", 1)]
+    assert tm.get_task_by_id(2)['notes'] == "Due Friday"
+    assert tm.get_task_by_id(3)['tags'] == ["#shopping", "#urgent"]
+    
+    removed = tm.delete_task(1)
+    assert removed['description'] == "Buy groceries"
+    assert tm.delete_task(1) is None
+    assert tm.get_task_by_id(1) is None
+
+
+def test_update_on_every_backend(storage_task_manager):
+    """Test that updating a task keeps lookups in step and survives a reload"""
+    tm = storage_task_manager
+    tm.add_task("Buy groceries", tags=["#shopping"])
+    tm.add_task("Write report", tags=["#work"])
+    
+    assert tm.update_task(1, description="Buy milk", priority="HIGH", tags=["#errand"]) == True
+    assert tm.update_task(2, priority="urgent") == True
+    assert tm.update_task(99, description="Missing") == False
+    
+    assert tm.search_by_tag("#shopping") == []
+    assert [t['id'] for t in tm.search_by_tag("#errand")] == [1]
+    assert [t['id'] for t in tm.search_tasks("milk")] == [1]
+    assert tm.search_tasks("groceries") == []
+    assert tm.get_all_tags() == ["#errand", "#work"]
+    tm.close()
+    
+    reloaded = TaskManager(storage=type(tm.storage)(tm.filename))
+    task = reloaded.get_task_by_id(1)
+    assert (task['description'], task['priority'], task['tags']) == ("Buy milk", "high", ["#errand"])
+    assert reloaded.get_task_by_id(2)['priority'] == "medium"
+    reloaded.close()
+
+
+def test_sqlite_uses_wal_and_indexes(tmp_path):
+    """Test that the SQLite backend runs in WAL mode and uses its indexes"""
+    backend = SqliteBackend(str(tmp_path / "tasks.db"))
+    mode = backend.conn.execute("PRAGMA journal_mode").fetchone()[0]
+    plan = backend.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT task_id FROM task_tags WHERE tag_key = ?",
+        ("work",)).fetchall()
+    backend.close()
+    
+    assert mode == "wal"
+    assert any("idx_task_tags_key" in row[-1] for row in plan)
+
+
+def test_sqlite_persists_between_sessions(tmp_path):
+    """Test that SQLite changes are visible to a new TaskManager"""
+    db_file = str(tmp_path / "tasks.db")
+    tm = TaskManager(filename=db_file, storage="sqlite")
+    tm.add_task("Task 1", tags=["#work"])
+    tm.complete_task(1)
+    tm.close()
+    
+    tm = TaskManager(filename=db_file, storage="sqlite")
+    assert tm.tasks[0]['completed'] == True
+    assert tm.add_task("Task 2")['id'] == 2
+    tm.close()
+
+
+def test_migrate_json_to_sqlite(tmp_path):
+    """Test importing an existing tasks.json into SQLite"""
+    json_file = str(tmp_path / "tasks.json")
+    db_file = str(tmp_path / "tasks.db")
+    json_tm = TaskManager(filename=json_file)
+    json_tm.add_task("Task 1", tags=["#work"])
+    json_tm.add_task("Task 2", priority="high")
+    
+    assert migrate_json_to_sqlite(json_file, db_file) == 2
+    
+    tm = TaskManager(filename=db_file, storage="sqlite")
+    assert tm.tasks == json_tm.tasks
+    tm.close()
+
+
+def test_migrate_renumbers_duplicate_ids(tmp_path):
+    """Test that duplicate ids from old files do not break the import"""
+    json_file = tmp_path / "tasks.json"
+    db_file = str(tmp_path / "tasks.db")
+    task = {'id': 1, 'description': "Task", 'priority': "low", 'tags': [],
+            'notes': '', 'created_at': "2025-01-01T00:00:00", 'completed': False}
+    json_file.write_text(json.dumps([task, dict(task, description="Copy")]))
+    
+    assert migrate_json_to_sqlite(str(json_file), db_file) == 2
+    
+    tm = TaskManager(filename=db_file, storage="sqlite")
+    assert [t['id'] for t in tm.tasks] == [1, 2]
+    tm.close()
+
+
+def test_transaction_on_every_backend(storage_task_manager):
+    """Test that transactions commit and roll back on every backend"""
+    tm = storage_task_manager
+    with tm.transaction():
+        tm.add_task("Task 1")
+        tm.add_task("Task 2")
+    
+    with pytest.raises(ValueError):
+        with tm.batch():
+            tm.complete_task(1)
+            tm.delete_task(2)
+            raise ValueError("undo")
+    
+    tm.close()
+    reopened = TaskManager(filename=tm.filename, storage=type(tm.storage)(tm.filename))
+    assert [t['id'] for t in reopened.list_tasks()] == [1, 2]
+    reopened.close()
+
+
+def test_ids_not_reused_on_every_backend(storage_task_manager):
+    """Test that a deleted id is never handed out again"""
+    tm = storage_task_manager
+    tm.add_task("Task 1")
+    tm.add_task("Task 2")
+    tm.delete_task(2)
+    
+    assert tm.add_task("Task 3")['id'] == 3
+
+
+def test_lines_reads_only_the_requested_task(tmp_path):
+    """Test that a lookup decodes just the line the index points at"""
+    data_file = tmp_path / "tasks.jsonl"
+    tm = TaskManager(filename=str(data_file), storage="lines")
+    tm.add_task("Task 1")
+    tm.add_task("Task 2", tags=["#work"])
+    tm.close()
+    
+    # Garble the first line in place; task 2 is still readable through the index
+    text = data_file.read_bytes()
+    data_file.write_bytes(b"x" * text.index(b"\n") + text[text.index(b"\n"):])
+    backend = LinesBackend(str(data_file))
+    assert backend.get(2)['tags'] == ["#work"]
+    assert backend.get(3) is None
+    backend.close()
+
+
+def test_lines_rebuilds_missing_index(tmp_path):
+    """Test that the offset index is recreated from the data file"""
+    data_file = str(tmp_path / "tasks.jsonl")
+    tm = TaskManager(filename=data_file, storage="lines")
+    tm.add_task("Task 1")
+    tm.add_task("Task 2")
+    tm.complete_task(1)
+    tm.delete_task(2)
+    tm.close()
+    
+    (tmp_path / ("tasks.jsonl" + Config.LINES_INDEX_SUFFIX)).unlink()
+    tm = TaskManager(filename=data_file, storage="lines")
+    assert [(t['id'], t['completed']) for t in tm.tasks] == [(1, True)]
+    assert tm.add_task("Task 3")['id'] == 3
+    tm.close()
+
+
+def test_lines_drops_torn_tail(tmp_path):
+    """Test that a half-written last line is discarded on open"""
+    data_file = tmp_path / "tasks.jsonl"
+    tm = TaskManager(filename=str(data_file), storage="lines")
+    tm.add_task("Task 1")
+    tm.close()
+    
+    with open(data_file, 'ab') as f:
+        f.write(b'{"id":2,"descr')
+    tm = TaskManager(filename=str(data_file), storage="lines")
+    assert [t['id'] for t in tm.tasks] == [1]
+    assert tm.add_task("Task 2")['id'] == 2
+    tm.close()
+
+
+def test_lines_compacts_stale_versions(tmp_path, monkeypatch):
+    """Test that old task versions are dropped once they outweigh live data"""
+    monkeypatch.setattr(Config, 'LINES_COMPACT_BYTES', 0)
+    data_file = tmp_path / "tasks.jsonl"
+    tm = TaskManager(filename=str(data_file), storage="lines")
+    tm.add_task("Task 1")
+    tm.add_task("Task 2")
+    for i in range(5):
+        tm.add_note(1, f"Note {i}")
+    tm.delete_task(2)
+    
+    assert len(data_file.read_bytes().splitlines()) == 1
+    assert tm.get_task_by_id(1)['notes'] == "Note 4"
+    assert tm.add_task("Task 3")['id'] == 3
+    tm.close()
+
+
+def test_migrate_json_to_lines(tmp_path):
+    """Test importing an existing tasks.json into the lines format"""
+    json_file = str(tmp_path / "tasks.json")
+    lines_file = str(tmp_path / "tasks.jsonl")
+    json_tm = TaskManager(filename=json_file)
+    json_tm.add_task("Task 1", tags=["#work"])
+    json_tm.add_task("Task 2", priority="high")
+    json_tm.delete_task(2)
+    
+    assert migrate_json(json_file, lines_file) == 1
+    
+    tm = TaskManager(filename=lines_file, storage="lines")
+    assert tm.tasks == json_tm.tasks
+    assert tm.add_task("Task 3")['id'] == 3
+    tm.close()
+
+
+def test_failed_save_keeps_previous_file(tmp_path, monkeypatch):
+    """Test that a save interrupted mid-write leaves the old file untouched"""
+    filename = str(tmp_path / "tasks.json")
+    tm = TaskManager(filename=filename)
+    tm.add_task("Task 1")
+    before = open(filename).read()
+    
+    def crash(task):
+        raise OSError("disk full")
+    monkeypatch.setattr(Task, 'to_dict', crash)
+    with pytest.raises(OSError):
+        tm.add_task("Task 2")
+    
+    assert open(filename).read() == before
+    assert sorted(os.listdir(tmp_path)) == ["tasks.json", "tasks.json.lock"]
+
+
+def test_batched_durability_shares_fsyncs(tmp_path):
+    """Test that a burst of saves under group commit shares one directory fsync"""
+    backend = JsonBackend(str(tmp_path / "tasks.json"))
+    backend.sync = SyncPolicy('batched', interval_ms=60_000)
+    tm = TaskManager(storage=backend)
+    for i in range(10):
+        tm.add_task(f"Task {i}")
+    # Each new file is synced before it replaces the old one
+    assert backend.sync.fsync_count == 10
+    
+    tm.close()
+    assert backend.sync.fsync_count == 11
+    
+    always = JsonBackend(str(tmp_path / "always.json"), durability='always')
+    tm = TaskManager(storage=always)
+    for i in range(10):
+        tm.add_task(f"Task {i}")
+    assert always.sync.fsync_count >= 10
+    tm.close()
+
+
+def test_unknown_durability_mode(tmp_path):
+    """Test that a misspelled durability setting is rejected"""
+    with pytest.raises(ValueError):
+        TaskManager(filename=str(tmp_path / "tasks.json"), durability="sometimes")
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib', 'lzma'])
+def test_snapshot_round_trip(compression):
+    """Test that the binary snapshot keeps every field"""
+    tasks = [Task(1, "Café ☕ order", "high", ["#work", "#ünïcode"], "Line 1\nLine 2",
+                  "2025-01-01T09:30:00", True),
+             Task(7, "", "low", ["#work", "low"], "", 0.5, False)]
+    
+    data = encode_tasks(tasks, 9, compression)
+    
+    assert data.startswith(b"TASKSNAP")
+    assert decode_tasks(data) == (tasks, 9)
+
+
+def test_snapshot_rejects_other_files():
+    """Test that the magic number and version are checked"""
+    with pytest.raises(ValueError, match="magic"):
+        decode_tasks(b'{"next_id": 1, "tasks": []}')
+    data = bytearray(encode_tasks([], 1))
+    data[8] = 99
+    with pytest.raises(ValueError, match="version"):
+        decode_tasks(bytes(data))
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib', 'lzma'])
+def test_snapshot_rejects_truncated_files(compression):
+    """Test that a cut-off snapshot raises ValueError like the other backends' bad files"""
+    tasks = [Task(i, f"Task {i}", "high", ["#work"], "Notes") for i in range(1, 20)]
+    data = encode_tasks(tasks, 20, compression)
+    for size in (len(data) - 1, len(data) // 2, 12):
+        with pytest.raises(ValueError):
+            decode_tasks(data[:size])
+
+
+def test_snapshot_stores_many_tags():
+    """Test that a task may carry more tags than fit in 16 bits"""
+    task = Task(1, "Tagged", tags=[f"#t{i}" for i in range(70_000)])
+    tasks, _ = decode_tasks(encode_tasks([task], 2, 'none'))
+    assert tasks == [task]
+
+
+def test_binary_export_round_trip(tmp_path):
+    """Test converting JSON to a binary snapshot and back"""
+    json_file = str(tmp_path / "tasks.json")
+    bin_file = str(tmp_path / "tasks.bin")
+    tm = TaskManager(filename=json_file)
+    tm.add_task("Task 1", tags=["#work"], notes="Details")
+    tm.add_task("Task 2", priority="high")
+    tm.delete_task(2)
+    
+    assert migrate_json(json_file, bin_file) == 1
+    assert os.path.getsize(bin_file) < os.path.getsize(json_file)
+    assert export_json(bin_file, str(tmp_path / "back.json")) == 1
+    
+    with open(json_file) as original, open(tmp_path / "back.json") as exported:
+        assert json.load(original) == json.load(exported)
\ No newline at end of file
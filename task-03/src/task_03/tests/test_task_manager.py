@@ -120,6 +120,47 @@ def test_delete_task(temp_task_manager):
     assert len(tm.tasks) == 0
 
 
+def test_ids_are_never_reused(temp_task_manager):
+    """Test that deleting the newest task does not free its id"""
+    tm = temp_task_manager
+    tm.add_task("Task 1")
+    tm.add_task("Task 2")
+    tm.delete_task(1)
+    tm.delete_task(2)
+    
+    assert tm.add_task("Task 3")['id'] == 3
+    assert TaskManager(filename=tm.filename).add_task("Task 4")['id'] == 4
+
+
+def test_delete_leaves_other_lookups_intact(temp_task_manager):
+    """Test id lookups while deleted tasks are still tombstones"""
+    tm = temp_task_manager
+    for i in range(10):
+        tm.add_task(f"Task {i + 1}")
+    with tm.transaction():
+        for task_id in [2, 4, 6]:
+            tm.delete_task(task_id)
+        assert tm.get_task_by_id(4) is None
+        assert tm.get_task_by_id(7)['description'] == "Task 7"
+        assert tm.complete_task(8) == True
+    
+    assert [t['id'] for t in tm.tasks] == [1, 3, 5, 7, 8, 9, 10]
+    assert [t['id'] for t in tm.list_tasks()] == [1, 3, 5, 7, 9, 10]
+
+
+def test_load_legacy_file_with_duplicate_ids(tmp_path):
+    """Test that old task files with a bare list and repeated ids still load"""
+    test_file = tmp_path / "test_tasks.json"
+    task = {'id': 1, 'description': "Task", 'priority': "low", 'tags': [],
+            'notes': '', 'created_at': "2025-01-01T00:00:00", 'completed': False}
+    test_file.write_text(json.dumps([task, dict(task, description="Copy")]))
+    
+    tm = TaskManager(filename=str(test_file))
+    assert [t['id'] for t in tm.tasks] == [1, 2]
+    assert tm.get_task_by_id(2)['description'] == "Copy"
+    assert tm.add_task("New")['id'] == 3
+
+
 def test_list_tasks_filter_completed(temp_task_manager):
     """Test listing only pending tasks"""
     tm = temp_task_manager
@@ -142,4 +183,175 @@ def test_get_all_tags(temp_task_manager):
     assert len(all_tags) == 3
     assert "#work" in all_tags
     assert "#urgent" in all_tags
-    assert "#personal" in all_tags
\ No newline at end of file
+    assert "#personal" in all_tags
+
+
+def test_transaction_saves_once(temp_task_manager, monkeypatch):
+    """Test that a transaction defers saving until the block exits"""
+    tm = temp_task_manager
+    saves = []
+    monkeypatch.setattr(tm.storage, 'save', lambda tasks, next_id: saves.append(len(tasks)))
+    
+    with tm.transaction():
+        for i in range(100):
+            tm.add_task(f"Task {i}")
+        tm.complete_task(1)
+        assert saves == []
+    
+    assert saves == [100]
+
+
+def test_transaction_rolls_back_on_error(temp_task_manager):
+    """Test that an exception undoes every change made in the block"""
+    tm = temp_task_manager
+    tm.add_task("Task 1", tags=["#work"])
+    
+    with pytest.raises(RuntimeError):
+        with tm.transaction():
+            tm.add_task("Task 2")
+            tm.add_tags(1, ["#urgent"])
+            tm.add_note(1, "Changed")
+            tm.delete_task(1)
+            raise RuntimeError("boom")
+    
+    assert len(tm.tasks) == 1
+    assert tm.tasks[0]['tags'] == ["#work"]
+    assert tm.tasks[0]['notes'] == ''
+    assert TaskManager(filename=tm.filename).tasks == tm.tasks
+
+
+def test_tasks_keep_dict_style_access(temp_task_manager):
+    """Test that compact Task records still behave like the old dictionaries"""
+    tm = temp_task_manager
+    task = tm.add_task("Test task", priority="high", tags=["#work"])
+    
+    assert task['priority'] == "high"
+    assert task.get('notes', '') == ''
+    assert task['created_at'][:4].isdigit()
+    assert task.get('missing') is None
+    
+    assert TaskManager(filename=tm.filename).get_task_by_id(1) == task
+    
+    # Writes would bypass the indexes; changes go through the TaskManager
+    with pytest.raises(TypeError):
+        task['priority'] = "low"
+    assert task['priority'] == "high"
+
+
+def test_archive_moves_old_completed_tasks(temp_task_manager):
+    """Test that archived tasks leave the working set and the task file"""
+    tm = temp_task_manager
+    tm.add_task("Old report", tags=["#work"], created_at="2020-01-01T00:00:00")
+    tm.add_task("Old open task", created_at="2020-01-01T00:00:00")
+    tm.add_task("New report")
+    tm.complete_task(1)
+    tm.complete_task(3)
+    
+    assert [t['id'] for t in tm.archive_tasks(30)] == [1]
+    
+    assert [t['id'] for t in tm.list_tasks(show_completed=True)] == [2, 3]
+    assert [t['id'] for t in tm.list_tasks(show_completed=True, archived=True)] == [1, 2, 3]
+    assert [t['id'] for t in tm.list_sorted('-id', 2, show_completed=True, archived=True)[0]] == [3, 2]
+    assert [t['id'] for t in tm.list_sorted('created', 2, show_completed=True, archived=True)[0]] == [1, 2]
+    assert tm.search_tasks("report") == [tm.get_task_by_id(3)]
+    assert [t['id'] for t in tm.search_tasks("report", archived=True)] == [1, 3]
+    assert [t['id'] for t in tm.search_tasks("report", mode="ranked", archived=True)] == [1, 3]
+    assert tm.search_by_tag("#work") == []
+    assert [t['id'] for t in tm.search_by_tag("#work", archived=True)] == [1]
+    with open(tm.filename) as f:
+        assert [t['id'] for t in json.load(f)['tasks']] == [2, 3]
+    
+    reopened = TaskManager(filename=tm.filename)
+    assert reopened.get_task_by_id(1) is None
+    assert reopened.get_task_by_id(1, archived=True)['description'] == "Old report"
+    assert reopened.add_task("Another")['id'] == 4
+
+
+def test_archive_skips_tasks_still_in_working_set(temp_task_manager):
+    """Test that a copy left behind by an interrupted archive is not listed twice"""
+    tm = temp_task_manager
+    tm.add_task("Task 1")
+    tm._archive.append(tm.tasks)
+    
+    assert tm.archived_tasks() == []
+    assert [t['id'] for t in tm.list_tasks(archived=True)] == [1]
+
+
+def test_startup_cache_skips_parsing(tmp_path, monkeypatch):
+    """Test that an unchanged task file is loaded from the startup cache"""
+    filename = str(tmp_path / "tasks.json")
+    tm = TaskManager(filename=filename, startup_cache=True)
+    tm.add_task("Buy milk", tags=["#shopping"])
+    tm.add_task("Write report")
+    tm.close()
+    assert os.path.exists(filename + ".cache")
+    
+    def no_parse(self):
+        raise AssertionError("task file parsed despite a valid cache")
+    with monkeypatch.context() as patch:
+        patch.setattr(type(tm.storage), 'load', no_parse)
+        warm = TaskManager(filename=filename, startup_cache=True)
+    assert warm.tasks == tm.tasks
+    assert [t['id'] for t in warm.search_by_tag("#shopping")] == [1]
+    assert [t['id'] for t in warm.search_tasks("report", mode="ranked")] == [2]
+    assert warm.add_task("Task 3")['id'] == 3
+    warm.close()
+
+
+def test_startup_cache_concurrent_saves(tmp_path, monkeypatch):
+    """Test that read-only runs closing together all succeed, and a failed cache save is a miss"""
+    import threading
+    from task_03 import cache
+    filename = str(tmp_path / "tasks.json")
+    tm = TaskManager(filename=filename)
+    tm.add_task("Task 1")
+    tm.close()
+    
+    for _ in range(3):
+        if os.path.exists(filename + ".cache"):
+            os.remove(filename + ".cache")
+        managers = [TaskManager(filename=filename, startup_cache=True) for _ in range(8)]
+        together = threading.Barrier(len(managers))
+        errors = []
+        
+        def close(manager):
+            together.wait()
+            try:
+                manager.close()
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=close, args=(manager,)) for manager in managers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+    assert TaskManager(filename=filename, startup_cache=True).get_task_by_id(1) is not None
+    
+    os.remove(filename + ".cache")
+    
+    def full_disk(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(cache, 'atomic_write', full_disk)
+    TaskManager(filename=filename, startup_cache=True).close()
+    assert not os.path.exists(filename + ".cache")
+
+
+def test_startup_cache_misses_after_change(tmp_path):
+    """Test that a changed task file is parsed again and the cache rewritten"""
+    filename = str(tmp_path / "tasks.json")
+    tm = TaskManager(filename=filename, startup_cache=True)
+    tm.add_task("Task 1")
+    tm.close()
+    
+    other = TaskManager(filename=filename, startup_cache=False)
+    other.complete_task(1)
+    other.close()
+    
+    tm = TaskManager(filename=filename, startup_cache=True)
+    assert tm.get_task_by_id(1)['completed'] == True
+    tm.close()
+    
+    with_trigrams = TaskManager(filename=filename, startup_cache=True, trigram_index=True)
+    assert [t['id'] for t in with_trigrams.search_tasks("task")] == [1]
+    with_trigrams.close()
\ No newline at end of file
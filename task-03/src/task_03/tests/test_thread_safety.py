@@ -0,0 +1,128 @@
+"""
+Tests for the reader-writer lock and the thread-safe TaskManager
+"""
+
+import threading
+import time
+import pytest
+from task_03.locking import ReadWriteLock
+from task_03.task_manager import TaskManager
+
+
+def run_threads(*targets):
+    """Run each target in its own thread; re-raise the first failure"""
+    errors = []
+    
+    def guarded(target):
+        try:
+            target()
+        except BaseException as e:
+            errors.append(e)
+    threads = [threading.Thread(target=guarded, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def test_readers_share_and_writers_wait():
+    """Test that reads overlap while a write runs alone"""
+    lock = ReadWriteLock()
+    inside = []
+    overlap = threading.Barrier(3, timeout=5)
+    
+    def reader():
+        with lock.reading():
+            inside.append('read')
+            # All three readers hold the lock at once or the barrier times out
+            overlap.wait()
+            inside.remove('read')
+    
+    def writer():
+        time.sleep(0.05)
+        with lock.writing():
+            assert inside == []
+    run_threads(reader, reader, reader, writer)
+
+
+def test_nested_holds():
+    """Test that a thread may nest reads and read inside its write, but not write inside a read"""
+    lock = ReadWriteLock()
+    with lock.writing() as outermost:
+        assert outermost
+        with lock.reading() as nested:
+            assert not nested
+        with lock.writing() as nested:
+            assert not nested
+    with lock.reading():
+        with lock.reading() as nested:
+            assert not nested
+        with pytest.raises(RuntimeError):
+            with lock.writing():
+                pass
+
+
+def test_reads_return_snapshots(tmp_path):
+    """Test that tasks returned by a read do not change with later writes"""
+    tm = TaskManager(str(tmp_path / "tasks.json"), durability='none', thread_safe=True)
+    tm.add_task("Report", tags=['#work'])
+    listed = tm.list_tasks()
+    everything = tm.list_tasks(show_completed=True)
+    tagged = tm.search_by_tag('#work')
+    tm.complete_task(1)
+    tm.add_tags(1, ['#done'])
+    tm.add_task("Groceries")
+    
+    assert len(everything) == 1
+    assert not listed[0]['completed']
+    assert tagged[0]['tags'] == ['#work']
+    assert tm.get_task_by_id(1)['completed']
+    tm.close()
+
+
+def test_threaded_stress(tmp_path):
+    """Test that parallel readers never see half of a change and no writer loses one"""
+    tm = TaskManager(str(tmp_path / "tasks.json"), durability='none', thread_safe=True)
+    writers, pairs = 4, 25
+    done = threading.Event()
+    
+    def writer(number):
+        def run():
+            for i in range(pairs):
+                # Both tasks of a pair appear in the same change
+                with tm.transaction():
+                    first = tm.add_task(f"Pair {number}-{i} a", tags=['#pair'])
+                    tm.add_task(f"Pair {number}-{i} b", tags=['#pair'])
+                if i % 5 == 0:
+                    tm.complete_task(first['id'])
+                    tm.delete_task(first['id'])
+                    tm.add_task(f"Pair {number}-{i} c", tags=['#pair'])
+        return run
+    
+    def reader():
+        while not done.is_set():
+            tasks = tm.list_tasks(show_completed=True)
+            assert len(tasks) % 2 == 0
+            assert len({task['id'] for task in tasks}) == len(tasks)
+            assert len(tm.search_by_tag('#pair')) % 2 == 0
+            assert all(not task['completed'] for task in tm.list_tasks())
+            tm.search_tasks("pair")
+    
+    def writers_then_stop():
+        try:
+            run_threads(*(writer(number) for number in range(writers)))
+        finally:
+            done.set()
+    
+    run_threads(writers_then_stop, reader, reader, reader)
+    
+    tasks = tm.list_tasks()
+    assert len(tasks) == writers * pairs * 2
+    assert len({task['id'] for task in tasks}) == len(tasks)
+    tm.close()
+    
+    reloaded = TaskManager(str(tmp_path / "tasks.json"))
+    assert sorted(task['id'] for task in reloaded.tasks) == sorted(task['id'] for task in tasks)
+    reloaded.close()
\ No newline at end of file
@@ -2,10 +2,11 @@
 Utility functions for formatting and displaying tasks
 """
 
+import threading
 from task_03.config import Config
 
-def format_task_table(tasks):
-    """Format tasks as a table for display"""
+def format_task_table(tasks, next_cursor=None):
+    """Format tasks as a table for display, with a pointer to the next page if given"""
     if not tasks:
         return "No tasks found."
     
@@ -36,7 +37,10 @@ def format_task_table(tasks):
             tags_str = ' '.join(task['tags'][:Config.MAX_TAGS_DISPLAY])
             lines.append(f"      Tags: {tags_str}")
     
-    lines.append("=" * Config.TABLE_WIDTH + "\n")
+    lines.append("=" * Config.TABLE_WIDTH)
+    if next_cursor is not None:
+        lines.append(f"More tasks: repeat with --after {next_cursor}")
+    lines.append("")
     return "\n".join(lines)
 
 
@@ -98,8 +102,8 @@ def format_search_results(tasks, keyword):
     return "\n".join(lines)
 
 
-def format_tags_list(tags):
-    """Format list of all tags"""
+def format_tags_list(tags, counts=None):
+    """Format list of all tags, with the number of tasks using each if given"""
     if not tags:
         return "No tags found."
     
@@ -108,7 +112,43 @@ def format_tags_list(tags):
     lines.append("=" * Config.TABLE_WIDTH)
     
     for tag in tags:
-        lines.append(f"  {tag}")
+        if counts is not None:
+            lines.append(f"  {tag} ({counts[tag]})")
+        else:
+            lines.append(f"  {tag}")
+    
+    lines.append("=" * Config.TABLE_WIDTH + "\n")
+    return "\n".join(lines)
+
+
+def format_query_plan(plan):
+    """Format the steps of a query plan and the rows it examined"""
+    lines = []
+    lines.append("\nQuery plan:")
+    lines.append("=" * Config.TABLE_WIDTH)
+    
+    for number, (action, term, estimate) in enumerate(plan.steps, 1):
+        target = "all tasks" if term is None else str(term)
+        rows = "" if estimate is None else f" (~{estimate} rows)"
+        lines.append(f"  {number}. {action:<10} {target}{rows}")
+    
+    lines.append("=" * Config.TABLE_WIDTH)
+    lines.append(f"Rows examined: {plan.examined}, matched: {plan.matched}\n")
+    return "\n".join(lines)
+
+
+def format_tag_tree(nodes):
+    """Format the tag hierarchy, each level with the number of tasks at or below it"""
+    if not nodes:
+        return "No tags found."
+    
+    lines = []
+    lines.append("\nTag tree:")
+    lines.append("=" * Config.TABLE_WIDTH)
+    
+    for depth, segment, count in nodes:
+        name = segment if depth else '#' + segment
+        lines.append(f"  {'  ' * depth}{name} ({count})")
     
     lines.append("=" * Config.TABLE_WIDTH + "\n")
     return "\n".join(lines)
@@ -121,6 +161,11 @@ def truncate_text(text, max_length):
     return text[:max_length]
 
 
+def normalize_tag(tag):
+    """Normalize a tag for comparison (strip # prefix, ignore case)"""
+    return tag.lstrip('#').lower()
+
+
 def validate_priority(priority):
     """Validate and normalize priority level"""
     priority = priority.lower()
@@ -162,6 +207,17 @@ def print_success(message):
     print(f"{Config.SYMBOL_SUCCESS} {message}")
 
 
+# Errors printed so far by each thread, so scripts and the daemon can tell
+# whether a command failed
+_errors = threading.local()
+
+
+def errors_printed():
+    """Number of errors the current thread has printed"""
+    return getattr(_errors, 'count', 0)
+
+
 def print_error(message):
     """Print an error message"""
+    _errors.count = errors_printed() + 1
     print(f"Error: {message}")
\ No newline at end of file